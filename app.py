@@ -1,4 +1,7 @@
+import time
+from collections import OrderedDict
 from datetime import datetime, timezone
+from functools import cached_property
 
 import dateutil.parser
 from natural.date import duration
@@ -7,8 +10,37 @@ from sanic import response
 from .formatter import format_content_html
 
 
+class RenderedPages:
+    def __init__(self, max_pages=256, ttl=60):
+        # pages show relative times ("5 minutes ago"), so they only live for ttl seconds
+        self.max_pages = max_pages
+        self.ttl = ttl
+        self.pages = OrderedDict()
+
+    def get(self, key):
+        if key in self.pages:
+            expires, html = self.pages[key]
+            if expires < time.monotonic():
+                del self.pages[key]
+                return None
+
+            self.pages.move_to_end(key)
+            return html
+
+    def set(self, key, value):
+        self.pages[key] = (time.monotonic() + self.ttl, value)
+        self.pages.move_to_end(key)
+        while len(self.pages) > self.max_pages:
+            self.pages.popitem(last=False)
+
+
+rendered_pages = RenderedPages()
+
+
 class LogEntry:
-    def __init__(self, app, data):
+    page_size = 250
+
+    def __init__(self, app, data, page=1):
         self.app = app
         self.key = data["key"]
         self.open = data["open"]
@@ -29,11 +61,55 @@ class LogEntry:
         self.recipient = User(data["recipient"])
         self.closer = User(data["closer"]) if not self.open else None
         self.close_message = format_content_html(data.get("close_message") or "")
-        self.messages = [Message(m) for m in data["messages"]]
-        self.internal_messages = [m for m in self.messages if m.type == "internal"]
-        self.thread_messages = [
-            m for m in self.messages if m.type not in ("internal", "system")
-        ]
+        # messages are only wrapped, parsed and formatted when a page uses them,
+        # so a cached page doesn't pay for the whole log
+        self.raw_messages = data["messages"]
+        # edits don't change the message count, the edit marker catches them
+        self.version = data.get("version") or (
+            len(self.raw_messages),
+            self.raw_messages[-1]["message_id"] if self.raw_messages else 0,
+            sum(1 for m in self.raw_messages if m.get("edited")),
+            data["open"],
+            data.get("closed_at"),
+        )
+        self.pages = max(1, -(-len(self.raw_messages) // self.page_size))
+        self.page = min(max(1, page), self.pages)
+
+    @staticmethod
+    def requested_page(request):
+        """
+        The page asked for with ?page=, for the log routes
+        """
+
+        try:
+            return int(request.args.get("page", 1))
+        except (TypeError, ValueError):
+            return 1
+
+    @cached_property
+    def messages(self):
+        return [Message(m) for m in self.raw_messages]
+
+    @property
+    def internal_messages(self):
+        return [m for m in self.messages if m.type == "internal"]
+
+    @property
+    def thread_messages(self):
+        return [m for m in self.messages if m.type not in ("internal", "system")]
+
+    @property
+    def visible_messages(self):
+        start = (self.page - 1) * self.page_size
+        return [Message(m) for m in self.raw_messages[start : start + self.page_size]]
+
+    @property
+    def previous_page(self):
+        return self.page - 1 if self.page > 1 else None
+
+    @property
+    def next_page(self):
+        return self.page + 1 if self.page < self.pages else None
 
     @property
     def system_avatar_url(self):
@@ -46,15 +122,16 @@ class LogEntry:
     @property
     def message_groups(self):
         groups = []
+        messages = self.visible_messages
 
-        if not self.messages:
+        if not messages:
             return groups
 
-        curr = MessageGroup(self.messages[0].author)
+        curr = MessageGroup(messages[0].author)
 
-        for index, message in enumerate(self.messages):
-            next_index = index + 1 if index + 1 < len(self.messages) else index
-            next_message = self.messages[next_index]
+        for index, message in enumerate(messages):
+            next_index = index + 1 if index + 1 < len(messages) else index
+            next_message = messages[next_index]
 
             curr.messages.append(message)
 
@@ -66,55 +143,53 @@ class LogEntry:
         return groups
 
     def render_html(self):
-        return self.app.ctx.render_template("logbase", log_entry=self)
+        key = (self.key, self.version, self.page)
+        if (html := rendered_pages.get(key)) is None:
+            html = self.app.ctx.render_template("logbase", log_entry=self)
+            rendered_pages.set(key, html)
+
+        return html
 
     def render_plain_text(self):
         messages = self.messages
         thread_create_time = self.created_at.strftime("%d %b %Y - %H:%M UTC")
-        out = f"Thread created at {thread_create_time}\n"
+        out = [f"Thread created at {thread_create_time}\n"]
 
         if self.creator == self.recipient:
-            out += f"[R] {self.creator} "
-            out += f"({self.creator.id}) created a Modmail thread. \n"
+            out.append(f"[R] {self.creator} ")
+            out.append(f"({self.creator.id}) created a Modmail thread. \n")
         else:
-            out += f"[M] {self.creator} "
-            out += f"created a thread with [R] "
-            out += f"{self.recipient} ({self.recipient.id})\n"
+            out.append(f"[M] {self.creator} ")
+            out.append(f"created a thread with [R] ")
+            out.append(f"{self.recipient} ({self.recipient.id})\n")
 
-        out += "────────────────────────────────────────────────\n"
+        out.append("────────────────────────────────────────────────\n")
 
-        if messages:
-            for index, message in enumerate(messages):
-                next_index = index + 1 if index + 1 < len(messages) else index
-                curr, next_ = message.author, messages[next_index].author
+        for index, message in enumerate(messages):
+            next_index = index + 1 if index + 1 < len(messages) else index
+            curr, next_ = message.author, messages[next_index].author
 
-                author = curr
-                user_type = "M" if author.mod else "R"
-                create_time = message.created_at.strftime("%d/%m %H:%M")
+            user_type = "M" if curr.mod else "R"
+            create_time = message.created_at.strftime("%d/%m %H:%M")
+            out.append(f"{create_time} {user_type} {curr}: {message.raw_content}\n")
 
-                base = f"{create_time} {user_type} "
-                base += f"{author}: {message.raw_content}\n"
+            for attachment in message.attachments:
+                out.append(f"Attachment: {attachment}\n")
 
-                for attachment in message.attachments:
-                    base += f"Attachment: {attachment}\n"
-
-                out += base
-
-                if curr != next_:
-                    out += "────────────────────────────────\n"
-                    current_author = author
+            if curr != next_:
+                out.append("────────────────────────────────\n")
 
         if not self.open:
             if messages:  # only add if at least 1 message was sent
-                out += "────────────────────────────────────────────────\n"
+                out.append("────────────────────────────────────────────────\n")
 
-            out += f"[M] {self.closer} ({self.closer.id}) "
-            out += "closed the Modmail thread. \n"
+            out.append(f"[M] {self.closer} ({self.closer.id}) ")
+            out.append("closed the Modmail thread. \n")
 
             closed_time = self.closed_at.strftime("%d %b %Y - %H:%M UTC")
-            out += f"Thread closed at {closed_time} \n"
+            out.append(f"Thread closed at {closed_time} \n")
 
-        return response.text(out)
+        return response.text("".join(out))
 
 
 class User:
@@ -172,20 +247,32 @@ class Attachment:
 
 class Message:
     def __init__(self, data):
+        self.data = data
         self.id = int(data["message_id"])
-        self.created_at = dateutil.parser.parse(data["timestamp"]).astimezone(
-            timezone.utc
-        )
-        self.human_created_at = duration(
-            self.created_at, now=datetime.now(timezone.utc)
-        )
         self.raw_content = data["content"]
-        self.content = self.format_html_content(self.raw_content)
-        self.attachments = [Attachment(a) for a in data["attachments"]]
-        self.author = User(data["author"])
         self.type = data.get("type", "thread_message")
         self.edited = data.get("edited", False)
 
+    @cached_property
+    def created_at(self):
+        return dateutil.parser.parse(self.data["timestamp"]).astimezone(timezone.utc)
+
+    @cached_property
+    def human_created_at(self):
+        return duration(self.created_at, now=datetime.now(timezone.utc))
+
+    @cached_property
+    def content(self):
+        return self.format_html_content(self.raw_content)
+
+    @cached_property
+    def attachments(self):
+        return [Attachment(a) for a in self.data["attachments"]]
+
+    @cached_property
+    def author(self):
+        return User(self.data["author"])
+
     def is_different_from(self, other):
         return (
             (other.created_at - self.created_at).total_seconds() > 60
@@ -0,0 +1,477 @@
+"""
+Offline checks and benchmarks for the services in tools, without discord or the database
+
+python bench.py            run every check
+python bench.py shards     run the named checks
+"""
+
+import asyncio
+import inspect
+import sys
+import time
+import traceback
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Tuple
+
+CHECKS: Dict[str, Callable[[], Any]] = {}
+
+
+def check(name: str):
+    """
+    Register a check, a check fails by raising
+    """
+
+    def decorator(func):
+        CHECKS[name] = func
+        return func
+
+    return decorator
+
+
+class FakeDatabase:
+    def __init__(self):
+        """
+        Records the queries instead of running them
+        """
+
+        self.queries: List[tuple] = []
+
+    async def execute(self, query: str, *args):
+        self.queries.append((query, *args))
+
+    async def executemany(self, query: str, args):
+        self.queries.append((query, *args))
+
+
+def fake_bot(**attrs) -> SimpleNamespace:
+    return SimpleNamespace(db=FakeDatabase(), **attrs)
+
+
+def percentiles(samples: List[float]) -> str:
+    samples = sorted(samples)
+    return ", ".join(
+        f"{name} {samples[min(len(samples) - 1, int(len(samples) * q))] * 1_000_000:.2f}us"
+        for name, q in (("p50", 0.5), ("p99", 0.99), ("max", 1))
+    )
+
+
+@check("shards")
+def shards(events: int = 100_000, shards: int = 4):
+    """
+    Replay random joins and leaves against fake guilds and check the
+    incremental counters against a full recount along the way
+    """
+
+    import random
+
+    from tools.shards import ShardCounters
+
+    guilds: Dict[int, Any] = {}
+    counters = ShardCounters()
+    counters.reconcile(guilds.values())
+    next_id = 0
+    checks = 0
+
+    for n in range(events):
+        roll = random.random()
+        if roll < 0.05 or not guilds:
+            guild = SimpleNamespace(
+                id=next_id,
+                shard_id=next_id % shards,
+                member_count=random.randint(1, 5000),
+            )
+            next_id += 1
+            guilds[guild.id] = guild
+            counters.guild_join(guild)
+        elif roll < 0.08:
+            guild = guilds.pop(random.choice(list(guilds)))
+            counters.guild_remove(guild)
+        elif roll < 0.55:
+            guild = random.choice(list(guilds.values()))
+            guild.member_count += 1
+            counters.member_join(guild)
+        elif guilds:
+            guild = random.choice(list(guilds.values()))
+            if guild.member_count:
+                guild.member_count -= 1
+                counters.member_remove(guild)
+
+        if n % 1000 == 0:
+            checks += 1
+            expected = ShardCounters()
+            expected.reconcile(guilds.values())
+            for shard in range(shards):
+                assert counters.guild_count(shard) == expected.guild_count(shard)
+                assert counters.member_count(shard) == expected.member_count(shard)
+                assert sorted(counters.guild_ids(shard)) == sorted(
+                    expected.guild_ids(shard)
+                )
+
+    drift = counters.reconcile(guilds.values())
+    assert drift == 0, drift
+    return f"{events:,} events over {len(guilds):,} guilds, {checks} recounts, no drift"
+
+
+@check("detectors")
+def detectors(events: int = 100_000, guilds: int = 500, authors: int = 50):
+    """
+    Replay synthetic joins and messages through the detectors and report the decision latency
+    """
+
+    import random
+
+    from tools.detectors import Detector
+
+    joins = Detector(5)
+    spam = Detector(10)
+    now = 0.0
+    latencies = []
+    tripped = 0
+
+    for n in range(events):
+        now += random.expovariate(2000)
+        guild = random.randrange(guilds)
+        start = time.perf_counter()
+        if n % 2:
+            tripped += joins.hit(guild, 7, n, now)
+        else:
+            tripped += spam.hit((guild, random.randrange(authors)), 5, n, now)
+        latencies.append(time.perf_counter() - start)
+
+    assert tripped, "nothing tripped the detectors"
+    return (
+        f"{events:,} events, {tripped:,} tripped, {len(joins) + len(spam):,} windows, "
+        f"{percentiles(latencies)}"
+    )
+
+
+@check("autopfp")
+async def autopfp(guilds: int = 50, interval: float = 0.5, rounds: int = 4):
+    """
+    Run the rotator against fake channels and a local image api, and check
+    every guild got its share of pictures and the pools kept the api calls down
+    """
+
+    from aiohttp import web
+
+    from tools.autopfp import AutoPfpRotator
+    from tools.misc.session import Session
+
+    requests = 0
+
+    async def picture(request: web.Request) -> web.Response:
+        nonlocal requests
+        requests += 1
+        category = request.match_info["category"]
+        return web.json_response({"url": f"https://example.com/{category}.png"})
+
+    app = web.Application()
+    app.router.add_get("/pictures/pfps/{category}", picture)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    class Channel:
+        def __init__(self):
+            self.sent = 0
+
+        async def send(self, embed):
+            self.sent += 1
+            return SimpleNamespace(id=self.sent)
+
+    channels = {g: Channel() for g in range(guilds)}
+    bot = fake_bot(
+        session=Session(),
+        is_ready=lambda: True,
+        get_guild=lambda g: (
+            SimpleNamespace(get_channel=lambda c: channels.get(c))
+            if g in channels
+            else None
+        ),
+    )
+
+    try:
+        rotator = AutoPfpRotator(
+            bot, interval=interval, concurrency=2, base_url=f"http://127.0.0.1:{port}"
+        )
+        for g in range(guilds + 1):
+            rotator.add(g, ("anime", "egirl", "random")[g % 3], g)
+
+        task = asyncio.ensure_future(rotator.run())
+        await asyncio.sleep(interval * rounds)
+        task.cancel()
+    finally:
+        await runner.cleanup()
+
+    sent = [c.sent for c in channels.values()]
+    assert min(sent) >= rounds - 1, f"starved guild: {sent}"
+    assert max(sent) - min(sent) <= 1, f"unfair rotation: {sent}"
+    assert all(g != guilds for g, _ in rotator.targets), "a gone guild is still rotated"
+    assert requests <= sum(sent) + 3 * rotator.pool_size, f"{requests} api calls"
+    return f"{sum(sent)} sent with {requests} api calls, {rotator.stats}"
+
+
+@check("archives")
+async def archives(files: int = 300, limit: int = 8 * 1024 * 1024):
+    """
+    Export fake emojis and check every one ends up in a zip under the limit
+    """
+
+    import os
+    import random
+    import zipfile
+
+    from tools.archives import ZipExporter
+
+    async def fake(size: int) -> bytes:
+        await asyncio.sleep(random.uniform(0.001, 0.02))
+        return os.urandom(size)
+
+    exporter = ZipExporter(limit)
+    entries = [
+        (
+            f"emoji{n % 250}.gif",
+            lambda size=random.randint(1_000, 256_000): fake(size),
+        )
+        for n in range(files)
+    ]
+    start = time.perf_counter()
+    first, found, parts = None, set(), []
+    async for filename, part in exporter.export("emojis", entries):
+        first = first or time.perf_counter() - start
+        size = part.seek(0, 2)
+        part.seek(0)
+        with zipfile.ZipFile(part) as archive:
+            found.update(archive.namelist())
+        part.close()
+        assert size <= limit, f"{filename} is {size} bytes"
+        parts.append(f"{size / 1024**2:.2f}MB")
+
+    assert len(found) == files, len(found)
+    return f"{files} files in {', '.join(parts)}, first zip after {first:.2f}s"
+
+
+@check("startup")
+def startup(packages: Tuple[str, ...] = ("cogs", "events")):
+    """
+    The cold import time of every extension, each in a fresh interpreter
+    """
+
+    import os
+    import re
+    import subprocess
+
+    pattern = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|\s*(\S+)")
+    results = []
+    for package in packages:
+        for file in sorted(os.listdir(package)):
+            if not file.endswith(".py"):
+                continue
+
+            module = f"{package}.{file[:-3]}"
+            proc = subprocess.run(
+                [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                capture_output=True,
+                text=True,
+            )
+            cumulative = {
+                m.group(3): int(m.group(2)) / 1_000_000
+                for m in pattern.finditer(proc.stderr)
+            }
+            if proc.returncode:
+                error = proc.stderr.strip().splitlines()[-1]
+                results.append((module, None, error))
+            else:
+                results.append((module, cumulative.get(module, 0.0), None))
+
+    assert results, "no extensions found"
+    for module, took, error in sorted(results, key=lambda r: r[1] or 0, reverse=True):
+        print(f"  {module:<24} {f'{took:.3f}s' if took is not None else error}")
+
+    # a missing dependency skips the module, any other import error fails the check
+    missing = [
+        m
+        for m, _, error in results
+        if error and error.startswith("ModuleNotFoundError")
+    ]
+    broken = [m for m, _, error in results if error and m not in missing]
+    assert not broken, f"{', '.join(broken)} failed to import"
+
+    ok = [took for _, took, _ in results if took is not None]
+    if not ok:
+        raise ImportError(
+            f"no extension could be imported, {len(missing)} miss dependencies"
+        )
+
+    return (
+        f"{len(ok)}/{len(results)} imported, {len(missing)} skipped for missing "
+        f"dependencies, slowest {max(ok):.3f}s"
+    )
+
+
+@check("logviewer")
+def logviewer(count: int = 50_000):
+    """
+    Time to first byte and peak memory of a log with count messages, with
+    a stub formatter and template standing in for the log viewer's own
+    """
+
+    import html
+    import os
+    import tracemalloc
+    import types
+
+    formatted = 0
+
+    def format_content_html(content: str) -> str:
+        nonlocal formatted
+        formatted += 1
+        return html.escape(content).replace("\n", "<br>")
+
+    # app.py imports its formatter relatively, so load it inside a stub package
+    package = types.ModuleType("logviewer")
+    package.__path__ = [os.path.dirname(os.path.abspath(__file__))]
+    formatter = types.ModuleType("logviewer.formatter")
+    formatter.format_content_html = format_content_html
+    sys.modules.update({"logviewer": package, "logviewer.formatter": formatter})
+
+    from logviewer.app import LogEntry
+
+    def render_template(name: str, log_entry: LogEntry) -> str:
+        out = []
+        for group in log_entry.message_groups:
+            out.append(f"<div>{group.author} {group.created_at}")
+            for message in group.messages:
+                out.append(f"<p>{message.content}</p>")
+                out.extend(a.url for a in message.attachments)
+
+        return "".join(out)
+
+    app = SimpleNamespace(ctx=SimpleNamespace(render_template=render_template))
+    author = {
+        "id": "1",
+        "name": "user",
+        "discriminator": "0",
+        "avatar_url": "",
+        "mod": False,
+    }
+    data = {
+        "key": "benchmark",
+        "open": False,
+        "created_at": "2024-01-01T00:00:00+00:00",
+        "closed_at": "2024-01-02T00:00:00+00:00",
+        "channel_id": "1",
+        "guild_id": "1",
+        "creator": author,
+        "recipient": author,
+        "closer": {**author, "mod": True},
+        "messages": [
+            {
+                "message_id": str(n),
+                "timestamp": f"2024-01-01T{n // 3600 % 24:02}:{n // 60 % 60:02}:{n % 60:02}+00:00",
+                "content": f"message **{n}** with `code` and a https://greed.best link",
+                "attachments": [],
+                "author": {**author, "mod": bool(n % 7 == 0)},
+            }
+            for n in range(count)
+        ],
+    }
+
+    results = []
+    for name, render in (
+        ("first page", lambda: LogEntry(app, data).render_html()),
+        ("cached page", lambda: LogEntry(app, data).render_html()),
+        ("last page", lambda: LogEntry(app, data, page=10**9).render_html()),
+        ("plain text", lambda: LogEntry(app, data).render_plain_text()),
+    ):
+        before = formatted
+        tracemalloc.start()
+        start = time.perf_counter()
+        render()
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        results.append((name, formatted - before))
+        print(f"  {name:<12} {elapsed * 1000:8.1f}ms  peak {peak / 1024**2:6.1f}MB")
+
+    # the close message is formatted with every entry, the messages only per visible page
+    pages = dict(results)
+    assert pages["first page"] == LogEntry.page_size + 1, pages
+    assert pages["cached page"] == 1, pages
+    assert pages["last page"] <= LogEntry.page_size + 1, pages
+    return f"{count:,} messages, {LogEntry.page_size} formatted per page"
+
+
+@check("timezones")
+async def timezones():
+    """
+    Resolve locations offline through a static geocoder and check the zones and the caching
+    """
+
+    from tools.timezones import StaticGeocoder, TimezoneResolver
+
+    geocoder = StaticGeocoder(
+        {
+            "London": (51.5074, -0.1278),
+            "New York, NY": (40.7128, -74.0060),
+            "Tokyo": (35.6762, 139.6503),
+        }
+    )
+    resolver = TimezoneResolver(fake_bot(), geocoder, max_locations=3)
+
+    start = time.perf_counter()
+    zones = await asyncio.gather(
+        resolver.resolve("London"),
+        resolver.resolve("new york ny"),
+        resolver.resolve("Tokyo"),
+    )
+    cold = time.perf_counter() - start
+    assert zones == ["Europe/London", "America/New_York", "Asia/Tokyo"], zones
+
+    start = time.perf_counter()
+    assert await resolver.resolve("  LONDON ") == "Europe/London"
+    warm = time.perf_counter() - start
+    assert geocoder.lookups == 3, "a cached location was geocoded again"
+
+    assert await resolver.resolve("Atlantis") is None
+    assert await resolver.resolve("atlantis") is None
+    assert geocoder.lookups == 4, "a location that wasn't found was geocoded again"
+    assert len(resolver.locations) == 3, "the location cache went over its size"
+
+    return f"first resolve {cold * 1000:.0f}ms, cached {warm * 1_000_000:.0f}us"
+
+
+def run(name: str) -> bool:
+    start = time.perf_counter()
+    try:
+        result = CHECKS[name]()
+        if inspect.iscoroutine(result):
+            result = asyncio.run(result)
+    except ImportError as error:
+        print(f"{name}: skipped, {error}")
+        return True
+    except Exception:
+        print(f"{name}: failed")
+        traceback.print_exc()
+        return False
+
+    print(f"{name}: ok in {time.perf_counter() - start:.2f}s")
+    if result:
+        print(f"  {result}")
+
+    return True
+
+
+def main(names: List[str]) -> int:
+    if unknown := [n for n in names if n not in CHECKS]:
+        print(f"unknown checks: {', '.join(unknown)}, pick from {', '.join(CHECKS)}")
+        return 2
+
+    results = [run(name) for name in names or CHECKS]
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
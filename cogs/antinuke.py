@@ -23,6 +23,7 @@ from discord.ext.commands import Cog, group
 from tools.bot import Pretend
 from tools.converters import Punishment
 from tools.helpers import GreedContext
+from tools.pipeline import Feature
 from tools.predicates import admin_antinuke, antinuke_configured, antinuke_owner
 from tools.validators import ValidTime
 
@@ -47,6 +48,17 @@ class Antinuke(Cog):
             "bot add",
         ]
 
+    async def cog_load(self):
+        self.bot.pipeline.add(
+            "antinuke.massmention",
+            self.on_mass_mention,
+            Feature.MASS_MENTION,
+            lambda m: m.mention_everyone or bool(m.role_mentions),
+        )
+
+    async def cog_unload(self):
+        self.bot.pipeline.remove("antinuke.massmention")
+
     async def joined_whitelist(self, member: Member) -> bool:
         """check if the added bot / young account is whitelisted"""
         check = await self.bot.db.fetchval(
@@ -79,9 +91,11 @@ class Antinuke(Cog):
                 else:
                     return
 
-                async for entry in before.guild.audit_logs(
-                    limit=1, action=AuditLogAction.role_update
-                ):
+                if (
+                    entry := await self.bot.audit.get(
+                        before.guild, AuditLogAction.role_update, before.id
+                    )
+                ) and isinstance(entry.user, Member):
                     if self.bot.an.check_hieracy(entry.user, before.guild.me):
                         if not await self.bot.an.is_whitelisted(entry.user):
                             tasks.append(
@@ -184,9 +198,11 @@ class Antinuke(Cog):
         if self.bot.an.get_bot_perms(member.guild):
             if member.bot:
                 if await self.bot.an.is_module("bot add", member.guild):
-                    async for entry in member.guild.audit_logs(
-                        limit=1, action=AuditLogAction.bot_add
-                    ):
+                    if (
+                        entry := await self.bot.audit.get(
+                            member.guild, AuditLogAction.bot_add, member.id
+                        )
+                    ) and isinstance(entry.user, Member):
                         if not await self.joined_whitelist(member):
                             if self.bot.an.check_hieracy(entry.user, member.guild.me):
                                 if not await self.bot.an.is_whitelisted(entry.user):
@@ -216,9 +232,11 @@ class Antinuke(Cog):
     async def on_guild_channel_create(self, channel: GuildChannel):
         if self.bot.an.get_bot_perms(channel.guild):
             if await self.bot.an.is_module("channel create", channel.guild):
-                async for entry in channel.guild.audit_logs(
-                    limit=1, action=AuditLogAction.channel_create
-                ):
+                if (
+                    entry := await self.bot.audit.get(
+                        channel.guild, AuditLogAction.channel_create, channel.id
+                    )
+                ) and isinstance(entry.user, Member):
                     if self.bot.an.check_hieracy(entry.user, channel.guild.me):
                         if not await self.bot.an.is_whitelisted(entry.user):
                             await channel.delete()
@@ -257,9 +275,11 @@ class Antinuke(Cog):
     async def on_guild_channel_delete(self, channel: GuildChannel):
         if self.bot.an.get_bot_perms(channel.guild):
             if await self.bot.an.is_module("channel delete", channel.guild):
-                async for entry in channel.guild.audit_logs(
-                    limit=1, action=AuditLogAction.channel_delete
-                ):
+                if (
+                    entry := await self.bot.audit.get(
+                        channel.guild, AuditLogAction.channel_delete, channel.id
+                    )
+                ) and isinstance(entry.user, Member):
                     if self.bot.an.check_hieracy(entry.user, channel.guild.me):
                         if not await self.bot.an.is_whitelisted(entry.user):
                             await channel.clone()
@@ -298,9 +318,11 @@ class Antinuke(Cog):
     async def on_role_deletion(self, role: Role):
         if self.bot.an.get_bot_perms(role.guild):
             if await self.bot.an.is_module("role delete", role.guild):
-                async for entry in role.guild.audit_logs(
-                    limit=1, action=AuditLogAction.role_delete
-                ):
+                if (
+                    entry := await self.bot.audit.get(
+                        role.guild, AuditLogAction.role_delete, role.id
+                    )
+                ) and isinstance(entry.user, Member):
                     if not await self.bot.an.is_whitelisted(
                         entry.user
                     ) and self.bot.an.check_hieracy(entry.user, role.guild.me):
@@ -340,9 +362,11 @@ class Antinuke(Cog):
     async def on_role_creation(self, role: Role):
         if self.bot.an.get_bot_perms(role.guild):
             if await self.bot.an.is_module("role create", role.guild):
-                async for entry in role.guild.audit_logs(
-                    limit=1, action=AuditLogAction.role_create
-                ):
+                if (
+                    entry := await self.bot.audit.get(
+                        role.guild, AuditLogAction.role_create, role.id
+                    )
+                ) and isinstance(entry.user, Member):
                     if not await self.bot.an.is_whitelisted(
                         entry.user
                     ) and self.bot.an.check_hieracy(entry.user, role.guild.me):
@@ -382,9 +406,11 @@ class Antinuke(Cog):
             if any(self.bot.is_dangerous(role) for role in roles):
                 if self.bot.an.get_bot_perms(before.guild):
                     if await self.bot.an.is_module("role giving", before.guild):
-                        async for entry in after.guild.audit_logs(
-                            limit=1, action=AuditLogAction.member_role_update
-                        ):
+                        if (
+                            entry := await self.bot.audit.get(
+                                after.guild, AuditLogAction.member_role_update, after.id
+                            )
+                        ) and isinstance(entry.user, Member):
                             if not await self.bot.an.is_whitelisted(entry.user):
                                 if self.bot.an.check_hieracy(
                                     entry.user, before.guild.me
@@ -430,9 +456,11 @@ class Antinuke(Cog):
     async def on_kick_action(self, member: Member):
         if self.bot.an.get_bot_perms(member.guild):
             if await self.bot.an.is_module("kick", member.guild):
-                async for entry in member.guild.audit_logs(
-                    limit=1, action=AuditLogAction.kick
-                ):
+                if (
+                    entry := await self.bot.audit.get(
+                        member.guild, AuditLogAction.kick, member.id
+                    )
+                ) and isinstance(entry.user, Member):
                     if not await self.bot.an.is_whitelisted(entry.user):
                         if await self.bot.an.check_threshold("kick", entry.user):
                             if self.bot.an.check_hieracy(entry.user, member.guild.me):
@@ -464,7 +492,11 @@ class Antinuke(Cog):
     async def on_ban_action(self, guild: Guild, user: Union[User, Member]):
         if self.bot.an.get_bot_perms(guild):
             if await self.bot.an.is_module("ban", guild):
-                async for entry in guild.audit_logs(limit=1, action=AuditLogAction.ban):
+                if (
+                    entry := await self.bot.audit.get(
+                        guild, AuditLogAction.ban, user.id
+                    )
+                ) and isinstance(entry.user, Member):
                     if not await self.bot.an.is_whitelisted(entry.user):
                         if isinstance(user, Member):
                             if not self.bot.an.check_hieracy(entry.user, guild.me):
@@ -492,7 +524,6 @@ class Antinuke(Cog):
                                     guild.get_channel(check["logs"]),
                                 )
 
-    @Cog.listener("on_message")
     async def on_mass_mention(self, message: Message):
         if message.guild:
             if not message.is_system():
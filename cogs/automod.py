@@ -2,7 +2,7 @@ import asyncio
 import datetime
 import json as orjson
 from collections import defaultdict
-from typing import List, Tuple
+from typing import Dict, NamedTuple, Optional, Set
 
 import aiohttp
 import humanfriendly
@@ -31,78 +31,75 @@ from discord.ext.commands import (
 
 from tools.bot import Pretend
 from tools.converters import NoStaff
+from tools.detectors import Detector
 from tools.helpers import GreedContext
+from tools.pipeline import Feature
 from tools.predicates import antispam_enabled
 from tools.validators import ValidTime
 
 
+class AntispamConfig(NamedTuple):
+    rate: int
+    timeout: int
+    users: Set[int]
+    channels: Set[int]
+
+
+class AutomodConfig(NamedTuple):
+    antispam: Optional[AntispamConfig]
+    join_rate: Optional[int]
+
+
 class Automod(Cog):
     def __init__(self, bot: Pretend):
         self.bot = bot
         self.description = "Automod commands"
-        self.spam_cache = {}
-        self.joins_cache = {}
+        self.spam = Detector(10)
+        self.joins = Detector(5)
+        self.configs: Dict[int, AutomodConfig] = {}
         self.locks = defaultdict(asyncio.Lock)
 
-    def antispam_threshold(self, message: Message):
-        if not self.spam_cache.get(message.guild.id):
-            self.spam_cache[message.guild.id]: dict = {}
-
-        if not self.spam_cache[message.guild.id].get(message.author.id):
-            self.spam_cache[message.guild.id][message.author.id]: List[
-                Tuple[datetime.datetime, Message]
-            ] = [(datetime.datetime.now(), message)]
-        else:
-            self.spam_cache[message.guild.id][message.author.id].append(
-                (datetime.datetime.now(), message)
-            )
-
-        to_remove = [
-            d
-            for d in self.spam_cache[message.guild.id][message.author.id]
-            if (datetime.datetime.now() - d[0]).total_seconds() > 10
-        ]
-        for d in to_remove:
-            self.spam_cache[message.guild.id][message.author.id].remove(d)
+    async def cog_load(self):
+        self.bot.pipeline.add("automod.antispam", self.antispam_event, Feature.ANTISPAM)
 
-        return list(
-            map(lambda m: m[1], self.spam_cache[message.guild.id][message.author.id])
-        )
+    async def cog_unload(self):
+        self.bot.pipeline.remove("automod.antispam")
 
-    async def whitelisted_antispam(self, message: Message):
-        res = await self.bot.db.fetchrow(
-            "SELECT users, channels FROM antispam WHERE guild_id = $1", message.guild.id
-        )
-        if res["users"]:
-            users = orjson.loads(res["users"])
-            if message.author.id in users:
-                return True
+    async def cog_after_invoke(self, ctx: GreedContext):
+        # every write to the automod settings goes through a command of this cog
+        if ctx.guild:
+            self.configs.pop(ctx.guild.id, None)
 
-        if res["channels"]:
-            channels = orjson.loads(res["channels"])
-            if message.channel.id in channels:
-                return True
+    async def config(self, guild_id: int) -> AutomodConfig:
+        """
+        The guild's antispam and mass join settings, loaded once until they change
+        """
 
-        return False
+        if config := self.configs.get(guild_id):
+            return config
 
-    def get_joins(self, member: Member) -> int:
-        if self.joins_cache.get(member.guild.id):
-            self.joins_cache[member.guild.id].append(
-                (datetime.datetime.now(), member.id)
+        async with self.bot.db.transaction() as conn:
+            antispam = await conn.fetchrow(
+                "SELECT * FROM antispam WHERE guild_id = $1", guild_id
+            )
+            join_rate = await conn.fetchval(
+                "SELECT rate FROM anti_join WHERE guild_id = $1", guild_id
             )
-            to_remove = [
-                m
-                for m in self.joins_cache[member.guild.id]
-                if (datetime.datetime.now() - m[0]).total_seconds() > 5
-            ]
-
-            for r in to_remove:
-                self.joins_cache[member.guild.id].remove(r)
-
-        else:
-            self.joins_cache[member.guild.id] = [(datetime.datetime.now(), member.id)]
 
-        return len(self.joins_cache[member.guild.id])
+        self.configs[guild_id] = config = AutomodConfig(
+            antispam=(
+                AntispamConfig(
+                    rate=antispam["rate"],
+                    timeout=antispam["timeout"],
+                    users=set(orjson.loads(antispam["users"] or "[]")),
+                    channels=set(orjson.loads(antispam["channels"] or "[]")),
+                )
+                if antispam
+                else None
+            ),
+            join_rate=join_rate,
+        )
+        return config
 
     @Cog.listener("on_guild_channel_delete")
     async def whitelisted_channel_delete(self, channel: abc.GuildChannel):
@@ -119,25 +116,25 @@ class Automod(Cog):
                         orjson.dumps(channels),
                         channel.guild.id,
                     )
+                    self.configs.pop(channel.guild.id, None)
 
     @Cog.listener("on_member_join")
     async def mass_join_event(self, member: Member):
         if member.guild.me.guild_permissions.administrator:
-            if rate := await self.bot.db.fetchval(
-                "SELECT rate FROM anti_join WHERE guild_id = $1", member.guild.id
-            ):
-                joins = self.get_joins(member)
-                if joins > rate:
+            if rate := (await self.config(member.guild.id)).join_rate:
+                if self.joins.hit(member.guild.id, rate, member.id):
                     async with self.locks[member.guild.id]:
+                        window = self.joins.get(member.guild.id)
+                        members = window.items() if window else []
+                        self.joins.clear(member.guild.id)
                         tasks = [
                             member.guild.ban(
-                                user=Object(m[1]),
+                                user=Object(m),
                                 reason="Flagged by mass join protection",
                             )
-                            for m in self.joins_cache[member.guild.id]
+                            for m in members
                         ]
                         await asyncio.gather(*tasks)
-                        self.joins_cache = []
 
                         url = f"https://discord.com/api/v9/guilds/{member.guild.id}/incident-actions"
                         until = (
@@ -158,13 +155,18 @@ class Automod(Cog):
                             async with cs.put(url, json=data) as r:
                                 print(r.status)
 
-    @Cog.listener("on_message")
     async def antispam_event(self, message: Message):
         if message.guild:
-            if not message.guild.chunked:
-                await message.guild.chunk(cache=True)
             if isinstance(message.author, User):
                 return
+
+            check = (await self.config(message.guild.id)).antispam
+            if not check:
+                return
+
+            if message.author.id in check.users or message.channel.id in check.channels:
+                return
+
             if not message.author.guild_permissions.manage_guild:
                 if message.guild.me.guild_permissions.moderate_members:
                     if message.guild.me.top_role:
@@ -174,38 +176,31 @@ class Automod(Cog):
                     else:
                         return
 
-                    if check := await self.bot.db.fetchrow(
-                        "SELECT * FROM antispam WHERE guild_id = $1", message.guild.id
-                    ):
-                        if not await self.whitelisted_antispam(message):
-                            messages = self.antispam_threshold(message)
-                            if len(messages) > check["rate"]:
-                                res = self.bot.cache.get(
-                                    f"antispam-{message.author.id}"
-                                )
-                                if not res:
-                                    del self.spam_cache[message.guild.id][
-                                        message.author.id
-                                    ]
-                                    timeout = utils.utcnow() + datetime.timedelta(
-                                        seconds=check["timeout"]
-                                    )
-                                    await message.channel.delete_messages(messages)
-                                    await message.author.timeout(
-                                        timeout, reason="Flagged by the antispam"
-                                    )
-                                    await message.channel.send(
-                                        embed=Embed(
-                                            color=self.bot.warning_color,
-                                            description=f"> {self.bot.warning} {message.author.mention} has been muted for **{humanfriendly.format_timespan(check['timeout'])}** - ***spamming messages***",
-                                        ),
-                                        delete_after=5,
-                                    )
-                                    await self.bot.cache.set(
-                                        f"antispam-{message.author.id}",
-                                        True,
-                                        expiration=10,
-                                    )
+                    key = (message.guild.id, message.author.id)
+                    if self.spam.hit(key, check.rate, message):
+                        res = self.bot.cache.get(f"antispam-{message.author.id}")
+                        if not res:
+                            messages = self.spam.get(key).items()
+                            self.spam.clear(key)
+                            timeout = utils.utcnow() + datetime.timedelta(
+                                seconds=check.timeout
+                            )
+                            await message.channel.delete_messages(messages)
+                            await message.author.timeout(
+                                timeout, reason="Flagged by the antispam"
+                            )
+                            await message.channel.send(
+                                embed=Embed(
+                                    color=self.bot.warning_color,
+                                    description=f"> {self.bot.warning} {message.author.mention} has been muted for **{humanfriendly.format_timespan(check.timeout)}** - ***spamming messages***",
+                                ),
+                                delete_after=5,
+                            )
+                            await self.bot.cache.set(
+                                f"antispam-{message.author.id}",
+                                True,
+                                expiration=10,
+                            )
 
     @hybrid_group(name="filter", invoke_without_command=True)
     async def chat_filter(self, ctx):
@@ -1,8 +1,6 @@
 import json as orjson
-import string
-from asyncio import Lock, sleep
+from asyncio import Lock, Task, ensure_future, sleep
 from collections import defaultdict
-from random import choices
 from typing import List, Optional, Union
 
 from discord import (
@@ -18,7 +16,6 @@ from discord import (
     User,
     app_commands,
 )
-from discord.ext import tasks
 from discord.ext.commands import (
     BadArgument,
     Cog,
@@ -31,6 +28,7 @@ from discord.ext.commands import (
     hybrid_group,
 )
 
+from tools.autopfp import AutoPfpRotator
 from tools.bot import Pretend
 from tools.converters import Alias, HexColor, NewRoleConverter
 from tools.handlers.embedbuilder import EmbedBuilder, EmbedScript
@@ -45,12 +43,22 @@ class Config(Cog):
     def __init__(self, bot: Pretend):
         self.bot = bot
         self.description = "Config commands"
-        self.autopfp_loop.start()
         self.locks = defaultdict(Lock)
         self.user_ids = set(user.id for user in self.bot.users if user != self.bot.user)
+        self.autopfp = AutoPfpRotator(self.bot)
+        self.autopfp_task: Optional[Task] = None
+
+    async def cog_load(self):
+        self.autopfp_task = ensure_future(self.run_autopfp())
 
     def cog_unload(self):
-        self.autopfp_loop.cancel()
+        if self.autopfp_task:
+            self.autopfp_task.cancel()
+
+    async def run_autopfp(self):
+        await self.bot.wait_until_ready()
+        await self.autopfp.load()
+        await self.autopfp.run()
 
     async def embed_json(self, member: Member, attachment: Attachment):
         if not attachment.filename.endswith(".json"):
@@ -94,12 +102,12 @@ class Config(Cog):
                 f"Please choose from one of these categories: {', '.join(categories)}"
             )
             return
+        if not channel:
+            channel = ctx.channel
         if not channel.is_nsfw():
             return await ctx.send_warning(
                 "This channel must be nsfw before using this command"
             )
-        if not channel:
-            channel = ctx.channel
         await self.bot.db.execute(
             """
             INSERT INTO autopfp (guild_id, type, category, channel_id) VALUES ($1, $2, $3, $4)
@@ -111,45 +119,11 @@ class Config(Cog):
             category,
             channel.id,
         )
+        self.autopfp.add(ctx.guild.id, category, channel.id)
         await ctx.send_success(
             f"Now sending the category {category} to channel {channel.mention}!"
         )
 
-    @tasks.loop(seconds=15)
-    async def autopfp_loop(self):
-        records = await self.bot.db.fetch("SELECT * FROM autopfp")
-        for record in records:
-            guild = self.bot.get_guild(record["guild_id"])
-            if guild:
-                channel = guild.get_channel(record["channel_id"])
-                if channel:
-                    headers = {"api-key": os.getenv("pretend_key")}
-                    h = await self.bot.session.get_json(
-                        f"https://v1.pretend.best/pictures/pfps/{record['category']}",
-                        headers=headers,
-                    )
-                    embed = discord.Embed(title="greed", url="https://greed.best")
-                    embed.set_image(url=h["url"])
-                    hash_id = "".join(choices(string.digits, k=5))
-
-                    embed.set_footer(
-                        text=f"pfps module {record['category']} • ID {hash_id} • /report"
-                    )
-
-                    message = await channel.send(embed=embed)
-
-                    await self.bot.db.execute(
-                        """
-                        INSERT INTO message_hash (message_id, hash_id) VALUES ($1, $2)
-                        """,
-                        message.id,
-                        hash_id,
-                    )
-
-    @autopfp_loop.before_loop
-    async def before_autopfp_loop(self):
-        await self.bot.wait_until_ready()
-
     @group(name="alias", brief="manage_guild", invoke_without_command=True)
     async def alias(self, ctx: GreedContext):
         return await ctx.create_pages()
@@ -247,10 +221,7 @@ class Config(Cog):
     @has_guild_permissions(manage_guild=True)
     async def usernames_add(self, ctx: GreedContext, *, channel: TextChannel):
         """add a channel for username tracking"""
-        check = await self.bot.db.fetchrow(
-            "SELECT * FROM username_track WHERE guild_id = $1", ctx.guild.id
-        )
-        if check:
+        if ctx.guild.id in await self.bot.usernames.load_webhooks():
             return await ctx.send_warning(
                 "The bot is already tracking usernames for this server"
             )
@@ -261,9 +232,7 @@ class Config(Cog):
         else:
             webhook = webhooks[0]
 
-        await self.bot.db.execute(
-            "INSERT INTO username_track VALUES ($1,$2)", ctx.guild.id, webhook.url
-        )
+        await self.bot.usernames.track(ctx.guild.id, webhook.url)
         return await ctx.send_success(
             f"The bot will start tracking new available usernames in {channel.mention}"
         )
@@ -272,17 +241,12 @@ class Config(Cog):
     @has_guild_permissions(manage_guild=True)
     async def usernames_remove(self, ctx: GreedContext):
         """remove the username tracking from your server"""
-        check = await self.bot.db.fetchrow(
-            "SELECT * FROM username_track WHERE guild_id = $1", ctx.guild.id
-        )
-        if not check:
+        if ctx.guild.id not in await self.bot.usernames.load_webhooks():
             return await ctx.send_warning(
                 "Username tracking is **not** enabled in this server"
             )
 
-        await self.bot.db.execute(
-            "DELETE FROM username_track WHERE guild_id = $1", ctx.guild.id
-        )
+        await self.bot.usernames.untrack(ctx.guild.id)
         return await ctx.send_success("Disabled username tracking in this server")
 
     @command(brief="manage server", aliases=["disablecommand"])
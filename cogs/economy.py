@@ -5,14 +5,20 @@ import discord
 from discord import Embed
 from discord.ext import commands
 
+from tools.economy import Ledger
+
 
 class EconomyCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self.ledger = Ledger(bot)
 
         with open("./texts/jobs.txt", "r") as file:
             self.jobs = file.read().splitlines()
 
+    async def cog_load(self):
+        await self.ledger.setup()
+
     @commands.command(aliases=["bal"])
     async def balance(self, ctx):
         user_id = ctx.author.id
@@ -61,34 +67,11 @@ class EconomyCog(commands.Cog):
 
     @commands.command()
     async def rob(self, ctx, target: discord.Member):
-        user_id = ctx.author.id
-        target_id = target.id
-
-        target_balance = await self.bot.db.fetchval(
-            "SELECT balance FROM users WHERE user_id = $1", target_id
-        )
-        if not target_balance:
-            await ctx.send_warning("The target doesn't have an account.")
-            return
-
-        user_balance = await self.bot.db.fetchval(
-            "SELECT balance FROM users WHERE user_id = $1", user_id
+        rob_amount = await self.ledger.rob(
+            ctx.author.id, target.id, randint(1, 10) / 100
         )
 
-        rob_percentage = randint(1, 10) / 100
-        rob_amount = int(target_balance * rob_percentage)
-
-        if rob_amount > 0 and rob_amount <= user_balance:
-            await self.bot.db.execute(
-                "UPDATE users SET balance = balance + $1 WHERE user_id = $2",
-                rob_amount,
-                user_id,
-            )
-            await self.bot.db.execute(
-                "UPDATE users SET balance = balance - $1 WHERE user_id = $2",
-                rob_amount,
-                target_id,
-            )
+        if rob_amount:
             await ctx.send_success(
                 f"You robbed :money_with_wings: **{rob_amount}** from {target.display_name}!"
             )
@@ -101,11 +84,7 @@ class EconomyCog(commands.Cog):
         user_id = ctx.author.id
         income = randint(125, 4000)
         job = choice(self.jobs)
-        await self.bot.db.execute(
-            "UPDATE users SET balance = balance + $1 WHERE user_id = $2",
-            income,
-            user_id,
-        )
+        await self.ledger.credit(user_id, income)
         ctx.send_success(
             f"You worked as a **{job}** and earned **{income}** :money_with_wings:"
         )
@@ -116,11 +95,7 @@ class EconomyCog(commands.Cog):
         user_id = ctx.author.id
         income = randint(50, 200)
         job = choice(self.jobs)
-        await self.bot.db.execute(
-            "UPDATE users SET balance = balance + $1 WHERE user_id = $2",
-            income,
-            user_id,
-        )
+        await self.ledger.credit(user_id, income)
         ctx.send_success(
             f"You decided to dumpster dive and found **{income}** :money_with_wings: nasty rat.."
         )
@@ -139,16 +114,10 @@ class EconomyCog(commands.Cog):
             await ctx.send_warning("Amount must be positive.")
             return
 
-        await self.bot.db.execute(
-            "UPDATE users SET balance = balance - $1 WHERE user_id = $2",
-            amount,
-            user_id,
-        )
-        await self.bot.db.execute(
-            "UPDATE users SET bank_balance = bank_balance + $1 WHERE user_id = $2",
-            amount,
-            user_id,
-        )
+        if await self.ledger.deposit(user_id, amount) is None:
+            await ctx.send_warning("You don't have enough money to deposit.")
+            return
+
         await ctx.send_success(
             f"Deposited :money_with_wings: **{amount}** into your bank account!"
         )
@@ -157,21 +126,12 @@ class EconomyCog(commands.Cog):
     async def deposit_all(self, ctx):
         user_id = ctx.author.id
 
-        balance = await self.bot.db.fetchval(
-            "SELECT balance FROM users WHERE user_id = $1", user_id
-        )
+        balance = await self.ledger.deposit_all(user_id)
 
-        if balance <= 0:
+        if not balance:
             await ctx.send_warning("You don't have any money to deposit.")
             return
 
-        await self.bot.db.execute(
-            "UPDATE users SET bank_balance = bank_balance + balance WHERE user_id = $1",
-            user_id,
-        )
-        await self.bot.db.execute(
-            "UPDATE users SET balance = 0 WHERE user_id = $1", user_id
-        )
         await ctx.send_success(
             f"Deposited :money_with_wings: **{balance}** into your bank account!"
         )
@@ -179,51 +139,25 @@ class EconomyCog(commands.Cog):
     @commands.command()
     async def withdraw(self, ctx, amount: int):
         user_id = ctx.author.id
-        bank_balance = await self.bot.db.fetchval(
-            "SELECT bank_balance FROM users WHERE user_id = $1", user_id
-        )
-        if amount <= 0 or amount > bank_balance:
+        if amount <= 0 or await self.ledger.withdraw(user_id, amount) is None:
             await ctx.send_warning("Invalid amount or insufficient balance in bank.")
             return
 
-        await self.bot.db.execute(
-            "UPDATE users SET balance = balance + $1 WHERE user_id = $2",
-            amount,
-            user_id,
-        )
-        await self.bot.db.execute(
-            "UPDATE users SET bank_balance = bank_balance - $1 WHERE user_id = $2",
-            amount,
-            user_id,
-        )
         await ctx.send_success(
             f"Withdrew :money_with_wings: **{amount}** from your bank account!"
         )
 
     @commands.command()
     async def wealthy(self, ctx):
-        guild_id = ctx.guild.id
-        rows = await self.bot.db.fetch(
-            """
-            SELECT username, (balance + bank_balance) AS total_balance 
-            FROM users 
-            WHERE EXISTS (
-                SELECT 1 FROM members 
-                WHERE users.user_id = members.user_id AND members.guild_id = $1
-            ) 
-            ORDER BY total_balance DESC 
-            LIMIT 10
-        """,
-            guild_id,
-        )
+        rows = await self.ledger.wealthy(ctx.guild.id)
 
         if not rows:
             await ctx.send_warning("There are no users with balances in this guild.")
             return
 
         leaderboard_text = "\n".join(
-            f"{index + 1}. **{row['username']}  ${row['total_balance']}**"
-            for index, row in enumerate(rows)
+            f"{index + 1}. **{username}  ${total_balance}**"
+            for index, (username, total_balance) in enumerate(rows)
         )
         embed = discord.Embed(
             title=f"Richest users in {ctx.guild.name}",
@@ -242,33 +176,18 @@ class EconomyCog(commands.Cog):
     @commands.command()
     @commands.cooldown(1, 5, commands.BucketType.user)
     async def gamble(self, ctx, amount: int):
-        user_id = ctx.author.id
-        user_balance = await self.bot.db.fetchval(
-            "SELECT balance FROM users WHERE user_id = $1", user_id
-        )
-
         if amount <= 0:
             await ctx.send_warning("Amount must be positive.")
             return
 
-        if amount > user_balance:
+        won = randint(0, 1) == 1
+        if await self.ledger.wager(ctx.author.id, amount, won) is None:
             await ctx.send_warning("You don't have enough money to gamble.")
             return
 
-        outcome = randint(0, 1)
-        if outcome == 1:
-            await self.bot.db.execute(
-                "UPDATE users SET balance = balance + $1 WHERE user_id = $2",
-                amount,
-                user_id,
-            )
+        if won:
             await ctx.send_success(f"You won :money_with_wings: **{amount}**!")
         else:
-            await self.bot.db.execute(
-                "UPDATE users SET balance = balance - $1 WHERE user_id = $2",
-                amount,
-                user_id,
-            )
             await ctx.send_warning(f"You lost :money_with_wings: **{amount}**.")
 
     @commands.command()
@@ -277,26 +196,10 @@ class EconomyCog(commands.Cog):
             await ctx.send_warning("Invalid amount.")
             return
 
-        sender_id = ctx.author.id
-        recipient_id = recipient.id
-
-        sender_balance = await self.bot.db.fetchval(
-            "SELECT balance FROM users WHERE user_id = $1", sender_id
-        )
-        if amount > sender_balance:
+        if await self.ledger.transfer(ctx.author.id, recipient.id, amount) is None:
             await ctx.send_warning("You don't have enough balance to give.")
             return
 
-        await self.bot.db.execute(
-            "UPDATE users SET balance = balance - $1 WHERE user_id = $2",
-            amount,
-            sender_id,
-        )
-        await self.bot.db.execute(
-            "UPDATE users SET balance = balance + $1 WHERE user_id = $2",
-            amount,
-            recipient_id,
-        )
         await ctx.send_success(
             f"You gave :money_with_wings: **{amount}** to {recipient.display_name}."
         )
@@ -2,9 +2,10 @@ import asyncio
 import datetime
 import functools
 import io
+import time
 import unicodedata
-import zipfile
 from collections import defaultdict
+from contextlib import aclosing
 from io import BytesIO
 from typing import List, Tuple, Union
 
@@ -22,6 +23,7 @@ from discord.ext.commands import (
     has_guild_permissions,
 )
 
+from tools.archives import ZipExporter
 from tools.bot import Pretend
 from tools.helpers import GreedContext
 from tools.misc.views import DownloadAsset
@@ -144,18 +146,47 @@ class Emoji(Cog):
         Send a zip file of all emojis in the server
         """
 
+        if not ctx.guild.emojis:
+            return await ctx.send_warning("There are no emojis in this server")
+
         async with self.locks[ctx.guild.id]:
-            async with ctx.typing():
-                buff = BytesIO()
-                with zipfile.ZipFile(buff, "w") as zip:
-                    for emoji in ctx.guild.emojis:
-                        zip.writestr(
-                            f"{emoji.name}.{'gif' if emoji.animated else 'png'}",
-                            data=await emoji.read(),
-                        )
+            await self.send_zip(
+                ctx,
+                f"emojis-{ctx.guild.name}",
+                [
+                    (f"{e.name}.{'gif' if e.animated else 'png'}", e.read)
+                    for e in ctx.guild.emojis
+                ],
+            )
+
+    async def send_zip(self, ctx: GreedContext, prefix: str, entries: list):
+        """
+        Send the files as zips, as many as it takes to stay under the upload limit
+        """
+
+        exporter = ZipExporter(ctx.guild.filesize_limit)
+        message = await ctx.send(f"Downloading **0/{len(entries)}** files...")
+        last_edit = 0.0
 
-            buff.seek(0)
-            await ctx.send(file=File(buff, filename=f"emojis-{ctx.guild.name}.zip"))
+        async def progress(done: int, total: int):
+            nonlocal last_edit
+            if done < total and time.monotonic() - last_edit < 2:
+                return
+
+            last_edit = time.monotonic()
+            await message.edit(content=f"Downloading **{done}/{total}** files...")
+
+        # closing the export cancels the downloads if a send fails
+        async with aclosing(exporter.export(prefix, entries, progress)) as parts:
+            async for filename, part in parts:
+                with part:
+                    await ctx.send(file=File(part, filename=filename))
+
+        await message.edit(
+            content=f"Exported **{exporter.done - exporter.failed - exporter.skipped}/{exporter.total}** files"
+            + (f" ({exporter.failed} failed)" if exporter.failed else "")
+            + (f" ({exporter.skipped} too big)" if exporter.skipped else "")
+        )
 
     @command(
         name="addemoji",
@@ -397,15 +428,15 @@ class Emoji(Cog):
         Send a zip file containing the server's stickers
         """
 
+        if not ctx.guild.stickers:
+            return await ctx.send_warning("There are no stickers in this server")
+
         async with self.locks[ctx.guild.id]:
-            async with ctx.typing():
-                buff = BytesIO()
-                with zipfile.ZipFile(buff, "w") as zip:
-                    for sticker in ctx.guild.stickers:
-                        zip.writestr(f"{sticker.name}.png", data=await sticker.read())
-
-            buff.seek(0)
-            await ctx.send(file=File(buff, filename=f"stickers-{ctx.guild.name}.zip"))
+            await self.send_zip(
+                ctx,
+                f"stickers-{ctx.guild.name}",
+                [(f"{s.name}.png", s.read) for s in ctx.guild.stickers],
+            )
 
     @command(name="stickerenlarge", aliases=["stickerjumbo"])
     async def stickerenlarge(self, ctx: GreedContext):
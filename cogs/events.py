@@ -41,13 +41,6 @@ class Events(Cog):
         mes = await channel.send(**x)
         return await ctx.send_success(f"Sent the message {mes.jump_url}")
 
-    @Cog.listener()
-    async def on_command_completion(self, ctx):
-        server = ctx.guild.name if ctx.guild else "Direct Message"
-        user = ctx.author.name
-        command = ctx.message.content
-        print(f"Command '{command}' invoked by user '{user}' in server '{server}'")
-
     @Cog.listener()
     async def on_guild_channel_delete(self, channel: abc.GuildChannel):
         if channel.type.name == "text":
@@ -35,6 +35,7 @@ from discord.ui import Button, View, button
 from tools.caption import Caption
 from tools.converters import AbleToMarry
 from tools.helpers import GreedContext
+from tools.leaderboard import Leaderboard
 from tools.misc.views import MarryView
 from tools.quote import Quotes
 
@@ -671,6 +672,10 @@ class Fun(Cog):
         self.quoting = Quotes(self.bot)
         self.marry_color = 0xFF819F
         self.description = "Fun commands"
+        self.leaderboard = Leaderboard(self.bot, "gamestats", "game", ["wins"])
+
+    async def cog_load(self):
+        await self.leaderboard.setup()
 
     @command(name="quote")
     async def quote(self, ctx: GreedContext, message: discord.Message = None):
@@ -681,19 +686,16 @@ class Fun(Cog):
         Execute any of the stats commands
         """
 
-        check = await self.bot.db.fetchrow(
-            "SELECT * FROM gamestats WHERE game = $1 AND user_id = $2",
-            ctx.command.name,
-            member.id,
-        )
+        ranked = await self.leaderboard.rank(ctx.command.name, member.id)
 
-        if not check:
+        if not ranked:
             return await ctx.send_error("There are no stats recorded for this member")
 
+        rank, check = ranked
         embed = Embed(
             color=self.bot.color,
             title=f"Stats for {ctx.command.name}",
-            description=f"**Wins:** {check['wins']}\n**Loses:** {check['loses']}\n**Matches:** {check['total']}",
+            description=f"**Wins:** {check['wins']}\n**Loses:** {check['loses']}\n**Matches:** {check['total']}\n**Rank:** #{rank:,}",
         ).set_author(name=member.name, icon_url=member.display_avatar.url)
 
         return await ctx.reply(embed=embed)
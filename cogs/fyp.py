@@ -1,24 +1,25 @@
-import datetime
+import asyncio
 import io
 import json
+import logging
 import random
-from datetime import datetime, timedelta, timezone
+from collections import deque
+from datetime import datetime
+from typing import Deque, Optional, Tuple
 
 import aiohttp
 import discord
-import requests
 from discord.ext import commands
 
-session = requests.Session()
+log = logging.getLogger(__name__)
 
 
-async def for_you():
+async def for_you(session: aiohttp.ClientSession):
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                "http://undefined.rip/api/1.0/tiktok/EN"
-            ) as feed_request:
-                res = await feed_request.json()
+        async with session.get(
+            "http://undefined.rip/api/1.0/tiktok/EN"
+        ) as feed_request:
+            res = await feed_request.json(content_type=None)
         videos = []
         for vid in res:
             formatted_video_data = await video_data_formatter(vid)
@@ -67,25 +68,86 @@ async def video_data_formatter(video_data):
 
 
 class poster(commands.Cog):
-    def __init__(self, bot: commands.AutoShardedBot):
+    def __init__(
+        self,
+        bot: commands.AutoShardedBot,
+        pool_size: int = 5,
+        max_size: int = 25 * 1024 * 1024,
+    ):
         self.bot = bot
+        self.max_size = max_size
+        self.pool: asyncio.Queue[Tuple[dict, bytes]] = asyncio.Queue(pool_size)
+        self.feed: Deque[dict] = deque()
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.worker: Optional[asyncio.Task] = None
+
+    async def cog_load(self):
+        self.session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=60))
+        self.worker = asyncio.create_task(self.refill())
+
+    async def cog_unload(self):
+        if self.worker:
+            self.worker.cancel()
+        if self.session:
+            await self.session.close()
+
+    async def download(self, url: str) -> Optional[bytes]:
+        """
+        Download a video, giving up on anything over the size cap
+        """
+
+        buffer = io.BytesIO()
+        async with self.session.get(url) as r:
+            if r.status != 200:
+                return None
+            if r.content_length and r.content_length > self.max_size:
+                return None
+            async for chunk in r.content.iter_chunked(256 * 1024):
+                buffer.write(chunk)
+                if buffer.tell() > self.max_size:
+                    return None
+        return buffer.getvalue()
+
+    async def refill(self):
+        """
+        Keep the pool of ready videos full, one download at a time
+        """
+
+        while True:
+            try:
+                if not self.feed:
+                    videos = await for_you(self.session) or []
+                    random.shuffle(videos)
+                    self.feed.extend(videos)
+                    if not self.feed:
+                        await asyncio.sleep(30)
+                        continue
+
+                data = self.feed.popleft()
+                if video := await self.download(data["download_urls"]["no_watermark"]):
+                    # waits here while the pool is full
+                    await self.pool.put((data, video))
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                log.exception("Couldn't prefetch a fyp video")
+                await asyncio.sleep(30)
 
     @commands.command(description="shows a for you tiktok video", help="utility")
     @commands.cooldown(1, 5, commands.BucketType.user)
     async def fyp(self, ctx):
         async with ctx.typing():
-            fyp_videos = await for_you()
-            videos = []
-            for video in fyp_videos:
-                videos.append(video)
-            data = random.choice(videos)
-            download = data["download_urls"]["no_watermark"]
-            async with aiohttp.ClientSession() as session:
-                async with session.get(download) as r:
-                    downloaded_data = await r.read()
-            file = discord.File(
-                io.BytesIO(downloaded_data), filename=f"{self.bot.user.name}.mp4"
-            )
+            limit = ctx.guild.filesize_limit if ctx.guild else 25 * 1024 * 1024
+            try:
+                data, video = await asyncio.wait_for(self.pool.get(), 30)
+                while len(video) > limit:
+                    data, video = await asyncio.wait_for(self.pool.get(), 30)
+            except asyncio.TimeoutError:
+                return await ctx.send_warning(
+                    "Couldn't get a video right now, try again later"
+                )
+
+            file = discord.File(io.BytesIO(video), filename=f"{self.bot.user.name}.mp4")
             comments = "{:,}".format(data["stats"]["comment_count"])
             likes = "{:,}".format(data["stats"]["likes"])
             shares = "{:,}".format(data["stats"]["shares"])
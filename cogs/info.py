@@ -141,15 +141,6 @@ class Info(Cog):
             view.add_item(button2)
             await ctx.reply(embed=e, view=view, mention_author=False)
 
-    @Cog.listener()
-    async def on_command_completion(self, ctx: GreedContext):
-        await self.bot.db.execute("""
-            INSERT INTO metrics (command_usage)
-            VALUES (1)
-            ON CONFLICT (command_usage)
-            DO UPDATE SET command_usage = metrics.command_usage + 1
-        """)
-
     @command(name="status")
     async def status(self, ctx: GreedContext):
         """Displays bot statistics."""
@@ -167,8 +158,7 @@ class Info(Cog):
         shard_id = ctx.guild.shard_id if ctx.guild else 0
         shard_count = self.bot.shard_count
 
-        result = await self.bot.db.fetchrow("SELECT command_usage FROM metrics")
-        commands_executed = result["command_usage"] if result else 0
+        commands_executed = await self.bot.metrics.total()
         # Send statistics embed
         embed = discord.Embed(color=self.bot.color)
         embed.add_field(name="Uptime", value=self.bot.uptime, inline=True)
@@ -176,7 +166,9 @@ class Info(Cog):
         embed.add_field(name="Memory Usage", value=f"{final_memory} GB", inline=False)
         embed.add_field(name="Shard ID", value=str(shard_id), inline=True)
         embed.add_field(name="Shard Count", value=str(shard_count), inline=True)
-        embed.add_field(name="Commands Executed", value=commands_executed, inline=True)
+        embed.add_field(
+            name="Commands Executed", value=f"{commands_executed:,}", inline=True
+        )
         await ctx.send(embed=embed)
 
     @hybrid_command()
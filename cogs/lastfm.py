@@ -23,6 +23,16 @@ class Lastfm(Cog):
         self.lastfmhandler = Handler("43693facbb24d1ac893a7d33846b15cc")
         self.spotify = Spotify(self.bot)
 
+    async def cog_load(self):
+        self.bot.pipeline.add(
+            "lastfm.customcommand",
+            self.customcommad_listener,
+            check=lambda m: not m.author.bot,
+        )
+
+    async def cog_unload(self):
+        self.bot.pipeline.remove("lastfm.customcommand")
+
     async def lastfm_replacement(self, user: str, params: str) -> Dict[str, str]:
         a = await self.lastfmhandler.get_tracks_recent(user, 1)
         userinfo = await self.lastfmhandler.get_user_info(user)
@@ -77,7 +87,6 @@ class Lastfm(Cog):
 
         return params_dict
 
-    @Cog.listener("on_message")
     async def customcommad_listener(self, message: Message):
         if message.guild:
             if not message.author.bot:
@@ -1,174 +1,207 @@
+import asyncio
+import logging
+import os
 import sqlite3
+from collections import Counter
 from io import BytesIO
+from typing import Dict, List, Optional, Tuple
 
 import discord
-import requests
-from discord.ext import commands
+from discord.ext import commands, tasks
 from PIL import Image, ImageDraw, ImageFont
 
+SQLITE_PATH = "/home/ubuntu/greedrecodetotallynotpretend/leaderboard.db"
+BACKGROUND_PATH = "/home/ubuntu/greedrecodetotallynotpretend/images/black.jpg"
+FONT_PATH = "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf"
+
+log = logging.getLogger(__name__)
+
 
 class Leaderboard(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.db = Database("/home/ubuntu/greedrecodetotallynotpretend/leaderboard.db")
+        self.pending: Counter = Counter()
+        self.flush_lock = asyncio.Lock()
+        self.background: Optional[Image.Image] = None
+
+    async def cog_load(self):
+        await self.bot.db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS message_counts (
+              guild_id BIGINT NOT NULL,
+              user_id BIGINT NOT NULL,
+              count BIGINT NOT NULL DEFAULT 0,
+              PRIMARY KEY (guild_id, user_id)
+            )
+            """
+        )
+        await self.bot.db.execute(
+            "CREATE INDEX IF NOT EXISTS message_counts_guild_count_idx ON message_counts (guild_id, count DESC)"
+        )
+        await self.import_sqlite()
+        self.bot.pipeline.add("lead", self.on_message, check=lambda m: not m.author.bot)
+        self.flush_counts.start()
 
-    @commands.Cog.listener()
-    async def on_message(self, message):
-        if message.author.bot:
-            return
+    async def cog_unload(self):
+        self.bot.pipeline.remove("lead")
+        self.flush_counts.cancel()
+        await self.flush()
 
-        try:
-            guild_id = str(message.guild.id)
-            user_id = str(message.author.id)
+    async def import_sqlite(self):
+        """
+        Move the counts from the old sqlite store into postgres once
+        """
 
-            # Increment the message count for the user in the guild data
-            self.db.increment_user_message_count(guild_id, user_id)
+        if not os.path.exists(SQLITE_PATH):
+            return
 
-        except Exception as e:
-            print(f"An error occurred while processing a message: {e}")
+        async with self.bot.db.transaction() as conn:
+            if await conn.fetchval("SELECT EXISTS (SELECT 1 FROM message_counts)"):
+                return
 
-    @commands.command(aliases=["lb", "lead"])
-    async def leaderboard(self, ctx):
-        guild_id = str(ctx.guild.id)
-        guild_data = self.db.get_guild_data(guild_id)
+            def read():
+                with sqlite3.connect(SQLITE_PATH) as db:
+                    return db.execute(
+                        "SELECT guild_id, user_id, message_count FROM user_data"
+                    ).fetchall()
 
-        if not guild_data:
-            await ctx.send("No messages found for this guild.")
-            return
+            try:
+                rows = await asyncio.to_thread(read)
+            except sqlite3.Error:
+                return
+
+            await conn.executemany(
+                "INSERT INTO message_counts VALUES ($1, $2, $3) ON CONFLICT DO NOTHING",
+                [(int(g), int(u), c) for g, u, c in rows],
+            )
 
-        sorted_data = self.db.get_top_users(guild_id, 10)
+    async def on_message(self, message):
+        self.pending[(message.guild.id, message.author.id)] += 1
+
+    async def flush(self):
+        """
+        Write the counted messages to the database in one batch
+        """
+
+        async with self.flush_lock:
+            if not self.pending:
+                return
+
+            pending, self.pending = self.pending, Counter()
+            try:
+                async with self.bot.db.transaction() as conn:
+                    await conn.executemany(
+                        """
+                        INSERT INTO message_counts VALUES ($1, $2, $3)
+                        ON CONFLICT (guild_id, user_id)
+                        DO UPDATE SET count = message_counts.count + EXCLUDED.count
+                        """,
+                        [(g, u, c) for (g, u), c in pending.items()],
+                    )
+            except Exception:
+                # keep the counts for the next flush, and keep the loop running
+                self.pending.update(pending)
+                log.exception("Couldn't flush the message counts")
+
+    @tasks.loop(seconds=30)
+    async def flush_counts(self):
+        await self.flush()
+
+    async def get_avatar(self, member: discord.Member) -> Optional[bytes]:
+        key = f"lead-avatar-{member.display_avatar.key}"
+        if data := self.bot.cache.get(key):
+            return data
 
-        # Create a new image with a custom background
-        background_path = "/home/ubuntu/greedrecodetotallynotpretend/images/black.jpg"
         try:
-            background_img = Image.open(background_path).convert("RGBA")
-        except FileNotFoundError:
-            await ctx.send("Background image not found.")
-            return
+            data = await member.display_avatar.replace(size=128, format="png").read()
+        except discord.HTTPException:
+            return None
 
-        # Resize background image to fit the leaderboard
-        background_img = background_img.resize((1000, 1085))
+        return await self.bot.cache.set(key, data, 3600)
 
-        # Create a new image using the background image
-        img = Image.new("RGBA", (1000, 1085), color=(0, 0, 0, 0))
-        img.paste(background_img, (0, 0), background_img)
+    def render(self, rows: List[Tuple[int, str, int, Optional[bytes]]]) -> BytesIO:
+        """
+        Draw the leaderboard card. Runs in a thread
+        """
 
-        draw = ImageDraw.Draw(img)
+        if self.background is None:
+            self.background = (
+                Image.open(BACKGROUND_PATH).convert("RGBA").resize((1000, 1085))
+            )
 
-        # Load font
-        font_path = "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf"
-        font = ImageFont.truetype(font_path, size=24)
+        img = Image.new("RGBA", (1000, 1085), color=(0, 0, 0, 0))
+        img.paste(self.background, (0, 0), self.background)
+        draw = ImageDraw.Draw(img)
+        font = ImageFont.truetype(FONT_PATH, size=24)
 
-        # Draw leaderboard text
         y = 10
-        for index, (user_id, message_count) in enumerate(sorted_data, start=1):
-            if index > 10:  # Break loop if more than 10 users
-                break
-            member = ctx.guild.get_member(int(user_id))
-            if member and member.avatar and member.display_name:
-                # Get user's avatar
-                avatar_url = member.avatar
-                response = requests.get(avatar_url)
-                avatar_img = Image.open(BytesIO(response.content))
+        for index, name, message_count, avatar in rows:
+            if avatar:
+                avatar_img = Image.open(BytesIO(avatar)).convert("RGBA")
                 avatar_img = avatar_img.resize((100, 100))
-
-                # Ensure the avatar image mode is RGBA for transparency
-                if avatar_img.mode != "RGBA":
-                    avatar_img = avatar_img.convert("RGBA")
-
-                # Paste user's avatar
                 img.paste(avatar_img, (10, y), avatar_img)
 
-                # Draw user's display name and message count
-                draw.text(
-                    (120, y + 25),
-                    f"{index}. {member.display_name}: {message_count} messages",
-                    fill="white",
-                    font=font,
-                )
+            draw.text(
+                (120, y + 25),
+                f"{index}. {name}: {message_count} messages",
+                fill="white",
+                font=font,
+            )
+            y += 120
 
-                y += 120
+        buffer = BytesIO()
+        img.save(buffer, format="png")
+        buffer.seek(0)
+        return buffer
 
-        # Save image
-        img.save(
-            "/home/ubuntu/greedrecodetotallynotpretend/images/leaderboard_image.png"
+    @commands.command(aliases=["lb", "lead"])
+    async def leaderboard(self, ctx):
+        await self.flush()
+        async with self.bot.db.transaction() as conn:
+            results = await conn.fetch(
+                """
+                SELECT user_id, count FROM message_counts
+                WHERE guild_id = $1
+                ORDER BY count DESC
+                LIMIT 10
+                """,
+                ctx.guild.id,
+            )
+
+        if not results:
+            await ctx.send("No messages found for this guild.")
+            return
+
+        members = [
+            (index, member, result["count"])
+            for index, result in enumerate(results, start=1)
+            if (member := ctx.guild.get_member(result["user_id"]))
+        ]
+        avatars: Dict[int, Optional[bytes]] = dict(
+            zip(
+                [m.id for _, m, _ in members],
+                await asyncio.gather(*(self.get_avatar(m) for _, m, _ in members)),
+            )
         )
+        rows = [
+            (index, member.display_name, count, avatars[member.id])
+            for index, member, count in members
+        ]
+
+        try:
+            image = await asyncio.to_thread(self.render, rows)
+        except FileNotFoundError:
+            await ctx.send("Background image not found.")
+            return
 
-        # Create and send embed
         embed = discord.Embed(
             description=f"> **{ctx.guild.name}'s** top 10 leaderboard",
             color=self.bot.color,
         )
         await ctx.send(
             embed=embed,
-            file=discord.File(
-                "/home/ubuntu/greedrecodetotallynotpretend/images/leaderboard_image.png"
-            ),
-        )
-
-
-class Database:
-    def __init__(self, db_file):
-        self.conn = sqlite3.connect(db_file)
-        self.create_tables()
-
-    def create_tables(self):
-        cursor = self.conn.cursor()
-        cursor.execute("""CREATE TABLE IF NOT EXISTS guild_data (
-                            guild_id TEXT PRIMARY KEY,
-                            total_messages INTEGER
-                          )""")
-        cursor.execute("""CREATE TABLE IF NOT EXISTS user_data (
-                            guild_id TEXT,
-                            user_id TEXT,
-                            message_count INTEGER,
-                            PRIMARY KEY (guild_id, user_id),
-                            FOREIGN KEY (guild_id) REFERENCES guild_data(guild_id)
-                          )""")
-        self.conn.commit()
-
-    def increment_user_message_count(self, guild_id, user_id):
-        cursor = self.conn.cursor()
-        cursor.execute(
-            """INSERT OR IGNORE INTO guild_data (guild_id, total_messages)
-                          VALUES (?, 0)""",
-            (guild_id,),
-        )
-        cursor.execute(
-            """INSERT OR IGNORE INTO user_data (guild_id, user_id, message_count)
-                          VALUES (?, ?, 0)""",
-            (guild_id, user_id),
-        )
-        cursor.execute(
-            """UPDATE user_data SET message_count = message_count + 1
-                          WHERE guild_id = ? AND user_id = ?""",
-            (guild_id, user_id),
-        )
-        cursor.execute(
-            """UPDATE guild_data SET total_messages = total_messages + 1
-                          WHERE guild_id = ?""",
-            (guild_id,),
-        )
-        self.conn.commit()
-
-    def get_guild_data(self, guild_id):
-        cursor = self.conn.cursor()
-        cursor.execute(
-            """SELECT total_messages FROM guild_data WHERE guild_id = ?""", (guild_id,)
-        )
-        result = cursor.fetchone()
-        return result[0] if result else None
-
-    def get_top_users(self, guild_id, limit):
-        cursor = self.conn.cursor()
-        cursor.execute(
-            """SELECT user_id, message_count FROM user_data
-                          WHERE guild_id = ?
-                          ORDER BY message_count DESC
-                          LIMIT ?""",
-            (guild_id, limit),
+            file=discord.File(image, filename="leaderboard_image.png"),
         )
-        return cursor.fetchall()
 
 
 async def setup(bot):
@@ -16,6 +16,8 @@ from discord.ext.commands import (
 from tools.bot import Pretend
 from tools.converters import LevelMember, NewRoleConverter
 from tools.helpers import GreedContext
+from tools.leaderboard import Leaderboard
+from tools.pipeline import Feature
 from tools.predicates import leveling_enabled
 
 
@@ -25,6 +27,16 @@ class Leveling(Cog):
         self.description = "Leveling commands"
         self.levelcd = CooldownMapping.from_cooldown(3, 3, BucketType.member)
         self.locks = defaultdict(asyncio.Lock)
+        self.leaderboard = Leaderboard(bot, "level_user", "guild_id", ["level", "xp"])
+
+    async def cog_load(self):
+        self.bot.pipeline.add(
+            "leveling", self.on_message, Feature.LEVELING, lambda m: not m.author.bot
+        )
+        await self.leaderboard.setup()
+
+    async def cog_unload(self):
+        self.bot.pipeline.remove("leveling")
 
     async def level_replace(self, member: Member, params: str):
         """
@@ -73,7 +85,6 @@ class Leveling(Cog):
             ]
             await asyncio.gather(*tasks)
 
-    @Cog.listener()
     async def on_message(self, message: Message):
         if not message.author.bot:
             if res := await self.bot.db.fetchrow(
@@ -185,24 +196,18 @@ class Leveling(Cog):
         get the rank of a member
         """
 
-        level = await self.bot.db.fetchrow(
-            """
-        SELECT * FROM level_user
-        WHERE guild_id = $1
-        AND user_id = $2
-        """,
-            ctx.guild.id,
-            member.id,
-        )
-        if not level:
+        ranked = await self.leaderboard.rank(ctx.guild.id, member.id)
+        if not ranked:
             return await ctx.send_warning("This member doesn't have a rank recorded")
 
+        position, level = ranked
+
         embed = Embed(color=self.bot.color)
         embed.set_author(name=str(member), icon_url=member.display_avatar.url)
         embed.set_thumbnail(url=member.display_avatar.url)
         embed.add_field(
             name="Statistics",
-            value=f"Level: `{level['level']}`\nXP: `{level['xp']}`/`{level['target_xp']}`",
+            value=f"Rank: `#{position:,}`\nLevel: `{level['level']}`\nXP: `{level['xp']}`/`{level['target_xp']}`",
         )
         return await ctx.send(embed=embed)
 
@@ -481,6 +486,7 @@ class Leveling(Cog):
                 int((100 * level + 1) ** 0.9),
             )
 
+        self.leaderboard.invalidate(ctx.guild.id)
         await ctx.send_success(
             f"Set the level for {member.mention} to **Level {level}**"
         )
@@ -503,6 +509,7 @@ class Leveling(Cog):
                 await interaction.client.db.execute(
                     "DELETE FROM level_user WHERE guild_id = $1", interaction.guild.id
                 )
+                self.leaderboard.invalidate(interaction.guild.id)
                 return await interaction.response.edit_message(
                     embed=Embed(
                         color=interaction.client.yes_color,
@@ -521,6 +528,7 @@ class Leveling(Cog):
                     interaction.guild.id,
                     member.id,
                 )
+                self.leaderboard.invalidate(interaction.guild.id)
                 return await interaction.response.edit_message(
                     embed=Embed(
                         color=interaction.client.yes_color,
@@ -540,18 +548,15 @@ class Leveling(Cog):
         returns a top leaderboard for leveling
         """
 
-        results = await self.bot.db.fetch(
-            "SELECT * FROM level_user WHERE guild_id = $1", ctx.guild.id
-        )
-
-        def sorting(c):
-            return c["level"], c["xp"]
+        pages = await self.leaderboard.pages(ctx.guild.id)
+        if not pages:
+            return await ctx.send_warning("Nobody has a level recorded in this server")
 
-        members = sorted(results, key=sorting, reverse=True)
         await ctx.paginate(
             [
                 f"**{ctx.guild.get_member(m['user_id']) or m['user_id']}** has level **{m['level']}** ({m['xp']:,} xp)"
-                for m in members
+                for page in pages
+                for m in page
             ],
             "Level leaderboard",
             {"name": ctx.guild.name, "icon_url": ctx.guild.icon},
@@ -45,19 +45,6 @@ class Moderation(Cog):
         self.locks = defaultdict(asyncio.Lock)
         self.role_lock = defaultdict(asyncio.Lock)
 
-    @Cog.listener()
-    async def on_member_join(self, member: Member):
-        if await self.bot.db.fetchrow(
-            "SELECT * FROM jail_members WHERE guild_id = $1 AND user_id = $2",
-            member.guild.id,
-            member.id,
-        ):
-            if re := await self.bot.db.fetchrow(
-                "SELECT role_id FROM jail WHERE guild_id = $1", member.guild.id
-            ):
-                if role := member.guild.get_role(re[0]):
-                    await member.add_roles(role, reason="member jailed")
-
     @Cog.listener()
     async def on_member_remove(self, member: Member):
         await self.bot.redis.set(
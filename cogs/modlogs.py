@@ -1,6 +1,6 @@
 # TODO: Yurrion, please check issue no. 3 on github (https://github.com/ErisServices/GreedBot/issues/3)
 
-from asyncio import ensure_future, sleep
+from asyncio import ensure_future
 from datetime import datetime
 from typing import Any, Optional, Union
 
@@ -67,9 +67,7 @@ async def log_event(
     )
     if footer != None:
         embed.set_footer(text=footer)
-    if await bot.ratelimiter.ratelimit(f"logs:{channel.guild.id}", 2, 5) != False:
-        await sleep(5)
-    await channel.send(channel, embed=embed)
+    bot.logs.push(channel.guild, embed)
 
 
 class LogStatus(BaseModel):
@@ -81,6 +79,10 @@ class ModLogs(commands.Cog):
     def __init__(self, bot: Pretend):
         self.bot = bot
         self.invites = {}
+        self.bot.audit.subscribe(self.on_audit_log_entry_create)
+
+    async def cog_unload(self):
+        self.bot.audit.unsubscribe(self.on_audit_log_entry_create)
 
     @commands.Cog.listener("on_ready")
     async def cache_all(self):
@@ -96,26 +98,17 @@ class ModLogs(commands.Cog):
             g = guild.id
         else:
             g = guild
-        data = await self.bot.db.fetchrow(
-            """SELECT channel_id FROM modlogs WHERE guild_id = $1""", g
-        )
-        if not data:
+        channel_id = await self.bot.logs.channel_id(g)
+        if not channel_id:
             data = {"enabled": False, "channel_id": None}
         else:
-            data = {"enabled": True, "channel_id": int(data["channel_id"])}
+            data = {"enabled": True, "channel_id": channel_id}
         #     if g == 1203397622325583944:
         #          await (self.bot.get_channel(1203397624024137760)).send(data)
         return LogStatus(**data)
 
     async def send(self, channel: discord.TextChannel, **kwargs):
-        if (
-            await self.bot.ratelimiter.ratelimit(f"logs:{channel.guild.id}", 2, 5)
-            != False
-        ):
-            await sleep(5)
-        #       if channel.guild.id == 1203397622325583944:
-        #            await (self.bot.get_channel(1203397624024137760)).send(f"sending mod log for {kwargs['embed'].description}")
-        return await channel.send(**kwargs)
+        self.bot.logs.push(channel.guild, kwargs["embed"])
 
     @commands.Cog.listener()
     async def on_member_join(self, member: discord.Member):
@@ -182,6 +175,7 @@ class ModLogs(commands.Cog):
                 await self.bot.db.execute(
                     """DELETE FROM modlogs WHERE guild_id = $1""", ctx.guild.id
                 )
+                self.bot.logs.set_channel(ctx.guild.id, None)
                 return await ctx.send_success(f"mod logs are now **disabled**")
         else:
             if state == True:
@@ -190,6 +184,7 @@ class ModLogs(commands.Cog):
                     ctx.guild.id,
                     channel.id,
                 )
+                self.bot.logs.set_channel(ctx.guild.id, channel.id)
                 ensure_future(self.set_guild_invites(ctx.guild))
                 return await ctx.send_success(f"mod logs are now **enabled**")
             else:
@@ -202,6 +197,7 @@ class ModLogs(commands.Cog):
                     ctx.guild.id,
                     channel.id,
                 )
+                self.bot.logs.invalidate(ctx.guild.id)
                 return await ctx.send_success(f"mod logs are now **disabled**")
 
     @commands.command(
@@ -416,7 +412,6 @@ class ModLogs(commands.Cog):
             message=message,
         )
 
-    @commands.Cog.listener()
     async def on_audit_log_entry_create(self, entry: discord.AuditLogEntry):
         async def default_handler(entry):
             pass
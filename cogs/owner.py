@@ -3,6 +3,7 @@ import copy
 import datetime
 import importlib
 import json
+import logging
 import os
 import random
 import string  # type: ignore
@@ -30,6 +31,9 @@ from pydantic import BaseModel  # type: ignore
 
 from tools.bot import Pretend
 from tools.helpers import GreedContext
+from tools.shards import ShardCounters
+
+log = logging.getLogger(__name__)
 
 
 def donor_perms():
@@ -115,27 +119,58 @@ async def get_shard_info(api: API, path: str):
 class Owner(Cog):
     def __init__(self, bot: Pretend):
         self.bot = bot
+        self.counters = ShardCounters()
         self.shard_stats.start()
+        self.reconcile_shards.start()
         self.change_status.start()
         self.update_shards_info.start()
 
+    async def cog_load(self):
+        # one session for the shard posts instead of a new one every 30s
+        self.session = aiohttp.ClientSession()
+
+    async def cog_unload(self):
+        self.shard_stats.cancel()
+        self.reconcile_shards.cancel()
+        self.update_shards_info.cancel()
+        await self.session.close()
+
     @tasks.loop(seconds=10)
     async def shard_stats(self):
         import orjson  # type: ignore
 
+        if not self.counters.ready:
+            self.counters.reconcile(self.bot.guilds)
+
         shards = {}
         for shard_id, shard in self.bot.shards.items():
-            guilds = [g for g in self.bot.guilds if g.shard_id == shard_id]
-            users = sum(list(map(lambda g: g.member_count, guilds)))
             shards[str(shard_id)] = {
                 "shard_id": shard_id,
                 "shard_name": f"Shard {shard_id}",
                 "shard_ping": round(shard.latency * 1000),
-                "shard_guild_count": f"{len(guilds):,}",
-                "shard_user_count": f"{users:,}",
-                "shard_guilds": [str(g.id) for g in guilds],
+                "shard_guild_count": f"{self.counters.guild_count(shard_id):,}",
+                "shard_user_count": f"{self.counters.member_count(shard_id):,}",
+                "shard_guilds": self.counters.guild_ids(shard_id),
             }
-        await self.bot.redis.set("shards", orjson.dumps(shards))
+
+        async with self.bot.redis.pipeline(transaction=False) as pipe:
+            pipe.set("shards", orjson.dumps(shards))
+            pipe.set("shards:updated", int(datetime.datetime.now().timestamp()))
+            await pipe.execute()
+
+    @shard_stats.before_loop
+    async def before_shard_stats(self):
+        await self.bot.wait_until_ready()
+
+    @tasks.loop(minutes=10)
+    async def reconcile_shards(self):
+        """recount the shard counters from the guild cache in case an event was missed"""
+        if drift := self.counters.reconcile(self.bot.guilds):
+            log.warning("Shard member counters drifted by %s, recounted", drift)
+
+    @reconcile_shards.before_loop
+    async def before_reconcile_shards(self):
+        await self.bot.wait_until_ready()
 
     @tasks.loop(seconds=30)
     async def update_shards_info(self):
@@ -145,19 +180,16 @@ class Owner(Cog):
         ):
             return
 
+        if not self.counters.ready:
+            return
+
         shards_info = []
         for shard_id, shard in self.bot.shards.items():
             shard_info = {
                 "shard_id": shard_id,
                 "is_ready": not shard.is_closed(),
-                "server_count": sum(
-                    1 for guild in self.bot.guilds if guild.shard_id == shard_id
-                ),
-                "member_count": sum(
-                    guild.member_count
-                    for guild in self.bot.guilds
-                    if guild.shard_id == shard_id
-                ),
+                "server_count": self.counters.guild_count(shard_id),
+                "member_count": self.counters.member_count(shard_id),
                 "uptime": self.bot.uptime,
                 "latency": shard.latency,
                 "last_updated": datetime.datetime.now()
@@ -169,18 +201,21 @@ class Owner(Cog):
         data = {"shards": shards_info}
         json_data = json.dumps(data, indent=2)
 
-        async with aiohttp.ClientSession() as session:
-            headers = {"api-key": self.pretend_api, "Content-Type": "application/json"}
-            async with session.post(
+        headers = {"api-key": self.pretend_api, "Content-Type": "application/json"}
+        try:
+            async with self.session.post(
                 "https://v1.pretend.best/shards/greed/post",
                 data=json_data,
                 headers=headers,
             ) as response:
                 if response.status == 200:
-                    print("Shards info posted successfully!")
+                    log.info("Shards info posted successfully")
                 else:
-                    print(f"Error posting shards info: {response.status}")
-                    print(json_data)
+                    log.warning(
+                        "Error posting shards info: %s %s", response.status, json_data
+                    )
+        except aiohttp.ClientError:
+            log.warning("Couldn't post the shards info", exc_info=True)
 
     async def add_donor_role(self, member: User):
         """add the donor role to a donator"""
@@ -200,6 +235,7 @@ class Owner(Cog):
 
     @Cog.listener()
     async def on_member_join(self, member: Member):
+        self.counters.member_join(member.guild)
         reason = await self.bot.db.fetchval(
             "SELECT reason FROM globalban WHERE user_id = $1", member.id
         )
@@ -256,6 +292,7 @@ class Owner(Cog):
 
     @Cog.listener()
     async def on_member_remove(self, member: Member):
+        self.counters.member_remove(member.guild)
         if member.guild.id == 1215100684978880512:
             check = await self.bot.db.fetchrow(
                 "SELECT * FROM donor WHERE user_id = $1 AND status = $2",
@@ -308,8 +345,13 @@ class Owner(Cog):
                         "DELETE FROM donor WHERE user_id = $1", before.id
                     )
 
+    @Cog.listener()
+    async def on_guild_remove(self, guild: Guild):
+        self.counters.guild_remove(guild)
+
     @Cog.listener()
     async def on_guild_join(self, guild: Guild):
+        self.counters.guild_join(guild)
         check = await self.bot.db.fetchrow(
             "SELECT * FROM blacklist WHERE id = $1 AND type = $2", guild.id, "server"
         )
@@ -1,5 +1,7 @@
+import asyncio
 import json
 import os
+from typing import Dict, Set
 
 import discord
 from discord.ext import commands
@@ -10,6 +12,21 @@ class SkullCog(commands.Cog):
         self.bot = bot
         self.file_path = "/home/ubuntu/greedrecodetotallynotpretend/events/skulls.json"
         self.ensure_file_exists()
+        self.targets: Dict[str, Set[str]] = {
+            guild_id: set(server["skull_users"])
+            for guild_id, server in self.load_data()["servers"].items()
+        }
+        self.save_lock = asyncio.Lock()
+
+    async def cog_load(self):
+        self.bot.pipeline.add(
+            "skulls",
+            self.on_message,
+            check=lambda m: str(m.author.id) in self.targets.get(str(m.guild.id), ()),
+        )
+
+    async def cog_unload(self):
+        self.bot.pipeline.remove("skulls")
 
     def ensure_file_exists(self):
         if not os.path.exists(self.file_path):
@@ -18,17 +35,17 @@ class SkullCog(commands.Cog):
 
     async def log_servers(self):
         await self.bot.wait_until_ready()
-        current_servers = {guild.id: {"skull_users": []} for guild in self.bot.guilds}
-        data = {"servers": current_servers}
-        self.save_data(data)
+        for guild in self.bot.guilds:
+            self.targets.setdefault(str(guild.id), set())
+
+        await self.persist()
 
     @commands.Cog.listener()
     async def on_guild_join(self, guild):
-        data = self.load_data()
         guild_id = str(guild.id)
-        if guild_id not in data["servers"]:
-            data["servers"][guild_id] = {"skull_users": []}
-            self.save_data(data)
+        if guild_id not in self.targets:
+            self.targets[guild_id] = set()
+            await self.persist()
 
     @commands.group()
     async def skull(self, ctx):
@@ -42,14 +59,10 @@ class SkullCog(commands.Cog):
         if ctx.guild is None:
             return await ctx.send("This command can only be used in a server.")
 
-        data = self.load_data()
-        guild_id = str(ctx.guild.id)
-        if guild_id not in data["servers"]:
-            data["servers"][guild_id] = {"skull_users": []}
-
-        if str(user.id) not in data["servers"][guild_id]["skull_users"]:
-            data["servers"][guild_id]["skull_users"].append(str(user.id))
-            self.save_data(data)
+        users = self.targets.setdefault(str(ctx.guild.id), set())
+        if str(user.id) not in users:
+            users.add(str(user.id))
+            await self.persist()
             await ctx.send(embed=self.generate_embed(user, added=True))
         else:
             await ctx.send(f"{user.name} is already in the skull list.")
@@ -60,30 +73,19 @@ class SkullCog(commands.Cog):
         if ctx.guild is None:
             return await ctx.send("This command can only be used in a server.")
 
-        data = self.load_data()
-        guild_id = str(ctx.guild.id)
-        if guild_id not in data["servers"]:
+        users = self.targets.get(str(ctx.guild.id))
+        if users is None:
             return await ctx.send(
                 "There are no users in the skull list for this server."
             )
 
-        if str(user.id) in data["servers"][guild_id]["skull_users"]:
-            data["servers"][guild_id]["skull_users"].remove(str(user.id))
-            self.save_data(data)
+        if str(user.id) in users:
+            users.discard(str(user.id))
+            await self.persist()
             await ctx.send(embed=self.generate_embed(user, added=False))
         else:
             await ctx.send(f"{user.name} is not in the skull list for this server.")
 
-    async def skull_message(self, message):
-        if not message.guild:
-            return
-
-        data = self.load_data()
-        guild_id = str(message.guild.id)
-        if guild_id in data["servers"]:
-            if str(message.author.id) in data["servers"][guild_id]["skull_users"]:
-                await message.add_reaction("☠️")
-
     def generate_embed(self, user, added=True):
         action = "added to" if added else "removed from"
         embed = discord.Embed(
@@ -114,19 +116,29 @@ class SkullCog(commands.Cog):
             return json.load(f)
 
     def save_data(self, data):
-        with open(self.file_path, "w") as f:
+        # write a temporary file and swap it in so a crash never leaves half a file
+        temp = f"{self.file_path}.tmp"
+        with open(temp, "w") as f:
             json.dump(data, f, indent=4)
 
-    @commands.Cog.listener()
+        os.replace(temp, self.file_path)
+
+    async def persist(self):
+        """
+        Save the skull lists to disk from a thread
+        """
+
+        async with self.save_lock:
+            data = {
+                "servers": {
+                    guild_id: {"skull_users": sorted(users)}
+                    for guild_id, users in self.targets.items()
+                }
+            }
+            await asyncio.to_thread(self.save_data, data)
+
     async def on_message(self, message):
-        if not message.guild:
-            return
-
-        data = self.load_data()
-        guild_id = str(message.guild.id)
-        if guild_id in data["servers"]:
-            if str(message.author.id) in data["servers"][guild_id]["skull_users"]:
-                await message.add_reaction("☠️")
+        await message.add_reaction("☠️")
 
 
 async def setup(bot):
@@ -1,3 +1,6 @@
+from collections import defaultdict
+from typing import Dict, Set
+
 import discord
 from discord.ext import commands
 from discord.ext.commands import Cog, command, group
@@ -9,6 +12,23 @@ from tools.helpers import GreedContext
 class Sob(commands.Cog):
     def __init__(self, bot: Pretend):
         self.bot = bot
+        self.targets: Dict[int, Set[int]] = defaultdict(set)
+
+    async def cog_load(self):
+        async with self.bot.db.transaction() as conn:
+            for record in await conn.fetch(
+                "SELECT guild_id, sob_users FROM sob_data WHERE cardinality(sob_users) > 0"
+            ):
+                self.targets[record["guild_id"]] = set(record["sob_users"])
+
+        self.bot.pipeline.add(
+            "sob",
+            self.sob_message,
+            check=lambda m: m.author.id in self.targets.get(m.guild.id, ()),
+        )
+
+    async def cog_unload(self):
+        self.bot.pipeline.remove("sob")
 
     async def log_server(self):
         await self.bot.wait_until_ready()
@@ -50,28 +70,17 @@ class Sob(commands.Cog):
         if ctx.guild is None:
             return await ctx.send("This command can only be used in a server.")
 
-        guild_id = ctx.guild.id
-        user_id = user.id
-
-        sob_users = await self.bot.db.fetchval(
-            """
-            SELECT sob_users FROM sob_data WHERE guild_id = $1
-        """,
-            guild_id,
-        )
-
-        if sob_users is None:
-            sob_users = []
-
-        if user_id not in sob_users:
-            sob_users.append(user_id)
+        if user.id not in self.targets[ctx.guild.id]:
             await self.bot.db.execute(
                 """
-                UPDATE sob_data SET sob_users = $1 WHERE guild_id = $2
-            """,
-                sob_users,
-                guild_id,
+                INSERT INTO sob_data (guild_id, sob_users) VALUES ($1, ARRAY[$2::BIGINT])
+                ON CONFLICT (guild_id) DO UPDATE
+                SET sob_users = array_append(array_remove(sob_data.sob_users, $2), $2)
+                """,
+                ctx.guild.id,
+                user.id,
             )
+            self.targets[ctx.guild.id].add(user.id)
             await ctx.send_success(
                 f"sob reactions have been added to {user.mention}'s messages."
             )
@@ -86,53 +95,21 @@ class Sob(commands.Cog):
     )
     @commands.has_permissions(manage_messages=True)
     async def remove(self, ctx: GreedContext, user: discord.User):
-        guild_id = ctx.guild.id
-        user_id = user.id
-
-        sob_users = await self.bot.db.fetchval(
-            """
-            SELECT sob_users FROM sob_data WHERE guild_id = $1
-        """,
-            guild_id,
-        )
-
-        if sob_users is None:
-            sob_users = []
-
-        if user_id in sob_users:
-            sob_users.remove(user_id)
+        if user.id in self.targets[ctx.guild.id]:
             await self.bot.db.execute(
-                """
-                UPDATE sob_data SET sob_users = $1 WHERE guild_id = $2
-            """,
-                sob_users,
-                guild_id,
+                "UPDATE sob_data SET sob_users = array_remove(sob_users, $2) WHERE guild_id = $1",
+                ctx.guild.id,
+                user.id,
             )
+            self.targets[ctx.guild.id].discard(user.id)
             await ctx.send_success(
                 f"sob reactions have been removed from {user.mention}'s messages."
             )
         else:
             await ctx.send(f"{user.name} is not in the sob list for this server.")
 
-    @Cog.listener("on_message")
     async def sob_message(self, message: discord.Message):
-        if not message.guild:
-            return
-
-        guild_id = message.guild.id
-        user_id = message.author.id
-
-        sob_users = await self.bot.db.fetchval(
-            """
-            SELECT sob_users FROM sob_data WHERE guild_id = $1
-        """,
-            guild_id,
-        )
-
-        if sob_users is None:
-            sob_users = []
-
-        if user_id in sob_users:
+        if message.author.id in self.targets.get(message.guild.id, ()):
             await message.add_reaction("😭")
 
 
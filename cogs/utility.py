@@ -62,6 +62,7 @@ from tools.misc.utils import (
     TimezoneMember,
 )
 from tools.misc.views import Donate
+from tools.pipeline import Feature
 from tools.predicates import is_afk, is_there_a_reminder, reminder_exists
 from tools.validators import ValidMessage, ValidTime
 from ttapi import TikTokApi
@@ -164,6 +165,18 @@ class Utility(commands.Cog):
             3, 3, commands.BucketType.channel
         )
 
+    async def cog_load(self):
+        self.bot.pipeline.add(
+            "utility.afk",
+            self.afk_listener,
+            Feature.AFK,
+            lambda m: not m.author.bot,
+        )
+
+    async def cog_unload(self):
+        self.bot.pipeline.remove("utility.afk")
+        await self.tiktok.close()
+
     def human_format(self, number: int) -> str:
         """
         Humanize a number, if the case
@@ -204,7 +217,6 @@ class Utility(commands.Cog):
 
         return f"Joined {month} {date.day} {str(date.year)}"
 
-    @commands.Cog.listener("on_message")
     async def afk_listener(self, message: discord.Message):
         if message.is_system():
             return
@@ -636,14 +648,7 @@ class Utility(commands.Cog):
         Clear the snipes from the channel
         """
 
-        for i in ["snipe", "edit_snipe", "reaction_snipe"]:
-            snipes = self.bot.cache.get(i)
-
-            if snipes:
-                for s in [m for m in snipes if m["channel"] == ctx.channel.id]:
-                    snipes.remove(s)
-                await self.bot.cache.set(i, snipes)
-
+        self.bot.snipes.clear(ctx.channel.id)
         await ctx.send_success("Cleared all snipes from this channel")
 
     @commands.command(aliases=["rs"])
@@ -652,24 +657,16 @@ class Utility(commands.Cog):
         Get the most recent message with a reaction removed in this channel
         """
 
-        if not self.bot.cache.get("reaction_snipe"):
-            return await ctx.send_warning("No reaction snipes found in this channel")
+        result, total = self.bot.snipes.get("reaction_snipe", ctx.channel.id, index)
 
-        snipes = [
-            s
-            for s in self.bot.cache.get("reaction_snipe")
-            if s["channel"] == ctx.channel.id
-        ]
-
-        if len(snipes) == 0:
+        if total == 0:
             return await ctx.send_warning("No reaction snipes found in this channel")
 
-        if index > len(snipes):
+        if not result:
             return await ctx.send_warning(
-                f"There are only **{len(snipes)}** reaction snipes in this channel"
+                f"There are only **{total}** reaction snipes in this channel"
             )
 
-        result = snipes[::-1][index - 1]
         try:
             message = await ctx.channel.fetch_message(result["message"])
             return await ctx.pretend_send(
@@ -686,28 +683,20 @@ class Utility(commands.Cog):
         Get the most recent edited message in the channel
         """
 
-        if not self.bot.cache.get("edit_snipe"):
-            return await ctx.send_warning("No edit snipes found in this channel")
-
-        snipes = [
-            s
-            for s in self.bot.cache.get("edit_snipe")
-            if s["channel"] == ctx.channel.id
-        ]
+        result, total = self.bot.snipes.get("edit_snipe", ctx.channel.id, index)
 
-        if len(snipes) == 0:
+        if total == 0:
             return await ctx.send_warning("No edit snipes found in this channel")
 
-        if index > len(snipes):
+        if not result:
             return await ctx.send_warning(
-                f"There are only **{len(snipes)}** edit snipes in this channel"
+                f"There are only **{total}** edit snipes in this channel"
             )
 
-        result = snipes[::-1][index - 1]
         embed = (
             discord.Embed(color=self.bot.color)
             .set_author(name=result["name"], icon_url=result["avatar"])
-            .set_footer(text=f"{index}/{len(snipes)}")
+            .set_footer(text=f"{index}/{total}")
         )
 
         for m in ["before", "after"]:
@@ -721,47 +710,37 @@ class Utility(commands.Cog):
         Get the most recent deleted message in the channel
         """
 
-        if not self.bot.cache.get("snipe"):
-            return await ctx.send_warning("No snipes found in this channel")
-
-        snipes = [
-            s for s in self.bot.cache.get("snipe") if s["channel"] == ctx.channel.id
-        ]
+        result, total = self.bot.snipes.get("snipe", ctx.channel.id, index)
 
-        if len(snipes) == 0:
+        if total == 0:
             return await ctx.send_warning("No snipes found in this channel")
 
-        if index > len(snipes):
+        if not result:
             return await ctx.send_warning(
-                f"There are only **{len(snipes)}** snipes in this channel"
+                f"There are only **{total}** snipes in this channel"
             )
 
-        result = snipes[::-1][index - 1]
         embed = (
             discord.Embed(
                 color=self.bot.color,
                 description=result["message"],
-                timestamp=datetime.datetime.fromtimestamp(result["created_at"]).replace(
+                timestamp=datetime.datetime.fromtimestamp(result["sent_at"]).replace(
                     tzinfo=None
                 ),
             )
             .set_author(name=result["name"], icon_url=result["avatar"])
-            .set_footer(text=f"{index}/{len(snipes)}")
+            .set_footer(text=f"{index}/{total}")
         )
 
-        if len(result["stickers"]) > 0:
-            sticker: discord.StickerItem = result["stickers"][0]
-            embed.set_image(url=sticker.url)
-        else:
-            if len(result["attachments"]) > 0:
-                attachment: discord.Attachment = result["attachments"][0]
-                if ".mp4" in attachment.filename or ".mov" in attachment.filename:
-                    file = discord.File(
-                        BytesIO(await attachment.read()), filename=attachment.filename
-                    )
-                    return await ctx.send(embed=embed, file=file)
-                else:
-                    embed.set_image(url=attachment.url)
+        if result["sticker"]:
+            embed.set_image(url=result["sticker"])
+        elif result["attachment"]:
+            url, filename = result["attachment"]
+            if ".mp4" in filename or ".mov" in filename:
+                file = discord.File(await self.bot.getbyte(url), filename=filename)
+                return await ctx.send(embed=embed, file=file)
+            else:
+                embed.set_image(url=url)
 
         return await ctx.send(embed=embed)
 
@@ -1717,13 +1696,7 @@ class Utility(commands.Cog):
         Unset your timezone
         """
 
-        await self.bot.db.execute(
-            """
-      DELETE FROM timezone
-      WHERE user_id = $1
-      """,
-            ctx.author.id,
-        )
+        await self.bot.timezones.unset(ctx.author.id)
 
         return await ctx.send_success(f"You succesfully deleted your timezone")
 
@@ -1739,7 +1712,7 @@ class Utility(commands.Cog):
         )
         await ctx.paginate(
             [
-                f"<@{result['user_id']}> - **{await self.tz.get_timezone(ctx.guild.get_member(result['user_id']))}"
+                f"<@{result['user_id']}> - **{self.tz.local_date(result['zone'])}**"
                 for result in results
             ],
             f"Timezones ({len(results)})",
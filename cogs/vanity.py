@@ -1,3 +1,8 @@
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Dict, Set
+
 import discord
 from discord.ext import commands
 from discord.ext.commands import Cog, command, group, has_permissions
@@ -5,28 +10,63 @@ from discord.ext.commands import Cog, command, group, has_permissions
 from tools.bot import Pretend
 from tools.helpers import GreedContext
 
+log = logging.getLogger(__name__)
+
 
 class Vanity(commands.Cog):
     def __init__(self, bot: Pretend):
         self.bot = bot
+        self.channels: Dict[int, Set[int]] = defaultdict(set)
+        self.semaphore = asyncio.Semaphore(10)
+
+    async def cog_load(self):
+        async with self.bot.db.transaction() as conn:
+            for record in await conn.fetch(
+                "SELECT guild_id, channel_id FROM vanity_channels"
+            ):
+                self.channels[record["guild_id"]].add(record["channel_id"])
+
+    async def unsubscribe(self, guild_id: int, channel_id: int):
+        self.channels[guild_id].discard(channel_id)
+        await self.bot.db.execute(
+            "DELETE FROM vanity_channels WHERE guild_id = $1 AND channel_id = $2",
+            guild_id,
+            channel_id,
+        )
+
+    async def notify(self, guild_id: int, channel_id: int, embed: discord.Embed):
+        guild = self.bot.get_guild(guild_id)
+        if not guild or not (channel := guild.get_channel(channel_id)):
+            return
+
+        async with self.semaphore:
+            try:
+                await channel.send(embed=embed)
+            except discord.NotFound:
+                # the channel is gone for good
+                await self.unsubscribe(guild_id, channel_id)
+            except discord.Forbidden:
+                # permissions can come back, keep the subscription
+                log.warning(
+                    f"Missing permissions to send the vanity drop to {channel_id}"
+                )
+            except discord.HTTPException:
+                log.exception(f"Couldn't send the vanity drop to {channel_id}")
 
     @Cog.listener("on_guild_update")
     async def vanity_listener(self, before, after):
-        if before.vanity_url_code != after.vanity_url_code:
-            for guild in self.bot.guilds:
-                records = await self.bot.db.fetch(
-                    """SELECT channel_id FROM vanity_channels WHERE guild_id = $1""",
-                    guild.id,
+        if before.vanity_url_code and before.vanity_url_code != after.vanity_url_code:
+            embed = discord.Embed(
+                description=f"Vanity /{before.vanity_url_code} has been dropped",
+                color=self.bot.color,
+            )
+            await asyncio.gather(
+                *(
+                    self.notify(guild_id, channel_id, embed)
+                    for guild_id, channels in list(self.channels.items())
+                    for channel_id in list(channels)
                 )
-                vanity_channels = [record["channel_id"] for record in records]
-                for channel_id in vanity_channels:
-                    vanity_channel = guild.get_channel(channel_id)
-                    if vanity_channel:
-                        embed = discord.Embed(
-                            description=f"Vanity /{before.vanity_url_code} has been dropped",
-                            color=self.bot.color,
-                        )
-                        await vanity_channel.send(embed=embed)
+            )
 
     @group(name="vanity", brief="manage guild", invoke_without_command=True)
     async def vanity(self, ctx: GreedContext):
@@ -43,11 +83,7 @@ class Vanity(commands.Cog):
         if channel.guild.id != guild_id:
             await ctx.send_warning("Please mention a channel within this server.")
             return
-        records = await self.bot.db.fetch(
-            """SELECT channel_id FROM vanity_channels WHERE guild_id = $1""", guild_id
-        )
-        vanity_channels = [record["channel_id"] for record in records]
-        if channel.id in vanity_channels:
+        if channel.id in self.channels[guild_id]:
             await ctx.send_warning(
                 "Vanity logging is already enabled for this channel."
             )
@@ -59,6 +95,7 @@ class Vanity(commands.Cog):
                 guild_id,
                 channel.id,
             )
+            self.channels[guild_id].add(channel.id)
             await ctx.send_success(f"Vanity logging enabled for #{channel.name}.")
 
     @vanity.command(
@@ -72,19 +109,10 @@ class Vanity(commands.Cog):
         if channel.guild.id != guild_id:
             await ctx.send_warning("Please mention a channel within this server.")
             return
-        records = await self.bot.db.fetch(
-            """SELECT channel_id FROM vanity_channels WHERE guild_id = $1""", guild_id
-        )
-        vanity_channels = [record["channel_id"] for record in records]
-        if channel.id not in vanity_channels:
+        if channel.id not in self.channels[guild_id]:
             await ctx.send_warning("Vanity logging is not enabled for this channel.")
         else:
-            await self.bot.db.execute(
-                """DELETE FROM vanity_channels 
-                                     WHERE guild_id = $1 AND channel_id = $2""",
-                guild_id,
-                channel.id,
-            )
+            await self.unsubscribe(guild_id, channel.id)
             await ctx.send_success(f"Vanity logging disabled for #{channel.name}.")
 
 
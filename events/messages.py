@@ -7,12 +7,13 @@ from typing import Optional
 import aiohttp
 import orjson
 from bs4 import BeautifulSoup
-from discord import AllowedMentions, Embed, File, Message, MessageType
+from discord import AllowedMentions, Embed, Message, MessageType
 from discord.ext.commands import BucketType, Cog, CooldownMapping
 from discord.ui import Button, View
 
 from tools.bot import Pretend
 from tools.exceptions import ApiError
+from tools.pipeline import Feature
 from tools.validators import ValidAutoreact
 
 
@@ -23,6 +24,37 @@ class Messages(Cog):
         self.locks = defaultdict(asyncio.Lock)
         self.autoreact_cd = CooldownMapping.from_cooldown(4, 6, BucketType.channel)
 
+    async def cog_load(self):
+        self.bot.pipeline.add(
+            "messages.bump",
+            self.bump_event,
+            Feature.BUMP,
+            lambda m: m.type == MessageType.chat_input_command,
+        )
+        self.bot.pipeline.add(
+            "messages.boost",
+            self.on_boost,
+            check=lambda m: "MessageType.premium_guild" in str(m.type),
+        )
+        self.bot.pipeline.add(
+            "messages.autoresponder",
+            self.on_autoresponder,
+            Feature.AUTORESPONDER,
+            lambda m: not m.author.bot,
+        )
+        self.bot.pipeline.add(
+            "messages.autoreact",
+            self.on_autoreact,
+            Feature.AUTOREACT,
+            lambda m: not m.author.bot,
+        )
+
+    async def cog_unload(self):
+        self.bot.pipeline.remove("messages.bump")
+        self.bot.pipeline.remove("messages.boost")
+        self.bot.pipeline.remove("messages.autoresponder")
+        self.bot.pipeline.remove("messages.autoreact")
+
     async def get_autoreact_cd(self, message: Message) -> Optional[int]:
         """
         custom rate limit for autoreact
@@ -95,9 +127,12 @@ class Messages(Cog):
                         )
                     )
 
-                    file = File(
-                        await self.bot.getbyte(post_data["url"]),
-                        filename=f"pretend_instagram.{post_data['extension']}",
+                    file = await self.bot.media.file(
+                        self.bot.media.instagram_key(url),
+                        post_data["url"],
+                        post_data["extension"],
+                        f"pretend_instagram.{post_data['extension']}",
+                        message.guild.filesize_limit,
                     )
                     return await message.channel.send(file=file, view=view)
 
@@ -143,9 +178,12 @@ class Messages(Cog):
                         return await ctx.paginator(embeds)
                     else:
                         video = x["data"]["play"]
-                        file = File(
-                            fp=await self.bot.getbyte(video),
-                            filename="pretendtiktok.mp4",
+                        file = await self.bot.media.file(
+                            self.bot.media.tiktok_key(x["data"]["id"]),
+                            video,
+                            "mp4",
+                            "pretendtiktok.mp4",
+                            message.guild.filesize_limit,
                         )
                         embed = Embed(
                             color=self.bot.color,
@@ -163,7 +201,6 @@ class Messages(Cog):
                         )
                         await message.channel.send(embed=embed, file=file)
 
-    @Cog.listener("on_message")
     async def bump_event(self, message: Message):
         if message.type == MessageType.chat_input_command:
             if (
@@ -192,7 +229,6 @@ class Messages(Cog):
                             message.guild.id,
                         )
 
-    @Cog.listener("on_message")
     async def on_boost(self, message: Message):
         if message.guild:
             if "MessageType.premium_guild" in str(message.type):
@@ -224,7 +260,6 @@ class Messages(Cog):
                             await channel.send(**x)
                             await asyncio.sleep(0.4)
 
-    @Cog.listener("on_message")
     async def on_autoresponder(self, message: Message):
         if message.author.bot:
             return
@@ -247,7 +282,6 @@ class Messages(Cog):
             x = await self.bot.embed_build.convert(ctx, check[0])
             await ctx.send(**x)
 
-    @Cog.listener("on_message")
     async def on_autoreact(self, message: Message):
         if message.author.bot:
             return
@@ -282,35 +316,17 @@ class Messages(Cog):
         if message.author.bot:
             return
 
-        get_snipes = self.bot.cache.get("snipe")
-        payload = [
-            {
-                "channel": message.channel.id,
-                "name": str(message.author),
-                "avatar": message.author.display_avatar.url,
-                "message": message.content,
-                "attachments": message.attachments,
-                "stickers": message.stickers,
-                "created_at": message.created_at.timestamp(),
-            }
-        ]
-
-        if get_snipes:
-            lol = self.bot.cache.get("snipe")
-            lol.append(
-                {
-                    "channel": message.channel.id,
-                    "name": str(message.author),
-                    "avatar": message.author.display_avatar.url,
-                    "message": message.content,
-                    "attachments": message.attachments,
-                    "stickers": message.stickers,
-                    "created_at": message.created_at.timestamp(),
-                }
-            )
-            return await self.bot.cache.set("snipe", lol)
-        else:
-            await self.bot.cache.set("snipe", payload)
+        attachment = message.attachments[0] if message.attachments else None
+        self.bot.snipes.add(
+            "snipe",
+            message.channel.id,
+            name=str(message.author),
+            avatar=message.author.display_avatar.url,
+            message=message.content,
+            attachment=(attachment.url, attachment.filename) if attachment else None,
+            sticker=message.stickers[0].url if message.stickers else None,
+            sent_at=message.created_at.timestamp(),
+        )
 
     @Cog.listener("on_message_edit")
     async def edit_snipe(self, before: Message, after: Message):
@@ -319,30 +335,14 @@ class Messages(Cog):
         if before.content == after.content:
             return
 
-        get_snipes = self.bot.cache.get("edit_snipe")
-        if get_snipes:
-            lol = self.bot.cache.get("edit_snipe")
-            lol.append(
-                {
-                    "channel": before.channel.id,
-                    "name": str(before.author),
-                    "avatar": before.author.display_avatar.url,
-                    "before": before.content,
-                    "after": after.content,
-                }
-            )
-            return await self.bot.cache.set("edit_snipe", lol)
-        else:
-            payload = [
-                {
-                    "channel": before.channel.id,
-                    "name": str(before.author),
-                    "avatar": before.author.display_avatar.url,
-                    "before": before.content,
-                    "after": after.content,
-                }
-            ]
-            return await self.bot.cache.set("edit_snipe", payload)
+        self.bot.snipes.add(
+            "edit_snipe",
+            before.channel.id,
+            name=str(before.author),
+            avatar=before.author.display_avatar.url,
+            before=before.content,
+            after=after.content,
+        )
 
 
 async def setup(bot) -> None:
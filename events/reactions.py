@@ -1,4 +1,3 @@
-import datetime
 import io
 
 import discord
@@ -457,30 +456,13 @@ class Reactions(Cog):
         if user.bot:
             return
 
-        get_snipe = self.bot.cache.get("reaction_snipe")
-        if get_snipe:
-            lol = get_snipe
-            lol.append(
-                {
-                    "channel": reaction.message.channel.id,
-                    "message": reaction.message.id,
-                    "reaction": str(reaction.emoji),
-                    "user": str(user),
-                    "created_at": datetime.datetime.now().timestamp(),
-                }
-            )
-            await self.bot.cache.set("reaction_snipe", lol)
-        else:
-            payload = [
-                {
-                    "channel": reaction.message.channel.id,
-                    "message": reaction.message.id,
-                    "reaction": str(reaction.emoji),
-                    "user": str(user),
-                    "created_at": datetime.datetime.now().timestamp(),
-                }
-            ]
-            await self.bot.cache.set("reaction_snipe", payload)
+        self.bot.snipes.add(
+            "reaction_snipe",
+            reaction.message.channel.id,
+            message=reaction.message.id,
+            reaction=str(reaction.emoji),
+            user=str(user),
+        )
 
 
 async def setup(bot: Pretend) -> None:
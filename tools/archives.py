@@ -0,0 +1,131 @@
+import asyncio
+import tempfile
+import zipfile
+from typing import (
+    IO,
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    Optional,
+    Tuple,
+)
+
+Reader = Callable[[], Awaitable[bytes]]
+Progress = Callable[[int, int], Awaitable[Any]]
+
+# fixed sizes of the zip records written around every entry
+LOCAL_HEADER = 30
+CENTRAL_HEADER = 46
+END_RECORD = 22
+
+
+class ZipExporter:
+    def __init__(self, limit: int, concurrency: int = 8):
+        """
+        Downloads files concurrently and writes them into zips on disk as
+        they arrive, starting a new zip whenever the next file would push
+        the current one over the limit. At most concurrency downloads run
+        and at most concurrency finished ones wait while a zip is sent
+        """
+
+        self.limit = limit
+        self.concurrency = concurrency
+        self.total = 0
+        self.done = 0
+        self.skipped = 0
+        self.failed = 0
+
+    async def download(self, name: str, read: Reader) -> Tuple[str, Optional[bytes]]:
+        try:
+            return name, await read()
+        except Exception:
+            self.failed += 1
+            return name, None
+
+    @staticmethod
+    def unique(names: Dict[str, int], name: str) -> str:
+        """
+        Emojis can share a name, the archive entries can't
+        """
+
+        count = names.get(name, 0)
+        names[name] = count + 1
+        if not count:
+            return name
+
+        stem, dot, extension = name.rpartition(".")
+        return f"{stem}-{count}{dot}{extension}" if dot else f"{name}-{count}"
+
+    async def export(
+        self,
+        prefix: str,
+        entries: Iterable[Tuple[str, Reader]],
+        progress: Optional[Progress] = None,
+    ) -> AsyncIterator[Tuple[str, IO[bytes]]]:
+        """
+        Yield each finished zip as (filename, file), the caller closes the file
+        """
+
+        entries = list(entries)
+        self.total = len(entries)
+        pending = iter(entries)
+        results: asyncio.Queue = asyncio.Queue(self.concurrency)
+
+        async def worker():
+            # the workers share the iterator, and wait on the full queue while a zip is sent
+            for name, read in pending:
+                await results.put(await self.download(name, read))
+
+        tasks = [
+            asyncio.ensure_future(worker())
+            for _ in range(min(self.concurrency, self.total))
+        ]
+        names: Dict[str, int] = {}
+        part, archive, central = None, None, 0
+        parts = 0
+
+        try:
+            for _ in range(self.total):
+                name, data = await results.get()
+                self.done += 1
+                if data is not None:
+                    name = self.unique(names, name)
+                    entry = LOCAL_HEADER + CENTRAL_HEADER + 2 * len(name.encode())
+                    if entry + len(data) + END_RECORD > self.limit:
+                        self.skipped += 1
+                    else:
+                        if archive and (
+                            part.tell() + central + entry + len(data) + END_RECORD
+                            > self.limit
+                        ):
+                            archive.close()
+                            parts += 1
+                            part.seek(0)
+                            yield f"{prefix}-{parts}.zip", part
+                            part, archive = None, None
+
+                        if not archive:
+                            part = tempfile.TemporaryFile()
+                            archive = zipfile.ZipFile(part, "w", zipfile.ZIP_STORED)
+                            central = 0
+
+                        archive.writestr(name, data)
+                        central += CENTRAL_HEADER + len(name.encode())
+
+                if progress:
+                    await progress(self.done, self.total)
+
+            if archive:
+                archive.close()
+                part.seek(0)
+                yield (f"{prefix}-{parts + 1}.zip" if parts else f"{prefix}.zip"), part
+                part = None
+        finally:
+            for task in tasks:
+                task.cancel()
+
+            if part:
+                part.close()
@@ -0,0 +1,125 @@
+import asyncio
+import datetime
+from collections import defaultdict, deque
+from typing import Any, Callable, Coroutine, Deque, Dict, List, Optional, Tuple
+
+from discord import AuditLogAction, AuditLogEntry, Guild, Member, utils
+from discord.ext.commands import AutoShardedBot as AB
+
+Key = Tuple[int, AuditLogAction]
+
+
+class AuditLogBus:
+    def __init__(self, bot: AB, size: int = 25, ttl: int = 15):
+        """
+        Keeps the latest audit log entries the gateway sent us, so listeners
+        can find out who did something without asking the api
+        """
+
+        self.bot = bot
+        self.ttl = ttl
+        self.entries: Dict[Key, Deque[AuditLogEntry]] = defaultdict(
+            lambda: deque(maxlen=size)
+        )
+        self.waiters: Dict[
+            Key, List[Tuple[Optional[int], asyncio.Future]]
+        ] = defaultdict(list)
+        self.subscribers: List[Callable[[AuditLogEntry], Coroutine[Any, Any, Any]]] = []
+
+    def subscribe(
+        self, callback: Callable[[AuditLogEntry], Coroutine[Any, Any, Any]]
+    ) -> None:
+        """
+        Get every audit log entry pushed to the bus
+        """
+
+        self.subscribers.append(callback)
+
+    def unsubscribe(
+        self, callback: Callable[[AuditLogEntry], Coroutine[Any, Any, Any]]
+    ) -> None:
+        if callback in self.subscribers:
+            self.subscribers.remove(callback)
+
+    def matches(self, entry: AuditLogEntry, target_id: Optional[int]) -> bool:
+        if entry.user_id is None:
+            return False
+
+        if entry.created_at < utils.utcnow() - datetime.timedelta(seconds=self.ttl):
+            return False
+
+        return target_id is None or getattr(entry.target, "id", None) == target_id
+
+    @staticmethod
+    def actor(entry: AuditLogEntry) -> Optional[Member]:
+        """
+        The actor from the member cache, no api call is made for it
+        """
+
+        if isinstance(entry.user, Member):
+            return entry.user
+
+        return entry.guild.get_member(entry.user_id) if entry.user_id else None
+
+    async def push(self, entry: AuditLogEntry) -> None:
+        """
+        The on_audit_log_entry_create listener
+        """
+
+        # an actor that isn't cached keeps whatever the gateway gave, the raw user_id is always there
+        if member := self.actor(entry):
+            entry.user = member
+
+        key = (entry.guild.id, entry.action)
+        self.entries[key].append(entry)
+
+        if waiters := self.waiters.get(key):
+            for waiter in [w for w in waiters if self.matches(entry, w[0])]:
+                waiters.remove(waiter)
+                if not waiter[1].done():
+                    waiter[1].set_result(entry)
+
+        for callback in self.subscribers:
+            asyncio.ensure_future(callback(entry))
+
+    def find(
+        self, guild: Guild, action: AuditLogAction, target_id: Optional[int] = None
+    ) -> Optional[AuditLogEntry]:
+        """
+        Get the newest entry that is already in the buffer
+        """
+
+        for entry in reversed(self.entries.get((guild.id, action), ())):
+            if self.matches(entry, target_id):
+                return entry
+
+        return None
+
+    async def get(
+        self,
+        guild: Guild,
+        action: AuditLogAction,
+        target_id: Optional[int] = None,
+        timeout: float = 5.0,
+    ) -> Optional[AuditLogEntry]:
+        """
+        Get the entry for an event. The gateway event can arrive before its
+        audit log entry, so wait a bit for it if it's not buffered yet
+        """
+
+        if entry := self.find(guild, action, target_id):
+            return entry
+
+        key = (guild.id, action)
+        waiter = (target_id, self.bot.loop.create_future())
+        self.waiters[key].append(waiter)
+
+        try:
+            return await asyncio.wait_for(waiter[1], timeout)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            if waiter in self.waiters[key]:
+                self.waiters[key].remove(waiter)
+            if not self.waiters[key]:
+                self.waiters.pop(key, None)
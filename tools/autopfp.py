@@ -0,0 +1,177 @@
+import asyncio
+import logging
+import os
+import string
+from collections import deque
+from random import choices
+from typing import Awaitable, Callable, Deque, Dict, Optional, Tuple
+
+from discord import Embed, Forbidden, HTTPException, NotFound
+from discord.ext.commands import AutoShardedBot as AB
+
+log = logging.getLogger(__name__)
+
+Target = Tuple[int, str]
+Source = Callable[[str], Awaitable[Optional[str]]]
+
+
+class AutoPfpRotator:
+    def __init__(
+        self,
+        bot: AB,
+        source: Optional[Source] = None,
+        interval: float = 15.0,
+        pool_size: int = 10,
+        concurrency: int = 4,
+        base_url: str = "https://v1.pretend.best",
+    ):
+        """
+        Sends every autopfp channel a picture once per interval. Deliveries
+        are spread over the interval in a round robin, and the pictures
+        come from a pool per category that is refilled in the background
+        """
+
+        self.bot = bot
+        self.source = source or self.fetch
+        self.interval = interval
+        self.pool_size = pool_size
+        self.base_url = base_url
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.targets: Dict[Target, int] = {}
+        self.rotation: Deque[Target] = deque()
+        self.pools: Dict[str, Deque[str]] = {}
+        self.refills: Dict[str, asyncio.Task] = {}
+        self.stats = {"sent": 0, "dropped": 0, "misses": 0, "failures": 0}
+
+    async def fetch(self, category: str) -> Optional[str]:
+        data = await self.bot.session.get_json(
+            f"{self.base_url}/pictures/pfps/{category}",
+            headers={"api-key": os.getenv("pretend_key")},
+        )
+        return data.get("url")
+
+    async def load(self) -> None:
+        async with self.bot.db.transaction() as conn:
+            for record in await conn.fetch(
+                "SELECT guild_id, category, channel_id FROM autopfp"
+            ):
+                self.add(record["guild_id"], record["category"], record["channel_id"])
+
+    def add(self, guild_id: int, category: str, channel_id: int) -> None:
+        target = (guild_id, category)
+        if target not in self.targets:
+            self.rotation.append(target)
+
+        self.targets[target] = channel_id
+        self.refill(category)
+
+    def drop(self, target: Target) -> None:
+        self.targets.pop(target, None)
+        try:
+            self.rotation.remove(target)
+        except ValueError:
+            pass
+        self.stats["dropped"] += 1
+
+    def refill(self, category: str) -> None:
+        pool = self.pools.setdefault(category, deque())
+        task = self.refills.get(category)
+        if len(pool) < self.pool_size and (not task or task.done()):
+            self.refills[category] = asyncio.ensure_future(self.fill(category))
+
+    async def fill(self, category: str) -> None:
+        pool = self.pools[category]
+        while len(pool) < self.pool_size:
+            async with self.semaphore:
+                try:
+                    url = await self.source(category)
+                except Exception:
+                    self.stats["failures"] += 1
+                    log.warning(f"Couldn't fetch an autopfp for {category}")
+                    return
+
+            if not url:
+                return
+
+            pool.append(url)
+
+    async def take(self, category: str) -> Optional[str]:
+        pool = self.pools.setdefault(category, deque())
+        url = pool.popleft() if pool else None
+        self.refill(category)
+        if url:
+            return url
+
+        # the pool hasn't caught up, fetch this one directly
+        self.stats["misses"] += 1
+        async with self.semaphore:
+            try:
+                return await self.source(category)
+            except Exception:
+                self.stats["failures"] += 1
+
+    async def run(self) -> None:
+        """
+        One delivery every interval / targets seconds, so each target gets one per interval
+        """
+
+        while True:
+            if not self.rotation:
+                await asyncio.sleep(self.interval)
+                continue
+
+            target = self.rotation[0]
+            self.rotation.rotate(-1)
+            asyncio.ensure_future(self.deliver(target))
+            await asyncio.sleep(self.interval / max(len(self.rotation), 1))
+
+    async def deliver(self, target: Target) -> None:
+        guild_id, category = target
+        guild = self.bot.get_guild(guild_id)
+        if not guild:
+            # before ready the guild cache is still filling up
+            if self.bot.is_ready():
+                await self.remove(target)
+            return
+
+        channel = guild.get_channel(self.targets.get(target, 0))
+        if not channel:
+            await self.remove(target)
+            return
+
+        if not (url := await self.take(category)):
+            return
+
+        hash_id = "".join(choices(string.digits, k=5))
+        embed = Embed(title="greed", url="https://greed.best")
+        embed.set_image(url=url)
+        embed.set_footer(text=f"pfps module {category} • ID {hash_id} • /report")
+
+        try:
+            message = await channel.send(embed=embed)
+        except NotFound:
+            await self.remove(target)
+            return
+        except Forbidden:
+            self.drop(target)
+            return
+        except HTTPException:
+            self.stats["failures"] += 1
+            return
+
+        self.stats["sent"] += 1
+        await self.bot.db.execute(
+            "INSERT INTO message_hash (message_id, hash_id) VALUES ($1, $2)",
+            message.id,
+            hash_id,
+        )
+
+    async def remove(self, target: Target) -> None:
+        """
+        Forget a target whose channel is gone, for good
+        """
+
+        self.drop(target)
+        await self.bot.db.execute(
+            "DELETE FROM autopfp WHERE guild_id = $1 AND category = $2", *target
+        )
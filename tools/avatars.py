@@ -0,0 +1,211 @@
+import asyncio
+import logging
+import os
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from io import BytesIO
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from aiofiles import open as async_open
+from discord import File, HTTPException, User
+from discord.ext.commands import AutoShardedBot as AB
+from xxhash import xxh3_64_hexdigest
+
+log = logging.getLogger(__name__)
+
+
+class Blob(NamedTuple):
+    url: str
+    message_id: int
+    index: int
+
+
+class BlobStore(ABC):
+    """
+    Where the avatar files end up
+    """
+
+    @abstractmethod
+    async def put_many(self, files: List[Tuple[str, bytes]]) -> List[Blob]:
+        """
+        Store the files and return where each one went, in the same order
+        """
+
+
+class LocalBlobStore(BlobStore):
+    def __init__(self, directory: str, base_url: Optional[str] = None):
+        self.directory = directory
+        self.base_url = base_url or f"file://{os.path.abspath(directory)}"
+        os.makedirs(directory, exist_ok=True)
+
+    async def put_many(self, files: List[Tuple[str, bytes]]) -> List[Blob]:
+        blobs = []
+        for index, (name, data) in enumerate(files):
+            path = os.path.join(self.directory, name)
+            # files are named after their hash, an existing file is the same avatar
+            if not os.path.exists(path):
+                async with async_open(path, "wb") as f:
+                    await f.write(data)
+
+            blobs.append(Blob(f"{self.base_url}/{name}", 0, index))
+
+        return blobs
+
+
+class ChannelBlobStore(BlobStore):
+    def __init__(self, bot: AB, channel_id: int):
+        self.bot = bot
+        self.channel_id = channel_id
+
+    async def put_many(self, files: List[Tuple[str, bytes]]) -> List[Blob]:
+        channel = self.bot.get_channel(self.channel_id)
+        if not channel:
+            raise RuntimeError(f"Avatar channel {self.channel_id} isn't available")
+
+        message = await channel.send(
+            files=[File(BytesIO(data), filename=name) for name, data in files]
+        )
+        return [
+            Blob(attachment.url, message.id, index)
+            for index, attachment in enumerate(message.attachments)
+        ]
+
+
+class AvatarPipeline:
+    def __init__(
+        self,
+        bot: AB,
+        store: BlobStore,
+        maxsize: int = 1000,
+        batch: int = 10,
+        interval: float = 15.0,
+        remember: int = 100_000,
+    ):
+        """
+        Saves avatar changes: a bounded queue drained by one worker that
+        skips avatars it already has, uploads the rest in batches and
+        inserts their rows with one executemany
+        """
+
+        self.bot = bot
+        self.store = store
+        self.batch = batch
+        self.interval = interval
+        self.remember = remember
+        self.queue: asyncio.Queue[Tuple[User, int]] = asyncio.Queue(maxsize)
+        self.hashes: OrderedDict[int, str] = OrderedDict()
+        self.blobs: OrderedDict[str, Blob] = OrderedDict()
+        self.worker: Optional[asyncio.Task] = None
+        self.stats: Dict[str, float] = {
+            "queued": 0,
+            "dropped": 0,
+            "duplicates": 0,
+            "uploaded": 0,
+            "failures": 0,
+            "last_batch": 0.0,
+        }
+
+    @property
+    def pending(self) -> int:
+        return self.queue.qsize()
+
+    def submit(self, user: User) -> bool:
+        """
+        Queue the user's new avatar, dropping it when the queue is full
+        """
+
+        try:
+            self.queue.put_nowait((user, int(time.time())))
+        except asyncio.QueueFull:
+            self.stats["dropped"] += 1
+            return False
+
+        self.stats["queued"] += 1
+        if not self.worker or self.worker.done():
+            self.worker = asyncio.ensure_future(self.run())
+
+        return True
+
+    def seen(self, cache: OrderedDict, key, value) -> None:
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > self.remember:
+            cache.popitem(last=False)
+
+    async def run(self) -> None:
+        while not self.queue.empty():
+            items = [await self.queue.get()]
+            deadline = time.monotonic() + self.interval
+            while len(items) < self.batch:
+                try:
+                    items.append(
+                        await asyncio.wait_for(
+                            self.queue.get(), max(0, deadline - time.monotonic())
+                        )
+                    )
+                except asyncio.TimeoutError:
+                    break
+
+            try:
+                await self.process(items)
+            except Exception:
+                self.stats["failures"] += 1
+                log.exception("Couldn't save a batch of avatars")
+
+    async def process(self, items: List[Tuple[User, int]]) -> None:
+        start = time.perf_counter()
+        rows: List[Tuple[int, str, int]] = []
+        uploads: Dict[str, Tuple[str, bytes]] = {}
+        locations: Dict[str, Blob] = {}
+
+        for user, ts in items:
+            try:
+                data = await user.display_avatar.read()
+            except HTTPException:
+                continue
+
+            digest = xxh3_64_hexdigest(data)
+            if self.hashes.get(user.id) == digest:
+                self.stats["duplicates"] += 1
+                continue
+
+            self.seen(self.hashes, user.id, digest)
+            extension = "gif" if user.display_avatar.is_animated() else "png"
+            # a known avatar points at the message and index it was first uploaded to
+            if blob := self.blobs.get(digest):
+                locations[digest] = blob
+                self.blobs.move_to_end(digest)
+            else:
+                uploads[digest] = (f"{digest}.{extension}", data)
+
+            rows.append((user.id, digest, ts))
+
+        if not rows:
+            return
+
+        if uploads:
+            blobs = await self.store.put_many(list(uploads.values()))
+            for digest, blob in zip(uploads, blobs):
+                self.seen(self.blobs, digest, blob)
+                locations[digest] = blob
+            self.stats["uploaded"] += len(blobs)
+
+        records = [
+            (
+                user_id,
+                locations[digest].url,
+                ts,
+                locations[digest].index,
+                locations[digest].message_id,
+            )
+            for user_id, digest, ts in rows
+        ]
+
+        async with self.bot.db.transaction() as conn:
+            await conn.executemany(
+                "INSERT INTO avatars (user_id, avatar, ts, i, message_id) VALUES ($1,$2,$3,$4,$5)",
+                records,
+            )
+
+        self.stats["last_batch"] = time.perf_counter() - start
@@ -4,6 +4,7 @@ import logging
 import os
 import urllib
 from copy import copy
+from functools import cached_property
 from io import BytesIO
 from typing import Any, List, Optional, Set, Union
 
@@ -22,6 +23,9 @@ from PretendAPI import API
 # from cogs.music import Music
 from cogs.fun import BlackTea
 
+from .auditlogs import AuditLogBus
+from .avatars import AvatarPipeline, ChannelBlobStore
+from .counters import CounterService
 from .database import PostgreSQL
 from .exceptions import LastFmException, RenameRateLimit, WrongMessageLink
 from .expiringdictionary import ExpiringDictionary
@@ -37,6 +41,9 @@ from .helpers import (
     guild_perms,
     identify,
 )
+from .joins import JoinPipeline
+from .media import MediaCache
+from .metrics import CommandMetrics
 from .misc.session import Session
 from .misc.tasks import (
     bump_remind,
@@ -51,8 +58,13 @@ from .misc.tasks import (
 from .persistent.giveaway import GiveawayView
 from .persistent.tickets import TicketView
 from .persistent.vm import VoiceMasterView
+from .pipeline import MessagePipeline
 from .rival import RivalAPI
+from .snipes import SnipeStore
+from .startup import StartupProfiler, count_lines
 from .tickets import TicketLogs
+from .timezones import TimezoneResolver
+from .usernames import UsernameHistory
 
 dotenv.load_dotenv(verbose=True)
 
@@ -92,6 +104,7 @@ class Pretend(commands.AutoShardedBot):
     """
 
     def __init__(self, db: asyncpg.Pool = None):
+        self.startup = StartupProfiler()
         super().__init__(
             command_prefix=getprefix,
             intents=intents,
@@ -133,6 +146,12 @@ class Pretend(commands.AutoShardedBot):
         )
         self.session = Session()
         self.cache = Cache()
+        self.snipes = SnipeStore()
+        self.media = MediaCache()
+        self.timezones = TimezoneResolver(self)
+        self.counters = CounterService(self)
+        self.usernames = UsernameHistory(self)
+        self.avatars = AvatarPipeline(self, ChannelBlobStore(self, 1225577288566046840))
         self.tickets = TicketLogs(self)
         self.rival = RivalAPI("1c6ad8e0-6dbc-4e61-9600-275bddf0997d")
         self.proxy_url = os.environ.get("proxy_url")
@@ -143,6 +162,17 @@ class Pretend(commands.AutoShardedBot):
         self.pretend = API(self.pretend_api)
         self.tea = BlackTea(self)
         self.an = AntinukeMeasures(self)
+        self.audit = AuditLogBus(self)
+        self.add_listener(self.audit.push, "on_audit_log_entry_create")
+        self.pipeline = MessagePipeline(self)
+        self.add_listener(self.pipeline.dispatch, "on_message")
+        self.add_listener(self.pipeline.on_command_completion, "on_command_completion")
+        self.joins = JoinPipeline(self)
+        self.add_listener(self.joins.on_member_join, "on_member_join")
+        self.add_listener(self.joins.on_command_completion, "on_command_completion")
+        self.metrics = CommandMetrics(self)
+        self.add_listener(self.metrics.on_command, "on_command")
+        self.add_listener(self.metrics.on_command_completion, "on_command_completion")
         self.embed_build = EmbedScript()
         self.before_invoke = self.clear
 
@@ -188,19 +218,13 @@ class Pretend(commands.AutoShardedBot):
 
         return len([g for g in self.guilds if g.chunked])
 
-    @property
+    @cached_property
     def lines(self) -> int:
         """
         Return the code's amount of lines
         """
 
-        lines = 0
-        for d in [x[0] for x in os.walk("./") if not ".git" in x[0]]:
-            for file in os.listdir(d):
-                if file.endswith(".py"):
-                    lines += len(open(f"{d}/{file}", "r").read().splitlines())
-
-        return lines
+        return count_lines()
 
     def humanize_date(self, date: datetime.datetime) -> str:
         """
@@ -264,6 +288,10 @@ class Pretend(commands.AutoShardedBot):
         reminder_task.start(self)
         counter_update.start(self)
 
+    async def close(self) -> None:
+        await self.metrics.flush()
+        await super().close()
+
     def url_encode(self, url: str):
         """
         Encode an url
@@ -275,11 +303,15 @@ class Pretend(commands.AutoShardedBot):
         self.session2 = aiohttp.ClientSession()
         from .redis import PretendRedis
 
-        self.redis = await PretendRedis.from_url()
+        with self.startup.phase("redis"):
+            self.redis = await PretendRedis.from_url()
+        asyncio.ensure_future(self.timezones.load())
+        asyncio.ensure_future(asyncio.to_thread(lambda: self.lines))
 
         log.info("Starting bot")
         if not self.db:
-            self.db = await self.create_db()
+            with self.startup.phase("database"):
+                self.db = await self.create_db()
 
         self.bot_invite = discord.utils.oauth_url(
             client_id=self.user.id, permissions=discord.Permissions(8)
@@ -291,23 +323,32 @@ class Pretend(commands.AutoShardedBot):
         load all cogs
         """
 
-        await self.load_extension("jishaku")
-        log.info("Loaded jishaku")
-
-        for file in [f[:-3] for f in os.listdir("./cogs") if f.endswith(".py")]:
-            try:
-                await self.load_extension(f"cogs.{file}")
-                log.info(f"Loaded {file.replace('.py','')}")
-            except Exception as e:
-                log.warning(f"Unable to load {file}: {e}")
+        with self.startup.phase("cogs"):
+            await self.load_extension("jishaku")
+            log.info("Loaded jishaku")
 
-        for file in [f[:-3] for f in os.listdir("./events") if f.endswith(".py")]:
-            await self.load_extension(f"events.{file}")
+            # the extensions of a folder don't depend on each other, so their
+            # cog_load hooks can wait on the database at the same time
+            for folder in ("cogs", "events"):
+                await asyncio.gather(
+                    *(
+                        self.load_module(f"{folder}.{f[:-3]}")
+                        for f in os.listdir(f"./{folder}")
+                        if f.endswith(".py")
+                    )
+                )
 
         log.info("Loaded all cogs")
         await self.load_views()
         log.info("Loaded views")
 
+    async def load_module(self, name: str) -> None:
+        try:
+            await self.load_extension(name)
+            log.info(f"Loaded {name}")
+        except Exception as e:
+            log.warning(f"Unable to load {name}: {e}")
+
     async def load_views(self) -> None:
         """
         Add the persistent views
@@ -319,16 +360,30 @@ class Pretend(commands.AutoShardedBot):
         self.add_view(TicketView(self, True))
 
     async def on_ready(self) -> None:
-        asyncio.ensure_future(self.__chunk_guilds())
         log.info(f"Connected as {self.user}")
+        # on_ready fires again after reconnects, the cogs are loaded in setup_hook
+        if "ready" in self.startup.marks:
+            return
+
+        self.startup.mark("ready")
+        asyncio.ensure_future(self.__chunk_guilds())
         #  await Music(self).start_nodes()
-        await self.load()
         await self.start_loops()
 
-    async def __chunk_guilds(self):
-        for guild in self.guilds:
-            await asyncio.sleep(0.1)
-            await guild.chunk(cache=True)
+    async def __chunk_guilds(self, concurrency: int = 4):
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def chunk(guild: discord.Guild):
+            async with semaphore:
+                if not guild.chunked:
+                    await guild.chunk(cache=True)
+
+        with self.startup.phase("chunking"):
+            await asyncio.gather(
+                *(chunk(g) for g in self.guilds), return_exceptions=True
+            )
+
+        log.info(f"Startup report:\n{self.startup.report()}")
 
     async def do_aliases(self, ctx: GreedContext):
         aliases = await self.db.fetch(
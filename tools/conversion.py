@@ -1,39 +1,192 @@
 import os
-from asyncio import create_subprocess_shell as shell
-from asyncio import gather, sleep
-from asyncio import to_thread as thread
+import tempfile
+import time
+from asyncio import Semaphore, TimeoutError
+from asyncio import create_subprocess_exec as spawn
+from asyncio import wait_for
 from asyncio.subprocess import PIPE
+from collections import OrderedDict, deque
 from io import BytesIO
-from typing import Optional
+from typing import Deque, Dict, List, Optional, Tuple
 
 from aiofiles import open as async_open
 from aiohttp import ClientSession as Session
 from discord import Embed, File
 from discord.ext.commands import CommandError, Context
-from tuuid import tuuid
+from xxhash import xxh3_64_hexdigest
+
+# (fps, width, colors) tried in order until the gif fits the size target
+LADDER: List[Tuple[int, int, int]] = [
+    (15, 480, 256),
+    (12, 360, 192),
+    (10, 320, 128),
+    (8, 240, 64),
+]
 
 
 class Conversion:
-    def __init__(self):
+    def __init__(
+        self,
+        concurrency: Optional[int] = None,
+        max_input: int = 50 * 1024 * 1024,
+        cache_size: int = 100 * 1024 * 1024,
+        timeout: int = 120,
+    ):
         self.command = "ffmpeg"
+        self.semaphore = Semaphore(concurrency or max(1, (os.cpu_count() or 2) // 2))
+        self.max_input = max_input
+        self.cache_size = cache_size
+        self.timeout = timeout
+        self.session: Optional[Session] = None
+        self.cache: OrderedDict[str, bytes] = OrderedDict()
+        self.cached_bytes = 0
+        self.jobs: Deque[Dict[str, float]] = deque(maxlen=100)
+        self.stats = {"jobs": 0, "cache_hits": 0, "failures": 0}
+
+    async def download(self, url: str) -> bytes:
+        """
+        Stream the file into memory, refusing anything over the input limit
+        """
+
+        if not self.session or self.session.closed:
+            self.session = Session()
+
+        buffer = BytesIO()
+        async with self.session.get(url) as resp:
+            if resp.content_length and resp.content_length > self.max_input:
+                raise CommandError("This file is too big to convert")
+
+            async for chunk in resp.content.iter_chunked(64 * 1024):
+                buffer.write(chunk)
+                if buffer.tell() > self.max_input:
+                    raise CommandError("This file is too big to convert")
+
+        return buffer.getvalue()
+
+    def arguments(self, source: str, fps: int, width: int, colors: int) -> List[str]:
+        # palettegen and paletteuse in one filter graph: the palette is built from the
+        # scaled frames of this very clip before they are encoded
+        return [
+            self.command,
+            "-hide_banner",
+            "-loglevel",
+            "error",
+            "-i",
+            source,
+            "-an",
+            "-vf",
+            f"fps={fps},scale='min({width},iw)':-2:flags=lanczos,split[a][b];"
+            f"[a]palettegen=max_colors={colors}:stats_mode=diff[p];"
+            "[b][p]paletteuse=dither=bayer:bayer_scale=5:diff_mode=rectangle",
+            "-f",
+            "gif",
+            "pipe:1",
+        ]
+
+    @staticmethod
+    def pipeable(data: bytes) -> bool:
+        """
+        Containers with the index after the media (most mp4s) can't be read
+        from a pipe, so walk the top level boxes to see which comes first
+        """
+
+        if data[4:8] != b"ftyp":
+            return True
+
+        offset = 0
+        while offset + 8 <= len(data):
+            size = int.from_bytes(data[offset : offset + 4], "big")
+            kind = data[offset + 4 : offset + 8]
+            if kind == b"moov":
+                return True
+            if kind == b"mdat":
+                return False
+
+            if size == 1:
+                size = int.from_bytes(data[offset + 8 : offset + 16], "big")
+            if size < 8:
+                break
+
+            offset += size
+
+        return False
+
+    async def ffmpeg(
+        self, source: str, data: Optional[bytes], fps: int, width: int, colors: int
+    ) -> Optional[bytes]:
+        """
+        Run ffmpeg on a file, or on the data through a pipe, and return the gif
+        """
 
-    async def download(self, url: str) -> str:
-        async with Session() as session:
-            async with session.get(url) as resp:
-                data = await resp.read()
-        fp = f"{tuuid()}.mp4"
-        async with async_open(fp, "wb") as file:
-            await file.write(data)
-        return fp
-
-    async def convert(self, fp: str) -> str:
-        _fp = f"{tuuid()}.gif"
-        process = await shell(f"{self.command} -i {fp} {_fp}", stdout=PIPE)
-        await process.communicate()
-        os.remove(fp)
-        if not os.path.exists(_fp):
-            raise CommandError(f"Could not convert the file")
-        return _fp
+        process = await spawn(
+            *self.arguments(source, fps, width, colors),
+            stdin=PIPE if data is not None else None,
+            stdout=PIPE,
+            stderr=PIPE,
+        )
+        try:
+            stdout, _ = await wait_for(process.communicate(data), self.timeout)
+        except TimeoutError:
+            process.kill()
+            # reap it, or it stays around as a zombie
+            await process.wait()
+            raise CommandError("The conversion took too long")
+
+        if process.returncode != 0 or not stdout:
+            return None
+
+        return stdout
+
+    async def convert(self, data: bytes, target: int) -> bytes:
+        """
+        Convert a video to a gif that fits the size target, reusing earlier results
+        """
+
+        key = f"{xxh3_64_hexdigest(data)}:{target}"
+        if key in self.cache:
+            self.cache.move_to_end(key)
+            self.stats["cache_hits"] += 1
+            return self.cache[key]
+
+        # pipe or file is decided once per input, every rung of the ladder reads the same way
+        pipe = self.pipeable(data)
+        source = None
+        async with self.semaphore:
+            try:
+                for fps, width, colors in LADDER:
+                    output = None
+                    if pipe:
+                        output = await self.ffmpeg("pipe:0", data, fps, width, colors)
+                        pipe = output is not None
+
+                    if not pipe:
+                        if not source:
+                            source = tempfile.NamedTemporaryFile(suffix=".mp4")
+                            async with async_open(source.name, "wb") as file:
+                                await file.write(data)
+
+                        output = await self.ffmpeg(
+                            source.name, None, fps, width, colors
+                        )
+
+                    if output is None:
+                        raise CommandError("Could not convert the file")
+
+                    if len(output) <= target:
+                        break
+                else:
+                    raise CommandError("The gif is too big to upload")
+            finally:
+                if source:
+                    source.close()
+
+        self.cache[key] = output
+        self.cached_bytes += len(output)
+        while self.cached_bytes > self.cache_size:
+            _, evicted = self.cache.popitem(last=False)
+            self.cached_bytes -= len(evicted)
+
+        return output
 
     async def do_conversion(self, ctx: Context, url: Optional[str] = None):
         if not url:
@@ -41,10 +194,24 @@ class Conversion:
                 url = ctx.message.attachments[0].url
             else:
                 raise CommandError(f"please provide an attachment")
-        filepath = await self.download(url)
-        converted = await self.convert(filepath)
+
+        self.stats["jobs"] += 1
+        job = {"started": time.perf_counter()}
+        try:
+            data = await self.download(url)
+            job["download"] = time.perf_counter() - job["started"]
+            converted = await self.convert(
+                data, ctx.guild.filesize_limit if ctx.guild else 8 * 1024 * 1024
+            )
+            job["convert"] = time.perf_counter() - job["started"] - job["download"]
+        except Exception:
+            self.stats["failures"] += 1
+            raise
+        finally:
+            job["total"] = time.perf_counter() - job.pop("started")
+            self.jobs.append(job)
+
         await ctx.send(
             embed=Embed(color=ctx.bot.color, description=f"heres your gif.."),
-            file=File(converted),
+            file=File(BytesIO(converted), filename="converted.gif"),
         )
-        os.remove(converted)
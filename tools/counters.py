@@ -0,0 +1,119 @@
+import asyncio
+import logging
+import time
+from collections import defaultdict, deque
+from typing import Deque, Dict, List, Optional
+
+from discord import Forbidden, Guild, HTTPException, NotFound
+from discord.ext.commands import AutoShardedBot as AB
+
+log = logging.getLogger(__name__)
+
+
+class CounterService:
+    def __init__(
+        self,
+        bot: AB,
+        renames: int = 2,
+        per: float = 600,
+        reload_every: float = 600,
+        concurrency: int = 5,
+    ):
+        """
+        Keeps the counter channels named after their guild's counts.
+        Only the latest value is kept per channel, and a channel is only
+        renamed when its name changes and it has rename quota left
+        """
+
+        self.bot = bot
+        self.renames = renames
+        self.per = per
+        self.reload_every = reload_every
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.rows: List[dict] = []
+        self.loaded_at = 0.0
+        self.history: Dict[int, Deque[float]] = defaultdict(
+            lambda: deque(maxlen=self.renames)
+        )
+        # discord can rewrite the names it's given, so remember what was sent too
+        self.applied: Dict[int, str] = {}
+        self.stats = {"applied": 0, "skipped": 0, "deferred": 0, "failed": 0}
+
+    async def load(self, force: bool = False) -> List[dict]:
+        if force or time.monotonic() - self.loaded_at > self.reload_every:
+            async with self.bot.db.transaction() as conn:
+                self.rows = [
+                    dict(r) for r in await conn.fetch("SELECT * FROM counters")
+                ]
+            self.loaded_at = time.monotonic()
+
+        return self.rows
+
+    def allowed(self, channel_id: int, now: float) -> bool:
+        history = self.history[channel_id]
+        return len(history) < self.renames or now - history[0] >= self.per
+
+    async def count(self, guild: Guild, module: str) -> Optional[int]:
+        match module:
+            case "members":
+                return guild.member_count
+            case "boosters":
+                return len(guild.premium_subscribers)
+            case "voice":
+                return sum(len(c.members) for c in guild.voice_channels)
+            case "humans" | "bots":
+                if not guild.chunked:
+                    await guild.chunk(cache=True)
+
+                bots = sum(1 for m in guild.members if m.bot)
+                return bots if module == "bots" else guild.member_count - bots
+
+    async def update(self) -> Dict[str, int]:
+        """
+        Rename the counters whose value changed, as far as the quota allows
+        """
+
+        now = time.monotonic()
+        counts: Dict[tuple, Optional[int]] = {}
+        edits = []
+
+        for row in await self.load():
+            channel = self.bot.get_channel(int(row["channel_id"]))
+            if not channel or not channel.guild.me.guild_permissions.manage_channels:
+                continue
+
+            # counts are computed once per guild and module, however many counters use them
+            key = (channel.guild.id, row["module"])
+            if key not in counts:
+                counts[key] = await self.count(channel.guild, row["module"])
+
+            if counts[key] is None:
+                continue
+
+            name = row["channel_name"].replace("{target}", str(counts[key]))
+            if name in (channel.name, self.applied.get(channel.id)):
+                self.stats["skipped"] += 1
+            elif not self.allowed(channel.id, now):
+                self.stats["deferred"] += 1
+            else:
+                edits.append(self.rename(channel, name, now))
+
+        await asyncio.gather(*edits)
+        log.debug("Counters: %s", self.stats)
+        return self.stats
+
+    async def rename(self, channel, name: str, now: float) -> None:
+        async with self.semaphore:
+            self.history[channel.id].append(now)
+            try:
+                await channel.edit(name=name, reason="updating counter")
+            except (Forbidden, NotFound):
+                self.stats["failed"] += 1
+                self.history.pop(channel.id, None)
+                self.rows = [r for r in self.rows if int(r["channel_id"]) != channel.id]
+            except HTTPException:
+                self.stats["failed"] += 1
+                log.exception(f"Couldn't rename the counter {channel.id}")
+            else:
+                self.applied[channel.id] = name
+                self.stats["applied"] += 1
@@ -1,5 +1,6 @@
 import asyncio
 import os
+from contextlib import asynccontextmanager
 from types import TracebackType
 from typing import Any, Iterable, Iterator, Optional, Sequence
 
@@ -84,6 +85,16 @@ class PostgreSQL:
             async with conn.transaction():
                 return await conn.fetchval(sql, *args)
 
+    @asynccontextmanager
+    async def transaction(self):
+        """
+        Acquire a connection and run everything on it inside one transaction
+        """
+
+        async with self._pool.acquire() as conn:
+            async with conn.transaction():
+                yield conn
+
     async def executemany(self, sql: str, args: Iterable[Sequence]) -> Optional[Any]:
         if result := self.cache.get(f"{sql} {args}"):
             self.cache.pop(f"{sql} {args}")
@@ -0,0 +1,88 @@
+import time
+from collections import OrderedDict, deque
+from typing import Any, Deque, Hashable, List, Optional, Tuple
+
+
+class SlidingWindow:
+    def __init__(self, limit: int, window: float):
+        """
+        Remembers the last limit + 1 events, which is all it takes to know
+        if more than limit of them happened in the window
+        """
+
+        self.limit = limit
+        self.window = window
+        self.events: Deque[Tuple[float, Any]] = deque(maxlen=limit + 1)
+        self.last = 0.0
+
+    def hit(self, now: float, item: Any = None) -> bool:
+        """
+        Record an event and check if there were more than limit in the window
+        """
+
+        self.events.append((now, item))
+        self.last = now
+        return (
+            len(self.events) == self.events.maxlen
+            and now - self.events[0][0] <= self.window
+        )
+
+    def items(self, now: Optional[float] = None) -> List[Any]:
+        """
+        The items of the events that are still in the window
+        """
+
+        if now is None:
+            now = time.monotonic()
+
+        return [item for ts, item in self.events if now - ts <= self.window]
+
+    def clear(self) -> None:
+        self.events.clear()
+
+
+class Detector:
+    def __init__(self, window: float, idle: float = 600, max_keys: int = 50_000):
+        """
+        Sliding windows per key (a guild, or a guild and author pair).
+        Keys that went idle, or the least active ones past max_keys, are dropped
+        """
+
+        self.window = window
+        self.idle = idle
+        self.max_keys = max_keys
+        self.windows: OrderedDict[Hashable, SlidingWindow] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self.windows)
+
+    def get(self, key: Hashable) -> Optional[SlidingWindow]:
+        return self.windows.get(key)
+
+    def hit(
+        self, key: Hashable, limit: int, item: Any = None, now: Optional[float] = None
+    ) -> bool:
+        if now is None:
+            now = time.monotonic()
+
+        window = self.windows.get(key)
+        if window is None or window.limit != limit:
+            window = self.windows[key] = SlidingWindow(limit, self.window)
+        else:
+            self.windows.move_to_end(key)
+
+        tripped = window.hit(now, item)
+        self.evict(now)
+        return tripped
+
+    def evict(self, now: float) -> None:
+        # the windows are kept in order of activity, so the idle ones are at the front
+        while self.windows:
+            key, window = next(iter(self.windows.items()))
+            if len(self.windows) <= self.max_keys and now - window.last < self.idle:
+                break
+
+            del self.windows[key]
+
+    def clear(self, key: Hashable) -> None:
+        self.windows.pop(key, None)
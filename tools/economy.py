@@ -0,0 +1,193 @@
+from typing import List, Optional, Tuple
+
+from discord.ext.commands import AutoShardedBot as AB
+
+
+class Ledger:
+    def __init__(self, bot: AB):
+        """
+        Every money move as a single guarded statement (or a single transaction)
+        """
+
+        self.bot = bot
+        self.leaderboard_ttl = 60
+
+    async def setup(self) -> None:
+        """
+        Create the indexes the economy queries rely on
+        """
+
+        await self.bot.db.execute(
+            "CREATE INDEX IF NOT EXISTS users_total_balance_idx ON users ((balance + bank_balance) DESC)"
+        )
+        await self.bot.db.execute(
+            "CREATE INDEX IF NOT EXISTS members_guild_user_idx ON members (guild_id, user_id)"
+        )
+
+    async def credit(self, user_id: int, amount: int) -> Optional[int]:
+        """
+        Add money to the wallet. Returns the new wallet balance
+        """
+
+        return await self.bot.db.execute(
+            "UPDATE users SET balance = balance + $1 WHERE user_id = $2 RETURNING balance",
+            amount,
+            user_id,
+        )
+
+    async def deposit(self, user_id: int, amount: int) -> Optional[int]:
+        """
+        Move money from the wallet into the bank. Returns the new bank balance
+        """
+
+        return await self.bot.db.execute(
+            """
+            UPDATE users SET balance = balance - $1, bank_balance = bank_balance + $1
+            WHERE user_id = $2 AND balance >= $1
+            RETURNING bank_balance
+            """,
+            amount,
+            user_id,
+        )
+
+    async def deposit_all(self, user_id: int) -> Optional[int]:
+        """
+        Move the whole wallet into the bank. Returns the amount that was moved
+        """
+
+        return await self.bot.db.execute(
+            """
+            UPDATE users SET bank_balance = users.bank_balance + old.balance, balance = 0
+            FROM (SELECT balance FROM users WHERE user_id = $1 FOR UPDATE) AS old
+            WHERE users.user_id = $1 AND old.balance > 0
+            RETURNING old.balance
+            """,
+            user_id,
+        )
+
+    async def withdraw(self, user_id: int, amount: int) -> Optional[int]:
+        """
+        Move money from the bank into the wallet. Returns the new wallet balance
+        """
+
+        return await self.bot.db.execute(
+            """
+            UPDATE users SET bank_balance = bank_balance - $1, balance = balance + $1
+            WHERE user_id = $2 AND bank_balance >= $1
+            RETURNING balance
+            """,
+            amount,
+            user_id,
+        )
+
+    async def wager(self, user_id: int, amount: int, won: bool) -> Optional[int]:
+        """
+        Settle a bet that could only be placed with enough money in the wallet
+        """
+
+        return await self.bot.db.execute(
+            """
+            UPDATE users SET balance = balance + $1
+            WHERE user_id = $2 AND balance >= $3
+            RETURNING balance
+            """,
+            amount if won else -amount,
+            user_id,
+            amount,
+        )
+
+    async def transfer(
+        self, sender_id: int, recipient_id: int, amount: int
+    ) -> Optional[int]:
+        """
+        Move money between two wallets. Nothing moves unless both accounts exist
+        and the sender can afford it. Returns the sender's new wallet balance
+        """
+
+        if sender_id == recipient_id:
+            return None
+
+        async with self.bot.db.transaction() as conn:
+            balances = await self._lock(conn, sender_id, recipient_id)
+            if len(balances) != 2 or balances[sender_id] < amount:
+                return None
+
+            await self._move(conn, sender_id, recipient_id, amount)
+            return balances[sender_id] - amount
+
+    async def rob(self, robber_id: int, target_id: int, ratio: float) -> Optional[int]:
+        """
+        Steal a share of the target's wallet. The robber must be able to match the
+        stolen amount. Returns the amount stolen
+        """
+
+        if robber_id == target_id:
+            return None
+
+        async with self.bot.db.transaction() as conn:
+            balances = await self._lock(conn, robber_id, target_id)
+            if len(balances) != 2:
+                return None
+
+            amount = int(balances[target_id] * ratio)
+            if amount <= 0 or amount > balances[robber_id]:
+                return None
+
+            await self._move(conn, target_id, robber_id, amount)
+            return amount
+
+    async def _lock(self, conn, *user_ids: int) -> dict:
+        # lock the rows in a stable order so two opposite transfers can't deadlock
+        rows = await conn.fetch(
+            """
+            SELECT user_id, balance FROM users
+            WHERE user_id = ANY($1::BIGINT[])
+            ORDER BY user_id
+            FOR UPDATE
+            """,
+            list(user_ids),
+        )
+        return {row["user_id"]: row["balance"] for row in rows}
+
+    async def _move(self, conn, source_id: int, target_id: int, amount: int) -> None:
+        await conn.execute(
+            """
+            UPDATE users
+            SET balance = balance + CASE WHEN user_id = $2 THEN $3 ELSE -$3 END
+            WHERE user_id IN ($1, $2)
+            """,
+            source_id,
+            target_id,
+            amount,
+        )
+
+    async def wealthy(self, guild_id: int) -> List[Tuple[str, int]]:
+        """
+        The 10 richest members of a guild, cached for a short time
+        """
+
+        key = f"wealthy-{guild_id}"
+        if (cache := self.bot.cache.get(key)) is not None:
+            return cache
+
+        # bypass the query cache of the pool, the ttl above is the only staleness we want
+        async with self.bot.db.transaction() as conn:
+            rows = await conn.fetch(
+                """
+                SELECT users.username, (users.balance + users.bank_balance) AS total_balance
+                FROM users
+                WHERE EXISTS (
+                    SELECT 1 FROM members
+                    WHERE members.user_id = users.user_id AND members.guild_id = $1
+                )
+                ORDER BY (users.balance + users.bank_balance) DESC
+                LIMIT 10
+                """,
+                guild_id,
+            )
+
+        return await self.bot.cache.set(
+            key,
+            [(row["username"], row["total_balance"]) for row in rows],
+            self.leaderboard_ttl,
+        )
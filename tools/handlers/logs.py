@@ -1,6 +1,7 @@
-from asyncio import sleep
+from asyncio import Task, ensure_future, sleep
+from collections import defaultdict, deque
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Deque, Dict, List, Optional, Union
 
 import discord
 from discord import (
@@ -15,6 +16,9 @@ from discord import (
 )
 from pydantic import BaseModel
 
+# discord rejects a message whose embeds add up to more characters than this
+EMBED_LIMIT = 6000
+
 
 class LogGuild(BaseModel):
     id: Optional[int] = None
@@ -380,14 +384,168 @@ async def audit_log_entry_handler(bot, guild: Guild, entry: AuditLogEntry):
 
 
 class Logs:
-    def __init__(self, bot):
+    def __init__(
+        self,
+        bot,
+        window: float = 2.0,
+        max_queue: int = 50,
+        per_message: int = 10,
+        retries: int = 3,
+    ):
+        """
+        Sends the mod logs. The log channel of each guild is cached, and the
+        embeds are queued per guild and sent up to 10 at a time, as long as
+        they fit in one message
+        """
+
         self.bot = bot
+        self.window = window
+        self.max_queue = max_queue
+        self.per_message = per_message
+        self.retries = retries
+        self.attempts: Dict[int, int] = defaultdict(int)
+        self.channels: Dict[int, Optional[int]] = {}
+        self.queues: Dict[int, Deque[Embed]] = {}
+        self.overflow: Dict[int, int] = defaultdict(int)
+        self.workers: Dict[int, Task] = {}
+        self.stats = {
+            "queued": 0,
+            "sent": 0,
+            "messages": 0,
+            "dropped": 0,
+            "coalesced": 0,
+            "retried": 0,
+        }
+
+    async def channel_id(self, guild_id: int) -> Optional[int]:
+        if guild_id not in self.channels:
+            # read past the wrapper's query cache, which keeps serving a disabled channel
+            async with self.bot.db.transaction() as conn:
+                channel_id = await conn.fetchval(
+                    "SELECT channel_id FROM modlogs WHERE guild_id = $1", guild_id
+                )
+            self.channels[guild_id] = int(channel_id) if channel_id else None
+
+        return self.channels[guild_id]
+
+    def set_channel(self, guild_id: int, channel_id: Optional[int]) -> None:
+        """
+        Update the cached log channel after the config changed
+        """
+
+        self.channels[guild_id] = channel_id
+        if not channel_id:
+            self.queues.pop(guild_id, None)
+            self.overflow.pop(guild_id, None)
+
+    def invalidate(self, guild_id: int) -> None:
+        self.channels.pop(guild_id, None)
+
+    def push(self, guild: Guild, embed: Embed) -> None:
+        """
+        Queue an embed, the oldest ones are summarized once the queue is full
+        """
+
+        queue = self.queues.setdefault(guild.id, deque())
+        if len(queue) >= self.max_queue:
+            queue.popleft()
+            self.overflow[guild.id] += 1
+            self.stats["dropped"] += 1
+
+        queue.append(embed)
+        self.stats["queued"] += 1
+        worker = self.workers.get(guild.id)
+        if not worker or worker.done():
+            self.workers[guild.id] = ensure_future(self.flush(guild))
+
+    async def flush(self, guild: Guild) -> None:
+        while queue := self.queues.get(guild.id):
+            # wait a bit so the events of a burst share messages
+            await sleep(self.window)
+
+            channel_id = await self.channel_id(guild.id)
+            channel = guild.get_channel(channel_id) if channel_id else None
+            if not channel:
+                self.stats["dropped"] += len(queue)
+                self.queues.pop(guild.id, None)
+                self.overflow.pop(guild.id, None)
+                return
+
+            summary = None
+            if missed := self.overflow.pop(guild.id, 0):
+                summary = Embed(
+                    color=self.bot.color,
+                    title="Mod Logs",
+                    description=f"**{missed}** more events happened too fast to be logged",
+                )
+
+            embeds = self.batch(queue, summary)
+            try:
+                await channel.send(embeds=embeds)
+            except discord.NotFound:
+                self.stats["dropped"] += len(embeds)
+                self.invalidate(guild.id)
+            except discord.HTTPException as error:
+                if error.status >= 500 and self.attempts[guild.id] < self.retries:
+                    # discord had a hiccup, try the same batch again after the window
+                    self.attempts[guild.id] += 1
+                    self.stats["retried"] += 1
+                    queue.extendleft(reversed(embeds))
+                    continue
+
+                self.attempts.pop(guild.id, None)
+                if error.status < 500 and len(embeds) > 1:
+                    # one bad embed fails the whole message, only drop that one
+                    for embed in embeds:
+                        await self.send_one(channel, embed)
+                else:
+                    self.stats["dropped"] += len(embeds)
+            else:
+                self.attempts.pop(guild.id, None)
+                self.stats["sent"] += len(embeds)
+                self.stats["messages"] += 1
+                self.stats["coalesced"] += len(embeds) - 1
+
+    def batch(
+        self, queue: Deque[Embed], summary: Optional[Embed] = None
+    ) -> List[Embed]:
+        """
+        Take the embeds off the queue that fit in one message with the summary
+        """
+
+        embeds: List[Embed] = []
+        room = self.per_message - (1 if summary else 0)
+        size = len(summary) if summary else 0
+        # an embed too big for any message still goes alone, so the queue moves on
+        while queue and len(embeds) < room:
+            if embeds and size + len(queue[0]) > EMBED_LIMIT:
+                break
+
+            size += len(queue[0])
+            embeds.append(queue.popleft())
+
+        if summary:
+            embeds.append(summary)
+
+        return embeds
+
+    async def send_one(self, channel, embed: Embed) -> None:
+        try:
+            await channel.send(embed=embed)
+        except discord.HTTPException:
+            self.stats["dropped"] += 1
+        else:
+            self.stats["sent"] += 1
+            self.stats["messages"] += 1
 
     async def send_message(self, guild: Guild, **kwargs):
-        if channel_id := await self.bot.db.fetchval(
-            """SELECT channel_id FROM modlogs WHERE guild_id = $1""", guild.id
-        ):
-            if channel := guild.get_channel(int(channel_id)):
+        if set(kwargs) == {"embed"}:
+            if await self.channel_id(guild.id):
+                self.push(guild, kwargs["embed"])
+            return
+
+        if channel_id := await self.channel_id(guild.id):
+            if channel := guild.get_channel(channel_id):
                 return await channel.send(**kwargs)
 
     async def parse_log(self, guild: Guild, log: Union[AuditLogEntry, LogEntry]) -> Any:
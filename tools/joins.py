@@ -0,0 +1,309 @@
+import asyncio
+import logging
+import time
+from collections import defaultdict, deque
+from typing import Deque, Dict, List, Optional, Set, Tuple
+
+from discord import AllowedMentions, HTTPException, Member, Object
+from discord.ext.commands import AutoShardedBot as AB
+from discord.ext.commands import Context
+
+log = logging.getLogger(__name__)
+
+
+class JoinConfig:
+    def __init__(
+        self,
+        joindm: Optional[str] = None,
+        welcome: Optional[List[Tuple[int, str]]] = None,
+        autoping: Optional[List[Tuple[int, str]]] = None,
+        autoroles: Optional[List[int]] = None,
+        jail: Optional[int] = None,
+    ):
+        self.joindm = joindm
+        self.welcome = welcome or []
+        self.autoping = autoping or []
+        self.autoroles = autoroles or []
+        self.jail = jail
+
+    def __bool__(self) -> bool:
+        return bool(
+            self.joindm or self.welcome or self.autoping or self.autoroles or self.jail
+        )
+
+
+class JoinPipeline:
+    def __init__(
+        self,
+        bot: AB,
+        ttl: int = 120,
+        threshold: int = 10,
+        window: float = 10.0,
+        cooldown: float = 60.0,
+        interval: float = 5.0,
+        delay: float = 0.4,
+    ):
+        """
+        Handles the welcome, autoping, joindm, autorole and jail work for
+        new members with one config lookup per guild. When a guild gets more
+        than threshold joins in window seconds it goes into raid mode until
+        the joins stop for cooldown seconds: join dms are skipped, welcome
+        and autoping messages are sent in batches every interval seconds and
+        the roles are handed out by one worker per guild
+        """
+
+        self.bot = bot
+        self.ttl = ttl
+        self.threshold = threshold
+        self.window = window
+        self.cooldown = cooldown
+        self.interval = interval
+        self.delay = delay
+        self.configs: Dict[int, Tuple[float, JoinConfig]] = {}
+        self.joins: Dict[int, Deque[float]] = defaultdict(
+            lambda: deque(maxlen=threshold)
+        )
+        self.raids: Dict[int, float] = {}
+        self.batches: Dict[int, Dict[Tuple[str, int], List[Member]]] = defaultdict(
+            lambda: defaultdict(list)
+        )
+        self.flushing: Set[int] = set()
+        self.roles: Dict[int, Deque[Tuple[Member, List[int], bool]]] = defaultdict(
+            deque
+        )
+        self.workers: Dict[int, asyncio.Task] = {}
+        self.locks = defaultdict(asyncio.Lock)
+
+    def invalidate(self, guild_id: int) -> None:
+        """
+        Load the guild's join config again on the next join
+        """
+
+        self.configs.pop(guild_id, None)
+
+    async def on_command_completion(self, ctx: Context) -> None:
+        if ctx.guild:
+            self.invalidate(ctx.guild.id)
+
+    async def config(self, guild_id: int) -> JoinConfig:
+        """
+        Get everything the guild configured for new members
+        """
+
+        cached = self.configs.get(guild_id)
+        if cached and cached[0] > time.time():
+            return cached[1]
+
+        async with self.bot.db.transaction() as conn:
+            config = JoinConfig(
+                joindm=await conn.fetchval(
+                    "SELECT message FROM joindm WHERE guild_id = $1", guild_id
+                ),
+                welcome=[
+                    tuple(r)
+                    for r in await conn.fetch(
+                        "SELECT channel_id, message FROM welcome WHERE guild_id = $1",
+                        guild_id,
+                    )
+                ],
+                autoping=[
+                    tuple(r)
+                    for r in await conn.fetch(
+                        "SELECT channel_id, message FROM autoping WHERE guild_id = $1",
+                        guild_id,
+                    )
+                ],
+                autoroles=[
+                    r["role_id"]
+                    for r in await conn.fetch(
+                        "SELECT role_id FROM autorole WHERE guild_id = $1", guild_id
+                    )
+                ],
+                jail=await conn.fetchval(
+                    "SELECT role_id FROM jail WHERE guild_id = $1", guild_id
+                ),
+            )
+
+        self.configs[guild_id] = (time.time() + self.ttl, config)
+        return config
+
+    def raid_mode(self, guild_id: int) -> bool:
+        """
+        Record a join and check if the guild is being raided
+        """
+
+        now = time.time()
+        joins = self.joins[guild_id]
+        joins.append(now)
+
+        if len(joins) == self.threshold and now - joins[0] <= self.window:
+            if guild_id not in self.raids:
+                log.warning(f"Raid mode enabled in {guild_id}")
+
+            self.raids[guild_id] = now + self.cooldown
+        elif self.raids.get(guild_id, 0) < now:
+            self.raids.pop(guild_id, None)
+
+        return guild_id in self.raids
+
+    async def on_member_join(self, member: Member) -> None:
+        """
+        The on_member_join listener
+        """
+
+        config = await self.config(member.guild.id)
+        raid = self.raid_mode(member.guild.id)
+
+        if not config:
+            return
+
+        roles = await self.member_roles(member, config)
+        if roles:
+            self.queue_roles(member, roles, raid)
+
+        if raid:
+            for kind, channels in (
+                ("welcome", config.welcome),
+                ("autoping", config.autoping),
+            ):
+                for channel_id, _ in channels:
+                    self.batches[member.guild.id][(kind, channel_id)].append(member)
+
+            if member.guild.id not in self.flushing:
+                self.flushing.add(member.guild.id)
+                asyncio.ensure_future(self.flush(member.guild.id))
+
+            return
+
+        await asyncio.gather(
+            self.joindm(member, config),
+            self.send(member, config.autoping, f"autoping-{member.guild.id}"),
+            self.send(member, config.welcome, f"welcome-{member.guild.id}"),
+            return_exceptions=True,
+        )
+
+    async def member_roles(self, member: Member, config: JoinConfig) -> List[int]:
+        roles = []
+        if config.jail and await self.bot.db.fetchrow(
+            "SELECT * FROM jail_members WHERE guild_id = $1 AND user_id = $2",
+            member.guild.id,
+            member.id,
+        ):
+            roles.append(config.jail)
+
+        roles.extend(config.autoroles)
+        return roles
+
+    async def joindm(self, member: Member, config: JoinConfig) -> None:
+        if not config.joindm:
+            return
+
+        async with self.locks[f"joindm-{member.guild.id}"]:
+            if await self.bot.ratelimiter.ratelimit(f"joindm-{member.guild.id}", 5, 20):
+                await asyncio.sleep(5)
+
+            x = await self.bot.embed_build.alt_convert(member, config.joindm)
+            await member.send(**x)
+
+    async def send(
+        self, member: Member, channels: List[Tuple[int, str]], lock: str
+    ) -> None:
+        async with self.locks[lock]:
+            for channel_id, message in channels:
+                if channel := self.bot.get_channel(channel_id):
+                    perms = channel.permissions_for(member.guild.me)
+                    if perms.send_messages and perms.embed_links:
+                        x = await self.bot.embed_build.alt_convert(member, message)
+                        await channel.send(**x)
+                        await asyncio.sleep(self.delay)
+
+    async def flush(self, guild_id: int) -> None:
+        """
+        Send the welcome and autoping messages collected during a raid
+        """
+
+        try:
+            while True:
+                await asyncio.sleep(self.interval)
+                batches = self.batches.pop(guild_id, None)
+                if not batches:
+                    break
+
+                for key, members in batches.items():
+                    await self.send_batch(key, members)
+        finally:
+            self.flushing.discard(guild_id)
+
+    async def send_batch(self, key: Tuple[str, int], members: List[Member]) -> None:
+        kind, channel_id = key
+        channel = self.bot.get_channel(channel_id)
+        if not channel:
+            return
+
+        perms = channel.permissions_for(channel.guild.me)
+        if not perms.send_messages:
+            return
+
+        prefix = "welcome " if kind == "welcome" else ""
+        chunk = prefix
+        for member in members:
+            if len(chunk) + len(member.mention) + 1 > 2000:
+                await self.send_chunk(channel, chunk, kind)
+                chunk = prefix
+
+            chunk += f"{member.mention} "
+
+        if chunk != prefix:
+            await self.send_chunk(channel, chunk, kind)
+
+    async def send_chunk(self, channel, content: str, kind: str) -> None:
+        try:
+            await channel.send(
+                content,
+                allowed_mentions=AllowedMentions(users=True),
+                delete_after=5 if kind == "autoping" else None,
+            )
+        except HTTPException:
+            pass
+
+        await asyncio.sleep(self.delay)
+
+    def queue_roles(self, member: Member, roles: List[int], raid: bool) -> None:
+        """
+        Give the roles from the guild's worker, one request per member,
+        so a raid only slows down the guild being raided
+        """
+
+        guild_id = member.guild.id
+        self.roles[guild_id].append((member, roles, raid))
+        worker = self.workers.get(guild_id)
+        if not worker or worker.done():
+            self.workers[guild_id] = asyncio.ensure_future(self.assign_roles(guild_id))
+
+    async def assign_roles(self, guild_id: int) -> None:
+        try:
+            while queue := self.roles.get(guild_id):
+                await self.assign(*queue.popleft())
+        finally:
+            self.roles.pop(guild_id, None)
+            self.workers.pop(guild_id, None)
+
+    async def assign(self, member: Member, role_ids: List[int], raid: bool) -> None:
+        guild = member.guild
+        if not guild.me.guild_permissions.manage_roles:
+            return
+
+        roles = [
+            Object(role.id)
+            for role_id in role_ids
+            if (role := guild.get_role(role_id)) and role.is_assignable()
+        ]
+
+        if roles:
+            try:
+                await member.add_roles(*roles, reason="AutoRole")
+            except HTTPException:
+                log.exception(f"Couldn't give the join roles to {member.id}")
+
+            if raid:
+                await asyncio.sleep(self.delay)
@@ -0,0 +1,151 @@
+import asyncio
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from discord.ext.commands import AutoShardedBot as AB
+
+
+class Leaderboard:
+    def __init__(
+        self,
+        bot: AB,
+        table: str,
+        partition: str,
+        columns: Sequence[str],
+        per_page: int = 10,
+        max_pages: int = 10,
+        ttl: int = 30,
+    ):
+        """
+        Ranked pages of a table, read through an index on (partition, *columns DESC, user_id DESC)
+        """
+
+        self.bot = bot
+        self.table = table
+        self.partition = partition
+        self.columns = list(columns)
+        self.per_page = per_page
+        self.max_pages = max_pages
+        self.ttl = ttl
+        self.pages_cache: Dict[Any, Tuple[float, List[List[Any]]]] = {}
+        self.locks: Dict[Any, asyncio.Lock] = defaultdict(asyncio.Lock)
+
+        # user_id breaks ties so every row has a unique position in the ordering
+        self.key = [*self.columns, "user_id"]
+        self.order = ", ".join(f"{c} DESC" for c in self.key)
+        self.row = f"({', '.join(self.key)})"
+        self.cursor = f"({', '.join(f'${i + 2}' for i in range(len(self.key)))})"
+
+    async def setup(self) -> None:
+        """
+        Create the index the pagination and rank lookups rely on
+        """
+
+        await self.bot.db.execute(
+            f"CREATE INDEX IF NOT EXISTS {self.table}_leaderboard_idx ON {self.table} ({self.partition}, {self.order})"
+        )
+
+    def invalidate(self, partition: Any) -> None:
+        """
+        Drop the cached pages after a write that changes the ordering
+        """
+
+        self.pages_cache.pop(partition, None)
+
+    async def fetch_page(
+        self, partition: Any, after: Optional[Any] = None
+    ) -> List[Any]:
+        """
+        Fetch the page that comes right after the given row (or the first page)
+        """
+
+        async with self.bot.db.transaction() as conn:
+            if after is None:
+                return await conn.fetch(
+                    f"""
+                    SELECT * FROM {self.table}
+                    WHERE {self.partition} = $1
+                    ORDER BY {self.order}
+                    LIMIT {self.per_page}
+                    """,
+                    partition,
+                )
+
+            return await conn.fetch(
+                f"""
+                SELECT * FROM {self.table}
+                WHERE {self.partition} = $1
+                AND {self.row} < {self.cursor}
+                ORDER BY {self.order}
+                LIMIT {self.per_page}
+                """,
+                partition,
+                *(after[c] for c in self.key),
+            )
+
+    async def page(self, partition: Any, index: int) -> List[Any]:
+        """
+        Get a page of the leaderboard. Pages are cached per partition for a short time
+        """
+
+        # concurrent fills of the same partition would append the same pages twice
+        async with self.locks[partition]:
+            expires, pages = self.pages_cache.get(partition, (0, []))
+            if expires < time.time():
+                pages = []
+                self.pages_cache[partition] = (time.time() + self.ttl, pages)
+
+            while len(pages) <= index:
+                if pages and len(pages[-1]) < self.per_page:
+                    return []
+
+                pages.append(
+                    await self.fetch_page(partition, pages[-1][-1] if pages else None)
+                )
+
+            return pages[index]
+
+    async def pages(self, partition: Any) -> List[List[Any]]:
+        """
+        Get every page up to the page limit
+        """
+
+        result = []
+        for index in range(self.max_pages):
+            if not (page := await self.page(partition, index)):
+                break
+
+            result.append(page)
+            if len(page) < self.per_page:
+                break
+
+        return result
+
+    async def rank(self, partition: Any, user_id: int) -> Optional[Tuple[int, Any]]:
+        """
+        Get the position of a user and their row with a range count over the index.
+        The count walks every index entry ahead of the user, so it costs O(rank)
+        """
+
+        async with self.bot.db.transaction() as conn:
+            record = await conn.fetchrow(
+                f"SELECT * FROM {self.table} WHERE {self.partition} = $1 AND user_id = $2",
+                partition,
+                user_id,
+            )
+
+            if not record:
+                return None
+
+            ahead = await conn.fetchval(
+                f"""
+                SELECT COUNT(*) FROM {self.table}
+                WHERE {self.partition} = $1
+                AND {self.row} > {self.cursor}
+                """,
+                partition,
+                *(record[c] for c in self.key),
+            )
+
+        return ahead + 1, record
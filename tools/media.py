@@ -0,0 +1,143 @@
+import os
+import re
+import tempfile
+from asyncio import Lock
+from collections import OrderedDict, defaultdict
+from typing import Dict, Optional
+
+from aiofiles import open as async_open
+from aiofiles.os import remove, rename
+from aiohttp import ClientSession as Session
+from discord import File
+from discord.ext.commands import CommandError
+from xxhash import xxh3_64_hexdigest
+
+INSTAGRAM = re.compile(r"instagram\.com/(?:[\w.]+/)?(?:p|reel|reels|tv)/([\w-]+)")
+
+
+class MediaCache:
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        max_bytes: int = 1024 * 1024 * 1024,
+    ):
+        """
+        Keeps the media the reposters download on disk, keyed by the post,
+        so the same post reposted in many guilds is only downloaded once
+        """
+
+        self.directory = directory or os.path.join(
+            tempfile.gettempdir(), "pretend-media"
+        )
+        self.max_bytes = max_bytes
+        self.session: Optional[Session] = None
+        self.files: OrderedDict[str, int] = OrderedDict()
+        self.size = 0
+        self.locks: Dict[str, Lock] = defaultdict(Lock)
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+        os.makedirs(self.directory, exist_ok=True)
+        for entry in sorted(
+            os.scandir(self.directory), key=lambda e: e.stat().st_mtime
+        ):
+            if entry.name.endswith(".part"):
+                os.remove(entry.path)
+                continue
+
+            self.files[entry.name] = entry.stat().st_size
+            self.size += entry.stat().st_size
+
+    @staticmethod
+    def instagram_key(url: str) -> str:
+        """
+        The shortcode of the post, so share links with different query strings match
+        """
+
+        if match := INSTAGRAM.search(url):
+            return f"instagram-{match.group(1)}"
+
+        return f"instagram-{xxh3_64_hexdigest(url)}"
+
+    @staticmethod
+    def tiktok_key(aweme_id: str) -> str:
+        return f"tiktok-{aweme_id}"
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    async def evict(self) -> None:
+        while self.size > self.max_bytes and self.files:
+            name, size = self.files.popitem(last=False)
+            self.locks.pop(name, None)
+            self.size -= size
+            self.stats["evictions"] += 1
+            try:
+                await remove(self.path(name))
+            except FileNotFoundError:
+                pass
+
+    async def download(self, url: str, name: str, limit: int) -> None:
+        """
+        Stream the file to disk, refusing anything over the limit
+        """
+
+        if not self.session or self.session.closed:
+            self.session = Session()
+
+        part = self.path(f"{name}.{os.urandom(4).hex()}.part")
+        size = 0
+        try:
+            async with self.session.get(url) as resp:
+                if resp.status != 200:
+                    raise CommandError("Couldn't download this post")
+
+                if resp.content_length and resp.content_length > limit:
+                    raise CommandError("This post is too big to upload here")
+
+                async with async_open(part, "wb") as file:
+                    async for chunk in resp.content.iter_chunked(256 * 1024):
+                        size += len(chunk)
+                        if size > limit:
+                            raise CommandError("This post is too big to upload here")
+
+                        await file.write(chunk)
+        except BaseException:
+            try:
+                await remove(part)
+            except FileNotFoundError:
+                pass
+            raise
+
+        await rename(part, self.path(name))
+        self.files[name] = size
+        self.size += size
+        await self.evict()
+
+    async def get(self, key: str, url: str, extension: str, limit: int) -> str:
+        """
+        Get the path of the post's media, downloading it on a miss
+        """
+
+        name = f"{key}.{extension}"
+        async with self.locks[name]:
+            if name in self.files:
+                self.files.move_to_end(name)
+                self.stats["hits"] += 1
+                return self.path(name)
+
+            self.stats["misses"] += 1
+            await self.download(url, name, limit)
+            return self.path(name)
+
+    async def file(
+        self, key: str, url: str, extension: str, filename: str, limit: int
+    ) -> File:
+        """
+        A discord file for the post's media
+        """
+
+        path = await self.get(key, url, extension, limit)
+        if os.path.getsize(path) > limit:
+            raise CommandError("This post is too big to upload here")
+
+        return File(path, filename=filename)
@@ -0,0 +1,196 @@
+import asyncio
+import bisect
+import logging
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from discord.ext.commands import AutoShardedBot as AB
+from discord.ext.commands import Context
+
+log = logging.getLogger(__name__)
+
+# upper bounds of the latency buckets, in milliseconds
+BUCKETS: Tuple[float, ...] = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class Histogram:
+    def __init__(self):
+        """
+        Command latencies counted into fixed buckets, the last one is everything slower
+        """
+
+        self.counts: List[int] = [0] * (len(BUCKETS) + 1)
+        self.total = 0.0
+        self.slowest = 0.0
+
+    @property
+    def calls(self) -> int:
+        return sum(self.counts)
+
+    def observe(self, ms: float) -> None:
+        self.counts[bisect.bisect_left(BUCKETS, ms)] += 1
+        self.total += ms
+        self.slowest = max(self.slowest, ms)
+
+    def percentile(self, q: float) -> float:
+        """
+        The upper bound of the bucket the q-th latency falls in
+        """
+
+        target = q * self.calls
+        seen = 0
+        for bound, count in zip(BUCKETS, self.counts):
+            seen += count
+            if count and seen >= target:
+                return bound
+
+        return self.slowest
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            "calls": self.calls,
+            "average": self.total / self.calls if self.calls else 0,
+            "p50": self.percentile(0.5),
+            "p99": self.percentile(0.99),
+            "slowest": self.slowest,
+        }
+
+
+class CommandMetrics:
+    def __init__(self, bot: AB, interval: float = 30.0, max_pending: int = 5000):
+        """
+        Counts command usage per command and guild in memory and writes it
+        with one batched upsert. If the process dies, at most interval
+        seconds or max_pending uses are lost, whichever comes first
+        """
+
+        self.bot = bot
+        self.interval = interval
+        self.max_pending = max_pending
+        self.pending: Counter = Counter()
+        self.uses = 0
+        self.latencies: Dict[str, Histogram] = {}
+        self.lock = asyncio.Lock()
+        self.worker: Optional[asyncio.Task] = None
+        self.ready = False
+
+    async def setup(self) -> None:
+        async with self.bot.db.transaction() as conn:
+            await conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS command_usage (
+                  command TEXT NOT NULL,
+                  guild_id BIGINT NOT NULL,
+                  uses BIGINT NOT NULL DEFAULT 0,
+                  PRIMARY KEY (command, guild_id)
+                )
+                """
+            )
+            await self.migrate(conn)
+
+        self.ready = True
+
+    async def migrate(self, conn) -> None:
+        """
+        Carry the total of the old metrics counter over, once, so the
+        commands executed before command_usage existed keep counting
+        """
+
+        if await conn.fetchval("SELECT EXISTS (SELECT 1 FROM command_usage)"):
+            return
+
+        if not await conn.fetchval("SELECT to_regclass('metrics') IS NOT NULL"):
+            return
+
+        # the old upsert could leave several rows behind, the largest is the running total
+        if legacy := await conn.fetchval("SELECT MAX(command_usage) FROM metrics"):
+            await conn.execute(
+                "INSERT INTO command_usage (command, guild_id, uses) VALUES ($1, $2, $3)",
+                "legacy",
+                0,
+                legacy,
+            )
+
+    async def on_command(self, ctx: Context) -> None:
+        ctx.started_at = time.perf_counter()
+
+    async def on_command_completion(self, ctx: Context) -> None:
+        command = ctx.command.qualified_name
+        self.pending[(command, ctx.guild.id if ctx.guild else 0)] += 1
+        self.uses += 1
+
+        if started := getattr(ctx, "started_at", None):
+            self.latencies.setdefault(command, Histogram()).observe(
+                (time.perf_counter() - started) * 1000
+            )
+
+        log.debug("%s ran %s in %s", ctx.author, command, ctx.guild or "Direct Message")
+
+        if self.uses >= self.max_pending:
+            asyncio.ensure_future(self.flush())
+        elif not self.worker or self.worker.done():
+            self.worker = asyncio.ensure_future(self.run())
+
+    async def run(self) -> None:
+        while self.pending:
+            await asyncio.sleep(self.interval)
+            await self.flush()
+
+    async def flush(self) -> None:
+        """
+        Write the pending counts, putting them back if the write fails
+        """
+
+        async with self.lock:
+            if not self.pending:
+                return
+
+            pending, self.pending = self.pending, Counter()
+            uses, self.uses = self.uses, 0
+            try:
+                if not self.ready:
+                    await self.setup()
+
+                async with self.bot.db.transaction() as conn:
+                    await conn.executemany(
+                        """
+                        INSERT INTO command_usage (command, guild_id, uses) VALUES ($1, $2, $3)
+                        ON CONFLICT (command, guild_id) DO UPDATE SET uses = command_usage.uses + EXCLUDED.uses
+                        """,
+                        [
+                            (command, guild_id, uses)
+                            for (command, guild_id), uses in pending.items()
+                        ],
+                    )
+            except Exception:
+                self.pending.update(pending)
+                self.uses += uses
+                log.exception("Couldn't save the command usage")
+
+    async def total(self) -> int:
+        """
+        Every command ever ran, including the ones not written yet
+        """
+
+        if not self.ready:
+            await self.setup()
+
+        async with self.bot.db.transaction() as conn:
+            written = await conn.fetchval(
+                "SELECT COALESCE(SUM(uses), 0) FROM command_usage"
+            )
+
+        return written + self.uses
+
+    def histograms(self, limit: int = 10) -> Dict[str, Dict[str, float]]:
+        """
+        The latency histograms of the most used commands
+        """
+
+        return {
+            command: histogram.as_dict()
+            for command, histogram in sorted(
+                self.latencies.items(), key=lambda item: item[1].calls, reverse=True
+            )[:limit]
+        }
@@ -7,36 +7,9 @@ from discord.ext import tasks
 from discord.ext.commands import AutoShardedBot as AB
 
 
-@tasks.loop(minutes=10)
+@tasks.loop(minutes=1)
 async def counter_update(bot: AB):
-    results = await bot.db.fetch("SELECT * FROM counters")
-    for result in results:
-        channel = bot.get_channel(int(result["channel_id"]))
-        if channel:
-            guild = channel.guild
-
-            if not guild.chunked:
-                await guild.chunk(cache=True)
-
-            if not guild.me.guild_permissions.manage_channels:
-                continue
-
-            module = result["module"]
-
-            match module:
-                case "members":
-                    target = str(guild.member_count)
-                case "humans":
-                    target = str(len([m for m in guild.members if not m.bot]))
-                case "bots":
-                    target = str(len([m for m in guild.members if m.bot]))
-                case "boosters":
-                    target = str(len(guild.premium_subscribers))
-                case "voice":
-                    target = str(sum(len(c.members) for c in guild.voice_channels))
-
-            name = result["channel_name"].replace("{target}", target)
-            await channel.edit(name=name, reason="updating counter")
+    await bot.counters.update()
 
 
 @tasks.loop(hours=6)
@@ -44,10 +17,9 @@ async def pomelo_task(bot: AB):
     bot.cache.delete("pomelo")
 
 
-@tasks.loop(hours=2)
+@tasks.loop(minutes=10)
 async def snipe_delete(bot: AB):
-    for m in ["snipe", "edit_snipe", "reaction_snipe"]:
-        bot.cache.delete(m)
+    bot.snipes.prune()
 
 
 @tasks.loop(seconds=5)
@@ -1,4 +1,3 @@
-import asyncio
 import datetime
 from typing import Optional, Tuple
 
@@ -6,7 +5,6 @@ import arrow
 from discord import Member, User
 from discord.ext.commands import BadArgument, Converter, MemberConverter
 from pydantic import BaseModel
-from timezonefinder import TimezoneFinder
 
 from ..bot import Pretend
 from ..helpers import GreedContext
@@ -52,25 +50,7 @@ class Timezone:
             12: "December",
         }
 
-    async def get_lat_long(self, location: str) -> Optional[dict]:
-        params = {"q": location, "format": "json"}
-
-        results = await self.bot.session.get_json(
-            "https://nominatim.openstreetmap.org/search", params=params
-        )
-        if len(results) == 0:
-            return None
-
-        return {"lat": float(results[0]["lat"]), "lng": float(results[0]["lon"])}
-
-    async def get_timezone(self, member: Member) -> Optional[str]:
-        timezone = await self.bot.db.fetchval(
-            "SELECT zone FROM timezone WHERE user_id = $1", member.id
-        )
-
-        if not timezone:
-            return None
-
+    def local_date(self, timezone: str) -> str:
         local = arrow.utcnow().to(timezone).naive
         hour = local.strftime("%I:%M %p")
         week_day = self.week_days.get(local.weekday())
@@ -78,34 +58,22 @@ class Timezone:
         day = self.bot.ordinal(local.day)
         return f"{week_day} {month} {day} {hour}"
 
-    async def set_timezone(self, member: Member, location: str) -> str:
-        obj = TimezoneFinder()
-        kwargs = await self.get_lat_long(location)
+    async def get_timezone(self, member: Member) -> Optional[str]:
+        timezone = await self.bot.timezones.get(member.id)
 
-        if not kwargs:
-            raise BadArgument("Wrong location given")
+        if not timezone:
+            return None
 
-        timezone = await asyncio.to_thread(obj.timezone_at, **kwargs)
-        local = arrow.utcnow().to(timezone).naive
-        check = await self.bot.db.fetchrow(
-            "SELECT * FROM timezone WHERE user_id = $1", member.id
-        )
+        return self.local_date(timezone)
 
-        if not check:
-            await self.bot.db.execute(
-                "INSERT INTO timezone VALUES ($1,$2)", member.id, timezone
-            )
-        else:
-            await self.bot.db.execute(
-                "UPDATE timezone SET zone = $1 WHERE user_id = $2", timezone, member.id
-            )
+    async def set_timezone(self, member: Member, location: str) -> str:
+        timezone = await self.bot.timezones.resolve(location)
 
-        hour = local.strftime("%I:%M %p")
-        week_day = self.week_days.get(local.weekday())
-        month = self.months.get(local.month)
-        day = self.bot.ordinal(local.day)
+        if not timezone:
+            raise BadArgument("Wrong location given")
 
-        payload = {"timezone": timezone, "date": f"{week_day} {month} {day} {hour}"}
+        await self.bot.timezones.set(member.id, timezone)
+        payload = {"timezone": timezone, "date": self.local_date(timezone)}
 
         return TimezoneSchema(**payload)
 
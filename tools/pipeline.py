@@ -0,0 +1,177 @@
+import asyncio
+import enum
+import logging
+import time
+from typing import Any, Callable, Coroutine, Dict, List, Optional, Tuple
+
+from discord import Message
+from discord.ext.commands import AutoShardedBot as AB
+from discord.ext.commands import Context
+
+log = logging.getLogger(__name__)
+
+
+class Feature(enum.IntFlag):
+    NONE = 0
+    LEVELING = enum.auto()
+    AUTORESPONDER = enum.auto()
+    AUTOREACT = enum.auto()
+    AFK = enum.auto()
+    ANTISPAM = enum.auto()
+    MASS_MENTION = enum.auto()
+    BUMP = enum.auto()
+
+
+# the condition that makes a feature enabled for the guild in $1
+FEATURES: Dict[Feature, str] = {
+    Feature.LEVELING: "EXISTS (SELECT 1 FROM leveling WHERE guild_id = $1)",
+    Feature.AUTORESPONDER: "EXISTS (SELECT 1 FROM autoresponder WHERE guild_id = $1)",
+    Feature.AUTOREACT: "EXISTS (SELECT 1 FROM autoreact WHERE guild_id = $1)",
+    Feature.AFK: "EXISTS (SELECT 1 FROM afk WHERE guild_id = $1)",
+    Feature.ANTISPAM: "EXISTS (SELECT 1 FROM antispam WHERE guild_id = $1)",
+    Feature.MASS_MENTION: "EXISTS (SELECT 1 FROM antinuke_modules WHERE guild_id = $1 AND module = 'mass mention')",
+    Feature.BUMP: "EXISTS (SELECT 1 FROM bumpreminder WHERE guild_id = $1)",
+}
+
+Callback = Callable[[Message], Coroutine[Any, Any, Any]]
+Check = Callable[[Message], bool]
+
+
+class Stage:
+    def __init__(
+        self,
+        name: str,
+        callback: Callback,
+        feature: Feature = Feature.NONE,
+        check: Optional[Check] = None,
+    ):
+        self.name = name
+        self.callback = callback
+        self.feature = feature
+        self.check = check
+        self.calls = 0
+        self.skipped = 0
+        self.failures = 0
+        self.total = 0.0
+        self.slowest = 0.0
+
+    def __repr__(self) -> str:
+        return f"<Stage name={self.name!r} calls={self.calls} skipped={self.skipped}>"
+
+    async def run(self, message: Message) -> None:
+        start = time.perf_counter()
+        try:
+            await self.callback(message)
+        except Exception:
+            self.failures += 1
+            log.exception(f"Message stage {self.name} failed")
+        finally:
+            elapsed = time.perf_counter() - start
+            self.calls += 1
+            self.total += elapsed
+            self.slowest = max(self.slowest, elapsed)
+
+
+class MessagePipeline:
+    def __init__(self, bot: AB, ttl: int = 120):
+        """
+        Runs the message listeners of the cogs from a single on_message,
+        skipping the ones whose feature isn't configured in the guild
+        """
+
+        self.bot = bot
+        self.ttl = ttl
+        self.stages: Dict[str, Stage] = {}
+        self.features: Dict[int, Tuple[float, Feature]] = {}
+        self.query = "SELECT " + ", ".join(FEATURES.values())
+
+    def add(
+        self,
+        name: str,
+        callback: Callback,
+        feature: Feature = Feature.NONE,
+        check: Optional[Check] = None,
+    ) -> None:
+        """
+        Register a stage. It only runs in guilds with the feature enabled
+        and for messages that pass the check
+        """
+
+        self.stages[name] = Stage(name, callback, feature, check)
+
+    def remove(self, name: str) -> None:
+        self.stages.pop(name, None)
+
+    def invalidate(self, guild_id: int) -> None:
+        """
+        Resolve the guild's features again on its next message
+        """
+
+        self.features.pop(guild_id, None)
+
+    async def resolve(self, guild_id: int) -> Feature:
+        """
+        Get the features enabled in the guild with one query
+        """
+
+        cached = self.features.get(guild_id)
+        if cached and cached[0] > time.time():
+            return cached[1]
+
+        async with self.bot.db.transaction() as conn:
+            record = await conn.fetchrow(self.query, guild_id)
+
+        features = Feature.NONE
+        for feature, enabled in zip(FEATURES, record):
+            if enabled:
+                features |= feature
+
+        self.features[guild_id] = (time.time() + self.ttl, features)
+        return features
+
+    async def dispatch(self, message: Message) -> None:
+        """
+        The on_message listener
+        """
+
+        if not message.guild:
+            return
+
+        stages: List[Stage] = []
+        for stage in self.stages.values():
+            if stage.check and not stage.check(message):
+                stage.skipped += 1
+                continue
+
+            stages.append(stage)
+
+        if any(stage.feature for stage in stages):
+            features = await self.resolve(message.guild.id)
+            for stage in [s for s in stages if s.feature and not s.feature & features]:
+                stage.skipped += 1
+                stages.remove(stage)
+
+        if stages:
+            await asyncio.gather(*(stage.run(message) for stage in stages))
+
+    async def on_command_completion(self, ctx: Context) -> None:
+        # configuration only changes through commands
+        if ctx.guild:
+            self.invalidate(ctx.guild.id)
+
+    @property
+    def timings(self) -> Dict[str, Dict[str, float]]:
+        """
+        Per stage counters
+        """
+
+        return {
+            stage.name: {
+                "calls": stage.calls,
+                "skipped": stage.skipped,
+                "failures": stage.failures,
+                "average": stage.total / stage.calls if stage.calls else 0.0,
+                "slowest": stage.slowest,
+            }
+            for stage in self.stages.values()
+        }
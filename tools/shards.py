@@ -0,0 +1,79 @@
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Set
+
+
+class ShardCounters:
+    def __init__(self):
+        """
+        Guild and member counts per shard, kept up to date from the gateway
+        events instead of scanning every guild on each publish
+        """
+
+        self.guilds: Dict[int, Set[int]] = defaultdict(set)
+        self.members: Dict[int, int] = defaultdict(int)
+        # the guild id lists are only rebuilt after the shard's guilds change
+        self.listed: Dict[int, List[str]] = {}
+        self.ready = False
+
+    def guild_join(self, guild: Any) -> None:
+        if guild.id in self.guilds[guild.shard_id]:
+            return
+
+        self.guilds[guild.shard_id].add(guild.id)
+        self.members[guild.shard_id] += guild.member_count or 0
+        self.listed.pop(guild.shard_id, None)
+
+    def guild_remove(self, guild: Any) -> None:
+        if guild.id not in self.guilds[guild.shard_id]:
+            return
+
+        self.guilds[guild.shard_id].discard(guild.id)
+        self.members[guild.shard_id] -= guild.member_count or 0
+        self.listed.pop(guild.shard_id, None)
+
+    def member_join(self, guild: Any) -> None:
+        if guild.id in self.guilds[guild.shard_id]:
+            self.members[guild.shard_id] += 1
+
+    def member_remove(self, guild: Any) -> None:
+        if guild.id in self.guilds[guild.shard_id]:
+            self.members[guild.shard_id] -= 1
+
+    def reconcile(self, guilds: Iterable[Any]) -> int:
+        """
+        Recount everything from the guild cache and return how far the member counts had drifted
+        """
+
+        counted_guilds: Dict[int, Set[int]] = defaultdict(set)
+        counted_members: Dict[int, int] = defaultdict(int)
+        for guild in guilds:
+            counted_guilds[guild.shard_id].add(guild.id)
+            counted_members[guild.shard_id] += guild.member_count or 0
+
+        drift = sum(
+            abs(counted_members[shard] - self.members.get(shard, 0))
+            for shard in set(counted_members) | set(self.members)
+        )
+
+        self.listed = {
+            shard: ids
+            for shard, ids in self.listed.items()
+            if counted_guilds.get(shard) == self.guilds.get(shard)
+        }
+        self.guilds, self.members = counted_guilds, counted_members
+        self.ready = True
+        return drift
+
+    def guild_count(self, shard_id: int) -> int:
+        return len(self.guilds.get(shard_id, ()))
+
+    def member_count(self, shard_id: int) -> int:
+        return self.members.get(shard_id, 0)
+
+    def guild_ids(self, shard_id: int) -> List[str]:
+        if (ids := self.listed.get(shard_id)) is None:
+            ids = self.listed[shard_id] = [
+                str(g) for g in self.guilds.get(shard_id, ())
+            ]
+
+        return ids
@@ -0,0 +1,96 @@
+import time
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+Key = Tuple[str, int]
+
+
+class SnipeStore:
+    def __init__(self, capacity: int = 20, ttl: int = 7200, limit: int = 100_000):
+        """
+        Fixed-size buffers of deleted/edited messages and removed reactions per channel.
+        Entries age out after the ttl, and once the whole store holds more than the
+        limit the least recently active channels lose their oldest entries first
+        """
+
+        self.capacity = capacity
+        self.ttl = ttl
+        self.limit = limit
+        self.size = 0
+        self.buffers: OrderedDict[Key, Deque[Dict[str, Any]]] = OrderedDict()
+
+    def __repr__(self) -> str:
+        return f"<SnipeStore channels={len(self.buffers)} entries={self.size}>"
+
+    def expire(self, key: Key) -> Optional[Deque[Dict[str, Any]]]:
+        if not (buffer := self.buffers.get(key)):
+            return None
+
+        deadline = time.time() - self.ttl
+        while buffer and buffer[0]["created_at"] < deadline:
+            buffer.popleft()
+            self.size -= 1
+
+        if not buffer:
+            del self.buffers[key]
+            return None
+
+        return buffer
+
+    def add(self, kind: str, channel_id: int, **record: Any) -> None:
+        """
+        Add an entry to the channel's buffer
+        """
+
+        key = (kind, channel_id)
+        # the ttl counts from when the entry was added, so the buffers stay in time order
+        record["created_at"] = time.time()
+
+        if (buffer := self.buffers.get(key)) is None:
+            buffer = self.buffers[key] = deque(maxlen=self.capacity)
+        else:
+            self.buffers.move_to_end(key)
+
+        if len(buffer) == buffer.maxlen:
+            self.size -= 1
+
+        buffer.append(record)
+        self.size += 1
+
+        while self.size > self.limit:
+            oldest, stale = next(iter(self.buffers.items()))
+            stale.popleft()
+            self.size -= 1
+            if not stale:
+                del self.buffers[oldest]
+
+    def get(
+        self, kind: str, channel_id: int, index: int = 1
+    ) -> Tuple[Optional[Dict[str, Any]], int]:
+        """
+        Get the entry at the index (1 being the newest) and the amount of entries
+        """
+
+        if not (buffer := self.expire((kind, channel_id))):
+            return None, 0
+
+        if not 1 <= index <= len(buffer):
+            return None, len(buffer)
+
+        return buffer[-index], len(buffer)
+
+    def clear(self, channel_id: int) -> None:
+        """
+        Remove every entry of the channel
+        """
+
+        for key in [k for k in self.buffers if k[1] == channel_id]:
+            self.size -= len(self.buffers.pop(key))
+
+    def prune(self) -> None:
+        """
+        Drop every expired entry
+        """
+
+        for key in list(self.buffers):
+            self.expire(key)
@@ -0,0 +1,53 @@
+import logging
+import os
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator
+
+log = logging.getLogger(__name__)
+
+
+class StartupProfiler:
+    def __init__(self):
+        """
+        Times the phases of the startup, from the moment the bot is created
+        """
+
+        self.started = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+        self.marks: Dict[str, float] = {}
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = time.perf_counter() - start
+            log.info(f"Startup: {name} took {self.phases[name]:.2f}s")
+
+    def mark(self, name: str) -> None:
+        """
+        Record how long after the start something happened, only the first time
+        """
+
+        if name not in self.marks:
+            self.marks[name] = time.perf_counter() - self.started
+            log.info(f"Startup: {name} after {self.marks[name]:.2f}s")
+
+    def report(self) -> str:
+        lines = [f"{name}: {took:.2f}s" for name, took in self.phases.items()]
+        lines.extend(f"{name}: +{at:.2f}s" for name, at in self.marks.items())
+        return "\n".join(lines)
+
+
+def count_lines(root: str = "./") -> int:
+    lines = 0
+    for directory, dirs, files in os.walk(root):
+        dirs[:] = [d for d in dirs if d not in (".git", "__pycache__")]
+        for file in files:
+            if file.endswith(".py"):
+                with open(os.path.join(directory, file), "rb") as f:
+                    lines += sum(1 for _ in f)
+
+    return lines
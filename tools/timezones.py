@@ -0,0 +1,157 @@
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from discord.ext.commands import AutoShardedBot as AB
+
+log = logging.getLogger(__name__)
+
+Coordinates = Tuple[float, float]
+MISSING = object()
+
+
+class Geocoder(ABC):
+    """
+    Turns a location into coordinates
+    """
+
+    @abstractmethod
+    async def locate(self, location: str) -> Optional[Coordinates]:
+        """
+        The coordinates of a location, or None when it can't be found
+        """
+
+
+class NominatimGeocoder(Geocoder):
+    def __init__(self, bot: AB):
+        self.bot = bot
+
+    async def locate(self, location: str) -> Optional[Coordinates]:
+        results = await self.bot.session.get_json(
+            "https://nominatim.openstreetmap.org/search",
+            params={"q": location, "format": "json"},
+        )
+        if not results:
+            return None
+
+        return float(results[0]["lat"]), float(results[0]["lon"])
+
+
+class StaticGeocoder(Geocoder):
+    def __init__(self, places: Dict[str, Coordinates]):
+        """
+        Geocodes from a fixed table of places, for running without network access
+        """
+
+        self.places = {TimezoneResolver.normalize(k): v for k, v in places.items()}
+        self.lookups = 0
+
+    async def locate(self, location: str) -> Optional[Coordinates]:
+        self.lookups += 1
+        return self.places.get(TimezoneResolver.normalize(location))
+
+
+class LRU(OrderedDict):
+    def __init__(self, max_size: int):
+        super().__init__()
+        self.max_size = max_size
+
+    def get(self, key, default=None):
+        if key not in self:
+            return default
+
+        self.move_to_end(key)
+        return self[key]
+
+    def put(self, key, value) -> None:
+        self[key] = value
+        self.move_to_end(key)
+        while len(self) > self.max_size:
+            self.popitem(last=False)
+
+
+class TimezoneResolver:
+    def __init__(
+        self,
+        bot: AB,
+        geocoder: Optional[Geocoder] = None,
+        max_locations: int = 10_000,
+        max_users: int = 50_000,
+    ):
+        """
+        Resolves locations to timezone names with one shared TimezoneFinder,
+        and remembers the locations it resolved and the zones of the users
+        """
+
+        self.bot = bot
+        self.geocoder = geocoder or NominatimGeocoder(bot)
+        self.locations = LRU(max_locations)
+        self.users = LRU(max_users)
+        self.finder = None
+        self.lock = asyncio.Lock()
+
+    @staticmethod
+    def normalize(location: str) -> str:
+        return " ".join(location.casefold().replace(",", " ").split())
+
+    async def load(self):
+        """
+        Load the polygon data once, in a thread so it doesn't block the loop
+        """
+
+        async with self.lock:
+            if self.finder is None:
+                from timezonefinder import TimezoneFinder
+
+                self.finder = await asyncio.to_thread(TimezoneFinder)
+                log.info("Loaded the timezone finder")
+
+        return self.finder
+
+    async def resolve(self, location: str) -> Optional[str]:
+        """
+        The timezone name of a location
+        """
+
+        key = self.normalize(location)
+        if (zone := self.locations.get(key, MISSING)) is not MISSING:
+            return zone
+
+        zone = None
+        if coordinates := await self.geocoder.locate(location):
+            finder = await self.load()
+            lat, lng = coordinates
+            zone = await asyncio.to_thread(finder.timezone_at, lat=lat, lng=lng)
+
+        self.locations.put(key, zone)
+        return zone
+
+    async def get(self, user_id: int) -> Optional[str]:
+        if (zone := self.users.get(user_id, MISSING)) is not MISSING:
+            return zone
+
+        async with self.bot.db.transaction() as conn:
+            zone = await conn.fetchval(
+                "SELECT zone FROM timezone WHERE user_id = $1", user_id
+            )
+
+        self.users.put(user_id, zone)
+        return zone
+
+    async def set(self, user_id: int, zone: str) -> None:
+        async with self.bot.db.transaction() as conn:
+            status = await conn.execute(
+                "UPDATE timezone SET zone = $1 WHERE user_id = $2", zone, user_id
+            )
+            if status == "UPDATE 0":
+                await conn.execute("INSERT INTO timezone VALUES ($1,$2)", user_id, zone)
+
+        self.users.put(user_id, zone)
+
+    async def unset(self, user_id: int) -> None:
+        async with self.bot.db.transaction() as conn:
+            await conn.execute("DELETE FROM timezone WHERE user_id = $1", user_id)
+
+        self.users.put(user_id, None)
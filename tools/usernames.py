@@ -0,0 +1,157 @@
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional, Tuple
+
+from aiohttp import ClientSession as Session
+from aiohttp import ClientTimeout
+from discord import User
+from discord.ext.commands import AutoShardedBot as AB
+
+log = logging.getLogger(__name__)
+
+
+class UsernameHistory:
+    def __init__(
+        self,
+        bot: AB,
+        interval: float = 5.0,
+        batch: int = 500,
+        concurrency: int = 10,
+    ):
+        """
+        Collects username changes, writes them to the database in batches
+        and posts the freed up usernames to the tracking webhooks
+        """
+
+        self.bot = bot
+        self.interval = interval
+        self.batch = batch
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.queue: asyncio.Queue[
+            Tuple[int, Optional[str], int, Optional[str]]
+        ] = asyncio.Queue()
+        self.webhooks: Optional[Dict[int, str]] = None
+        self.backoff: Dict[str, Tuple[float, float]] = {}
+        self.session: Optional[Session] = None
+        self.worker: Optional[asyncio.Task] = None
+
+    async def load_webhooks(self) -> Dict[int, str]:
+        if self.webhooks is None:
+            async with self.bot.db.transaction() as conn:
+                self.webhooks = {
+                    r["guild_id"]: r["webhook_url"]
+                    for r in await conn.fetch(
+                        "SELECT guild_id, webhook_url FROM username_track"
+                    )
+                }
+
+        return self.webhooks
+
+    async def track(self, guild_id: int, url: str) -> None:
+        await self.bot.db.execute(
+            "INSERT INTO username_track VALUES ($1,$2)", guild_id, url
+        )
+        (await self.load_webhooks())[guild_id] = url
+
+    async def untrack(self, guild_id: int) -> None:
+        await self.bot.db.execute(
+            "DELETE FROM username_track WHERE guild_id = $1", guild_id
+        )
+        (await self.load_webhooks()).pop(guild_id, None)
+
+    def push(self, before: User, after: User) -> None:
+        """
+        Queue a user update
+        """
+
+        if before.name == after.name and str(before) == str(after):
+            return
+
+        self.queue.put_nowait(
+            (
+                after.id,
+                str(before) if before.name != after.name else None,
+                int(time.time()),
+                str(before) if str(before) != str(after) else None,
+            )
+        )
+        if not self.worker or self.worker.done():
+            self.worker = asyncio.ensure_future(self.run())
+
+    async def run(self) -> None:
+        while not self.queue.empty():
+            await asyncio.sleep(self.interval)
+            changes = []
+            while not self.queue.empty() and len(changes) < self.batch:
+                changes.append(self.queue.get_nowait())
+
+            try:
+                await self.write(changes)
+            except Exception:
+                log.exception("Couldn't save the username history")
+
+            if available := [c[3] for c in changes if c[3]]:
+                await self.broadcast(available)
+
+    async def write(
+        self, changes: List[Tuple[int, Optional[str], int, Optional[str]]]
+    ) -> None:
+        if rows := [(user_id, name, ts) for user_id, name, ts, _ in changes if name]:
+            async with self.bot.db.transaction() as conn:
+                await conn.executemany("INSERT INTO usernames VALUES ($1,$2,$3)", rows)
+
+    async def broadcast(self, names: List[str]) -> None:
+        """
+        Post the available usernames to every tracking webhook, as few messages as possible
+        """
+
+        messages, content = [], ""
+        for name in names:
+            line = f"New username available: **{name}**\n"
+            if len(content) + len(line) > 2000:
+                messages.append(content)
+                content = ""
+            content += line
+        messages.append(content)
+
+        webhooks = await self.load_webhooks()
+        await asyncio.gather(
+            *(
+                self.post(guild_id, url, messages)
+                for guild_id, url in list(webhooks.items())
+            )
+        )
+
+    async def post(self, guild_id: int, url: str, messages: List[str]) -> None:
+        until, delay = self.backoff.get(url, (0, 0))
+        if until > time.time():
+            return
+
+        if not self.session or self.session.closed:
+            self.session = Session(timeout=ClientTimeout(total=15))
+
+        async with self.semaphore:
+            for content in messages:
+                json = {
+                    "username": "pretend-usernames",
+                    "content": content,
+                    "avatar_url": self.bot.user.display_avatar.url,
+                }
+                try:
+                    async with self.session.post(url, json=json) as r:
+                        status = r.status
+                        retry_after = float(r.headers.get("Retry-After", 0) or 0)
+                except Exception:
+                    status, retry_after = 0, 0
+
+                if status in (200, 204):
+                    self.backoff.pop(url, None)
+                elif status in (401, 403, 404):
+                    # the webhook was deleted
+                    await self.untrack(guild_id)
+                    return
+                else:
+                    delay = min(max(delay * 2, 5, retry_after), 600)
+                    self.backoff[url] = (time.time() + delay, delay)
+                    return
@@ -1,7 +1,5 @@
 from datetime import datetime
 
-import aiohttp
-
 
 class Comment:
     def __init__(self, api):
@@ -10,19 +8,15 @@ class Comment:
     async def get_comments(
         self, video_id, cursor="0", count="20", region="US", raw=False
     ):
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                f"https://api2-19-h2.musical.ly/aweme/v1/comment/list/?aweme_id={video_id}&cursor={cursor}&count={count}&comment_style=2&device_type=SM-G973N&region={region}"
-            ) as comments:
-                res = await comments.json()
+        res = await self.api.get_json(
+            f"{self.api.host}/aweme/v1/comment/list/?aweme_id={video_id}&cursor={cursor}&count={count}&comment_style=2&device_type=SM-G973N&region={region}"
+        )
         return self.format_comments(res["comments"], raw)
 
     async def get_replies(self, comment_id, count="20", cursor="0", raw=False):
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                f"https://api2-19-h2.musical.ly/aweme/v1/comment/list/reply/?comment_id={comment_id}&cursor={cursor}&count={count}&comment_style=2&device_type=SM-G973N&media_type=4"
-            ) as replies:
-                res = await replies.json()
+        res = await self.api.get_json(
+            f"{self.api.host}/aweme/v1/comment/list/reply/?comment_id={comment_id}&cursor={cursor}&count={count}&comment_style=2&device_type=SM-G973N&media_type=4"
+        )
         return self.format_comments(res["comments"], raw=raw)
 
     def format_comments(self, comments_data, raw=False, replies=False):
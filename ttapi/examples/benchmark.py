@@ -0,0 +1,121 @@
+"""
+Benchmarks ttapi against a local fake of the tiktok endpoints, so it can
+run without network access. From the repository root:
+
+    PYTHONPATH=. python ttapi/examples/benchmark.py
+"""
+
+import asyncio
+import time
+
+from aiohttp import web
+
+from ttapi import TikTokApi
+
+VIDEO_SIZE = 8 * 1024 * 1024
+REQUESTS = 200
+
+
+def aweme(video_id, host):
+    return {
+        "aweme_id": video_id,
+        "create_time": 1700000000,
+        "desc": "benchmark",
+        "author": {
+            "unique_id": "bench",
+            "nickname": "bench",
+            "sec_uid": "0",
+            "uid": "0",
+            "avatar_larger": {"url_list": [f"{host}/avatar.webp"]},
+        },
+        "video": {
+            "duration": 10000,
+            "play_addr": {"url_list": [f"{host}/video.mp4"] * 3},
+        },
+        "statistics": {
+            "comment_count": 0,
+            "digg_count": 0,
+            "download_count": 0,
+            "play_count": 0,
+            "share_count": 0,
+        },
+        "music": {
+            "mid": "0",
+            "album": "",
+            "title": "bench",
+            "author": "bench",
+            "duration": 10,
+        },
+    }
+
+
+async def start_server():
+    stats = {"detail": 0, "video": 0}
+    payload = b"\0" * VIDEO_SIZE
+
+    async def detail(request):
+        stats["detail"] += 1
+        host = f"http://{request.host}"
+        return web.json_response(
+            {"aweme_detail": aweme(request.query["aweme_id"], host)}
+        )
+
+    async def video(request):
+        stats["video"] += 1
+        return web.Response(body=payload, content_type="video/mp4")
+
+    app = web.Application()
+    app.router.add_get("/aweme/v1/aweme/detail/", detail)
+    app.router.add_get("/video.mp4", video)
+
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}", stats
+
+
+async def timed(name, coros):
+    start = time.perf_counter()
+    await asyncio.gather(*coros)
+    elapsed = time.perf_counter() - start
+    print(f"{name:<28} {elapsed * 1000:8.1f}ms  ({len(coros)} calls)")
+
+
+async def main():
+    runner, host, stats = await start_server()
+    tiktok = TikTokApi(host=host)
+    share = "https://www.tiktok.com/t/ZTRf85djY/"
+    # share links are resolved against tiktok itself, so seed the redirect cache
+    tiktok.redirects.set(
+        share, "https://www.tiktok.com/@bench/video/7116227445648395526"
+    )
+
+    async def parse():
+        return await tiktok.video.parse_video_data(share)
+
+    try:
+        await timed("parse_video_data (cold)", [parse()])
+        await timed("parse_video_data (cached)", [parse() for _ in range(REQUESTS)])
+        await timed(
+            "get_video_binary",
+            [tiktok.video.get_video_binary(f"{host}/video.mp4") for _ in range(20)],
+        )
+        await timed(
+            "get_video_binary (capped)",
+            [
+                tiktok.video.get_video_binary(f"{host}/video.mp4", VIDEO_SIZE // 2)
+                for _ in range(20)
+            ],
+        )
+        print(
+            f"server hits: {stats}, detail cache: {tiktok.details.hits} hits / {tiktok.details.misses} misses"
+        )
+    finally:
+        await tiktok.close()
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
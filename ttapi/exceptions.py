@@ -33,3 +33,16 @@ class web_user_agent(Exception):
         message += func
         self.message = message
         super().__init__(self.message)
+
+
+class Too_Large(Exception):
+    """Raised when a video is bigger than the max_size passed to the download"""
+
+    def __init__(
+        self,
+        max_size,
+        message="The video is bigger than the allowed size",
+    ):
+        message += f" ({max_size} bytes)"
+        self.message = message
+        super().__init__(self.message)
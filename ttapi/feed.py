@@ -2,7 +2,6 @@ import time
 from datetime import datetime
 from re import L
 
-import aiohttp
 import orjson
 
 from .exceptions import No_Response
@@ -31,12 +30,10 @@ class Feed:
             _rticket = str(time.time() * 1000).split(".")[0]
             ts = str(time.time()).split(".")[0]
             req_from = self.set_req_from(min_cursor, max_cursor)
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    f"https://api2-19-h2.musical.ly/aweme/v1/feed/?type=0&max_cursor={max_cursor}&min_cursor={min_cursor}&count={count}&{req_from}&volume=0.2&pull_type={pull_type}&ts={ts}&_rticket={_rticket}&address_book_access=1&gps_access=2&os_api=25&device_type=SM-G973N&dpi=320&uoo=0&region={region}&carrier_region={region}&app_name=musical_ly"
-                ) as feed_request:
-                    res = await feed_request.json()
-                    data = res["aweme_list"]
+            res = await self.api.get_json(
+                f"{self.api.host}/aweme/v1/feed/?type=0&max_cursor={max_cursor}&min_cursor={min_cursor}&count={count}&{req_from}&volume=0.2&pull_type={pull_type}&ts={ts}&_rticket={_rticket}&address_book_access=1&gps_access=2&os_api=25&device_type=SM-G973N&dpi=320&uoo=0&region={region}&carrier_region={region}&app_name=musical_ly"
+            )
+            data = res["aweme_list"]
             videos = []
             for vid in data:
                 if raw_data:
@@ -65,11 +62,9 @@ class Feed:
         Returns:
             _type_: _description_
         """
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                f"https://api2-19-h2.musical.ly/aweme/v2/category/list/?cursor={cursor}&count={count}&os_api=25&device_type=SM-G973N&ssmix=a&manifest_version_code=2019090808&dpi=320&carrier_region={region}&uoo=0&region={region}&app_name=musical_ly&version_name=13.0.3&is_my_cn=0&ac2=wifi&ac=wifi&app_type=normal&channel=googleplay&build_number=13.0.3&locale=en&sys_region={region}"
-            ) as trending_categories_request:
-                res = await trending_categories_request.json()
+        res = await self.api.get_json(
+            f"{self.api.host}/aweme/v2/category/list/?cursor={cursor}&count={count}&os_api=25&device_type=SM-G973N&ssmix=a&manifest_version_code=2019090808&dpi=320&carrier_region={region}&uoo=0&region={region}&app_name=musical_ly&version_name=13.0.3&is_my_cn=0&ac2=wifi&ac=wifi&app_type=normal&channel=googleplay&build_number=13.0.3&locale=en&sys_region={region}"
+        )
         if raw:
             return res
         else:
@@ -5,6 +5,7 @@ import string
 import aiohttp
 import orjson
 
+from .cache import TTLCache
 from .comment import Comment
 from .debug import Debug
 from .feed import Feed
@@ -21,6 +22,10 @@ class TikTokApi:
             proxies (dict, optional): _description_. Defaults to {}.
             debug (bool, optional): _description_. Defaults to False.
             msToken (str, optional): _Required to get data from some endpoints, these usually expire after 24H_.
+            http (aiohttp.ClientSession, optional): _Session used for every request, one is created on first use if not passed_.
+            host (str, optional): _Base url of the api_. Defaults to https://api2-19-h2.musical.ly.
+            redirect_ttl (float, optional): _Seconds a resolved short url is cached_. Defaults to 3600.
+            detail_ttl (float, optional): _Seconds the data of a video is cached_. Defaults to 300.
         """
         self.headers = {"user-agent": "okhttp/3.10.0.1"}
         if kwargs.get("session"):
@@ -29,8 +34,11 @@ class TikTokApi:
         self.setup_headers(headers)
         self.params = {}
         self.setup_params(kwargs)
-        self.session = aiohttp.ClientSession()
-        self.session.headers.update(self.headers)
+        self.host = kwargs.get("host") or "https://api2-19-h2.musical.ly"
+        self.session = kwargs.get("http")
+        self.owns_session = self.session is None
+        self.redirects = TTLCache(kwargs.get("redirect_ttl", 3600))
+        self.details = TTLCache(kwargs.get("detail_ttl", 300))
 
         """
             Methods
@@ -43,6 +51,27 @@ class TikTokApi:
         self.comment = Comment(self)
         self.user = User(self)
 
+    async def get_session(self) -> aiohttp.ClientSession:
+        """Get the shared session, creating it inside the running loop the first time"""
+        if self.session is None or self.session.closed:
+            # no default headers: the api headers and session cookie only go with get_json,
+            # cdn downloads and share link redirects are requested without them
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=100, ttl_dns_cache=300),
+            )
+            self.owns_session = True
+        return self.session
+
+    async def get_json(self, url) -> dict:
+        session = await self.get_session()
+        async with session.get(url, headers=self.headers) as r:
+            return await r.json(content_type=None)
+
+    async def close(self) -> None:
+        """Close the session if ttapi created it"""
+        if self.owns_session and self.session and not self.session.closed:
+            await self.session.close()
+
     def setup_headers(self, headers) -> None:
         for key in headers:
             self.headers[key] = headers[key]
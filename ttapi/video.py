@@ -1,7 +1,11 @@
+import asyncio
 import re
 from datetime import datetime
 
-import aiohttp
+from .exceptions import Too_Large
+
+CHUNK_SIZE = 256 * 1024
+MAX_SIZE = 50 * 1024 * 1024
 
 
 class Video:
@@ -9,26 +13,27 @@ class Video:
         self.api = api
 
     async def download_video(
-        self, video_url, watermark=False, filename=None, path=None
+        self, video_url, watermark=False, filename=None, path=None, max_size=MAX_SIZE
     ):
         try:
             if "is_play_url" in video_url:
-                video_binary = await self.get_video_binary(video_url)
+                download_url = video_url
                 video_data = {"video_id": video_url.split("video_id=")[1].split("&")[0]}
             else:
                 video_data = await self.parse_video_data(video_url)
-                video_binary = await self.get_video_binary(
-                    video_data["download_urls"][
-                        "no_watermark" if not watermark else "watermark"
-                    ]
-                )
+                download_url = video_data["download_urls"][
+                    "no_watermark" if not watermark else "watermark"
+                ]
             if not filename:
                 filename = str(video_data["video_id"]) + ".mp4"
             if not path:
                 path = filename
-            with open(path, "wb") as v:
-                v.write(video_binary)
-                v.close()
+            v = await asyncio.to_thread(open, path, "wb")
+            try:
+                async for chunk in self.stream_video(download_url, max_size):
+                    await asyncio.to_thread(v.write, chunk)
+            finally:
+                await asyncio.to_thread(v.close)
             print(
                 f"Successfully downloaded video by @{video_data['username'] if 'username' in video_data else 'Unknown User'} (path: {path})"
             )
@@ -37,23 +42,64 @@ class Video:
             print(f"Failed to download video from url {video_url}: " + str(e))
             return False
 
-    async def get_video_binary(self, download_url):
+    async def stream_video(self, download_url, max_size=MAX_SIZE):
+        """
+        DOWNLOAD_URL (str):
+            Same as get_video_binary
+
+        MAX_SIZE (int):
+            Raises Too_Large once more than this many bytes were received
+
+        Yields:
+            bytes: Chunks of the mp4 as they arrive
+        """
+        session = await self.api.get_session()
+        async with session.get(download_url) as video:
+            if video.content_length and video.content_length > max_size:
+                raise Too_Large(max_size)
+            received = 0
+            async for chunk in video.content.iter_chunked(CHUNK_SIZE):
+                received += len(chunk)
+                if received > max_size:
+                    raise Too_Large(max_size)
+                yield chunk
+
+    async def get_video_binary(self, download_url, max_size=MAX_SIZE):
         """
         DOWNLOAD_URL (str):
             Get this from the object that the parse_video_data function returns, it can either be download_video_url or download_video_url_watermark
 
+        MAX_SIZE (int):
+            Videos bigger than this return None. Defaults to 50MB
+
         Returns:
             binary: Raw binary mp4 data
         """
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(download_url) as video:
-                    binary = await video.read()
+            binary = bytearray()
+            async for chunk in self.stream_video(download_url, max_size):
+                binary += chunk
             # self.api.debug.success(f"Received binary data ({video.elapsed.total_seconds()}s)")
-            return binary
+            return bytes(binary)
         except Exception as e:
             print(e)
 
+    async def resolve_url(self, url) -> str:
+        """Follow a share link to the video url, cached since share links don't change"""
+        if resolved := self.api.redirects.get(url):
+            return resolved
+        session = await self.api.get_session()
+        async with session.get(url, allow_redirects=True) as sesh:
+            return self.api.redirects.set(url, str(sesh.url))
+
+    async def get_aweme_detail(self, video_id) -> dict:
+        if detail := self.api.details.get(video_id):
+            return detail
+        vv = await self.api.get_json(
+            f"{self.api.host}/aweme/v1/aweme/detail/?aweme_id={video_id}&device_type=SM-G973N&region=US&media_type=4%22"
+        )
+        return self.api.details.set(video_id, vv["aweme_detail"])
+
     async def parse_video_data(self, url, raw=False) -> dict:
         """Grabs the video data from a tiktok video url
 
@@ -76,9 +122,7 @@ class Video:
         )
         is_mobile_url = re.search(mobile_share_regex, url)
         if is_mobile_url:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, allow_redirects=True) as sesh:
-                    url = str(sesh.url)
+            url = await self.resolve_url(url)
         is_website_url = re.search(website_share_regex, url)
         is_video_id = re.match("[0-9]+", url)
         if is_website_url:
@@ -88,12 +132,7 @@ class Video:
         if not is_website_url and not is_video_id:
             return False
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    f"https://api2-19-h2.musical.ly/aweme/v1/aweme/detail/?aweme_id={video_id}&device_type=SM-G973N&region=US&media_type=4%22"
-                ) as video_request:
-                    vv = await video_request.json()
-                    video_data = vv["aweme_detail"]
+            video_data = await self.get_aweme_detail(video_id)
             # self.api.debug.success(f"Found video data for video_id {video_id}")
             if raw:
                 data = video_data